@@ -0,0 +1,125 @@
+"""Benchmarks of the traveller_service management commands and touristats views.
+
+They run against a throwaway test database created from the configured
+DATABASES (like ``manage.py test``), never against the real tables, so the
+touristats migrations must exist (``python manage.py makemigrations``).
+"""
+
+import os
+import sys
+from io import StringIO
+
+SERVICE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "traveller_service"
+)
+
+SUITE = "service"
+
+
+def setup_django():
+    if SERVICE_DIR not in sys.path:
+        sys.path.insert(0, SERVICE_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "traveller_service.settings")
+
+    import django
+
+    django.setup()
+
+
+def run(runner, files):
+    """Run the benchmarks over ``files``, a list of (year, all_country_arrivals CSV) pairs."""
+    setup_django()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.test import Client
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+    from touristats.models import AllCountryStats, TimeFrame
+
+    setup_test_environment()
+    # The test client host must be allowed while DEBUG is off in the benchmark
+    settings.ALLOWED_HOSTS = ["testserver"]
+    old_config = setup_databases(verbosity=0, interactive=False)
+
+    out = StringIO()
+    params = {"files": len(files)}
+    first_year, first_file = files[0]
+    source = os.path.dirname(first_file)
+
+    def clear():
+        AllCountryStats.objects.all().delete()
+        TimeFrame.objects.all().delete()
+
+    def insert_all():
+        for year, path in files:
+            call_command("allcountrystats_insert_data", year, path, "--bulk", stdout=out)
+
+    try:
+        runner.measure(
+            SUITE,
+            "allcountrystats_insert_data",
+            lambda: call_command("allcountrystats_insert_data", first_year, first_file, stdout=out),
+            setup=clear,
+            repeat=1,
+            files=1,
+        )
+        runner.measure(
+            SUITE, "allcountrystats_insert_data --bulk", insert_all, setup=clear, **params
+        )
+        runner.measure(
+            SUITE,
+            "allcountrystats_insert_directory --workers 1",
+            lambda: call_command(
+                "allcountrystats_insert_directory", source, "--workers", "1", stdout=out
+            ),
+            setup=clear,
+            **params,
+        )
+        runner.measure(
+            SUITE,
+            "allcountrystats_delete_data --confirm",
+            lambda: call_command("allcountrystats_delete_data", "--confirm", stdout=out),
+            setup=insert_all,
+            **params,
+        )
+
+        insert_all()
+        client = Client()
+        country = AllCountryStats.objects.values_list("country", flat=True).first()
+
+        def get(path, **query):
+            response = client.get(path, query)
+            if response.streaming:
+                return b"".join(response.streaming_content)
+            return response.content
+
+        def deep_page():
+            page = client.get("/allcountry_arrivals/page/", {"page_size": 100}).json()
+            while page["next"]:
+                page = client.get(
+                    "/allcountry_arrivals/page/", {"page_size": 100, "after": page["next"]}
+                ).json()
+
+        runner.measure(
+            SUITE, "view get_all_arrivals", lambda: get("/allcountry_arrivals/get_all_arrivals/")
+        )
+        runner.measure(
+            SUITE,
+            "view get_all_arrivals ?format=ndjson",
+            lambda: get("/allcountry_arrivals/get_all_arrivals/", format="ndjson"),
+        )
+        runner.measure(SUITE, "view arrivals_paginated", lambda: get("/allcountry_arrivals/"))
+        runner.measure(SUITE, "view arrivals_paginated_json (all pages)", deep_page, repeat=1)
+        runner.measure(
+            SUITE,
+            "view country_arrivals_view",
+            lambda: get(f"/allcountry_arrivals/{country}/"),
+        )
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
@@ -0,0 +1,78 @@
+"""Benchmarks of the traveller package: loading, trend analysis and plotting."""
+
+import pandas as pd
+import pyarrow as pa
+
+from traveller.data.arrow_trend_analyzer import ArrowMonthlyTrendAnalyzer
+from traveller.data.loader import DataLoader
+from traveller.data.trend_analyzer import MonthlyTrendAnalyzer
+from traveller.plot.plotter import TrendPlotter
+
+SUITE = "traveller"
+
+
+def load_tables(files):
+    tables = {}
+    for year, path in files:
+        loader = DataLoader(path)
+        loader.load_data()
+        tables[year] = loader.get_data()
+    return tables
+
+
+def run(runner, files):
+    """Run the benchmarks over ``files``, a list of (year, all_country_arrivals CSV) pairs."""
+    params = {"files": len(files)}
+
+    runner.measure(SUITE, "DataLoader.load_data", lambda: load_tables(files), **params)
+    runner.measure(
+        SUITE,
+        "DataLoader.iter_batches",
+        lambda: [pa.Table.from_batches(list(DataLoader(path).iter_batches())) for _, path in files],
+        **params,
+    )
+
+    tables = load_tables(files)
+
+    def pandas_trend():
+        return pd.concat(
+            MonthlyTrendAnalyzer(table.to_pandas()).analyze_trend(year)
+            for year, table in tables.items()
+        )
+
+    def arrow_trend():
+        return pa.concat_tables(
+            ArrowMonthlyTrendAnalyzer(table).analyze_trend(year) for year, table in tables.items()
+        )
+
+    runner.measure(SUITE, "MonthlyTrendAnalyzer.analyze_trend", pandas_trend, **params)
+    runner.measure(SUITE, "ArrowMonthlyTrendAnalyzer.analyze_trend", arrow_trend, **params)
+
+    trend = arrow_trend().to_pandas()
+    runner.measure(
+        SUITE,
+        "TrendPlotter.plot_trend",
+        lambda: TrendPlotter().plot_trend(
+            trend, "Month", "Arrivals", "Arrivals", "Month", "Arrivals", "Year", show=False
+        ),
+        repeat=min(runner.repeat, 3),
+        rows=len(trend),
+    )
+    runner.measure(
+        SUITE,
+        "TrendPlotter.plot_trend[webgl]",
+        lambda: TrendPlotter().plot_trend(
+            trend,
+            "Month",
+            "Arrivals",
+            "Arrivals",
+            "Month",
+            "Arrivals",
+            "Year",
+            show=False,
+            render_mode="webgl",
+            top_n=10,
+        ),
+        repeat=min(runner.repeat, 3),
+        rows=len(trend),
+    )
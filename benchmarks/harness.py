@@ -0,0 +1,85 @@
+"""Timing and result collection shared by the benchmark suites."""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+# Number of countries and years of synthetic data per scale
+SCALES = {
+    "small": {"countries": 50, "years": 2},
+    "medium": {"countries": 200, "years": 5},
+    "large": {"countries": 1000, "years": 20},
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class BenchmarkRunner:
+    """Time callables and collect the results as JSON serializable records.
+
+    Each benchmark runs ``warmup`` untimed and ``repeat`` timed iterations. A
+    ``setup`` callable runs before every iteration outside the timing, e.g. to
+    reset database state.
+    """
+
+    def __init__(self, scale, repeat=5, warmup=1):
+        self.scale = scale
+        self.repeat = repeat
+        self.warmup = warmup
+        self.results = []
+
+    def measure(self, suite, name, fn, setup=None, repeat=None, **params):
+        repeat = repeat or self.repeat
+        times = []
+        for iteration in range(self.warmup + repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            if iteration >= self.warmup:
+                times.append(elapsed)
+
+        result = {
+            "suite": suite,
+            "name": name,
+            "params": params,
+            "repeat": repeat,
+            "times": times,
+            "min": min(times),
+            "median": statistics.median(times),
+            "mean": statistics.fmean(times),
+        }
+        self.results.append(result)
+        print(f"{suite:<10} {name:<45} median {result['median'] * 1000:10.2f} ms")
+        return result
+
+    def to_dict(self):
+        return {
+            "metadata": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "git_commit": git_commit(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "scale": self.scale,
+                "scale_params": SCALES[self.scale],
+            },
+            "results": self.results,
+        }
+
+    def write(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -0,0 +1,46 @@
+"""Run the benchmark suites on synthetic data and write machine readable results.
+
+Example:
+    python -m benchmarks.run --scale medium --output benchmark_results.json
+
+The output holds metadata (time, git commit, Python, platform, scale) and one
+record per benchmark with every timing plus min, median and mean in seconds, so
+results of two releases can be diffed directly.
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks import bench_service, bench_traveller
+from benchmarks.harness import SCALES, BenchmarkRunner
+from benchmarks.synthetic import SyntheticArrivals
+
+SUITES = {"traveller": bench_traveller, "service": bench_service}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the traveller benchmarks")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument(
+        "--suite", choices=sorted(SUITES), action="append", help="Suites to run (default: all)"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timed iterations per benchmark")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+
+    runner = BenchmarkRunner(args.scale, repeat=args.repeat)
+    with tempfile.TemporaryDirectory() as data_dir:
+        synthetic = SyntheticArrivals(**SCALES[args.scale])
+        paths = synthetic.write_all_country(os.path.join(data_dir, "all_countries"))
+        files = list(zip(synthetic.year_range, paths))
+
+        for name in args.suite or sorted(SUITES, reverse=True):
+            SUITES[name].run(runner, files)
+
+    runner.write(args.output)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
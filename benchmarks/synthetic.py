@@ -0,0 +1,158 @@
+"""Synthetic SLTDA-shaped data sets of configurable size for the benchmarks.
+
+Files are written in the schemas of the real data under ``data/``:
+
+    all_country_arrivals_<year>.csv   Index,Country,January..December,Total
+    <year>_<Month>_Daily_Arrival.csv  Date,Arrivals
+    <year>_HC.csv                     Categorization,Num Establishments,Num Rooms
+
+Counts of 1,000 and above are written with thousands separators and quoted, like
+the published files.
+
+Example:
+    python -m benchmarks.synthetic --countries 200 --years 10 --output /tmp/synthetic
+"""
+
+import argparse
+import calendar
+import csv
+import os
+
+import numpy as np
+
+from traveller.data.trend_analyzer import MONTHS
+
+HOTEL_CATEGORIES = [
+    "Classified Tourist Hotels",
+    "Five Star",
+    "Four Star",
+    "Three Star",
+    "Two Star",
+    "One Star",
+    "Boutique Hotel",
+    "Boutique Villa",
+    "Bungalow",
+    "Guest House",
+    "Home Stay Unit",
+    "Rented Apartment",
+    "Heritage Home",
+    "Eco Lodge",
+    "Camping Site",
+]
+
+
+def format_count(value):
+    return f"{value:,}"
+
+
+class SyntheticArrivals:
+    """Deterministic arrivals for ``countries`` markets over ``years`` years.
+
+    Each country gets a log-normal base volume, a shared seasonal profile with some
+    per-country noise and a yearly growth rate, so aggregates and trends look like
+    the real series.
+    """
+
+    def __init__(self, countries=200, years=5, start_year=2015, seed=0):
+        self.countries = countries
+        self.years = years
+        self.start_year = start_year
+        self.rng = np.random.default_rng(seed)
+
+        self.country_names = [f"Country {index:04d}" for index in range(1, countries + 1)]
+        base = self.rng.lognormal(mean=6.0, sigma=1.6, size=countries)
+        growth = self.rng.normal(1.05, 0.1, size=countries).clip(0.5, 1.8)
+        season = 1 + 0.35 * np.cos(np.linspace(0, 2 * np.pi, 12, endpoint=False))
+        noise = self.rng.normal(1.0, 0.15, size=(countries, years, 12)).clip(0.1)
+
+        # countries x years x months
+        trend = growth[:, None] ** np.arange(years)[None, :]
+        self.arrivals = np.rint(
+            base[:, None, None] * trend[:, :, None] * season[None, None, :] * noise
+        ).astype(np.int64)
+
+    @property
+    def year_range(self):
+        return range(self.start_year, self.start_year + self.years)
+
+    def write_all_country(self, output_dir):
+        """Write one ``all_country_arrivals_<year>.csv`` per year, return their paths."""
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        for year_index, year in enumerate(self.year_range):
+            path = os.path.join(output_dir, f"all_country_arrivals_{year}.csv")
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["Index", "Country"] + MONTHS + ["Total"])
+                for index, country in enumerate(self.country_names):
+                    values = self.arrivals[index, year_index]
+                    writer.writerow(
+                        [index + 1, country]
+                        + [format_count(int(value)) for value in values]
+                        + [format_count(int(values.sum()))]
+                    )
+            paths.append(path)
+        return paths
+
+    def write_daily(self, output_dir):
+        """Write one ``<year>_<Month>_Daily_Arrival.csv`` per month, return their paths.
+
+        The monthly total over all countries is spread across the days of the month.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        monthly = self.arrivals.sum(axis=0)
+        paths = []
+        for year_index, year in enumerate(self.year_range):
+            for month_index, month in enumerate(MONTHS):
+                days = calendar.monthrange(year, month_index + 1)[1]
+                shares = self.rng.dirichlet(np.full(days, 20.0))
+                daily = np.rint(shares * monthly[year_index, month_index]).astype(np.int64)
+
+                path = os.path.join(output_dir, f"{year}_{month}_Daily_Arrival.csv")
+                with open(path, "w", newline="") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(["Date", "Arrivals"])
+                    for day, value in enumerate(daily, 1):
+                        writer.writerow([f"{year}-{month_index + 1:02d}-{day:02d}", int(value)])
+                paths.append(path)
+        return paths
+
+    def write_hotel_categorization(self, output_dir, categories=len(HOTEL_CATEGORIES)):
+        """Write one ``<year>_HC.csv`` per year, return their paths."""
+        os.makedirs(output_dir, exist_ok=True)
+        names = [
+            HOTEL_CATEGORIES[index] if index < len(HOTEL_CATEGORIES) else f"Category {index}"
+            for index in range(categories)
+        ]
+        paths = []
+        for year in self.year_range:
+            path = os.path.join(output_dir, f"{year}_HC.csv")
+            establishments = self.rng.integers(5, 1500, size=categories)
+            rooms = establishments * self.rng.integers(3, 80, size=categories)
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["Categorization", "Num Establishments", "Num Rooms"])
+                for name, count, room_count in zip(names, establishments, rooms):
+                    writer.writerow([name, format_count(int(count)), format_count(int(room_count))])
+            paths.append(path)
+        return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic SLTDA-shaped CSV files")
+    parser.add_argument("--countries", type=int, default=200)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--start-year", type=int, default=2015)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True, help="Directory to write the files to")
+    args = parser.parse_args()
+
+    data = SyntheticArrivals(args.countries, args.years, args.start_year, args.seed)
+    paths = data.write_all_country(os.path.join(args.output, "all_countries"))
+    paths += data.write_daily(os.path.join(args.output, "daily"))
+    paths += data.write_hotel_categorization(os.path.join(args.output, "hotel_categorization"))
+    print(f"Wrote {len(paths)} files to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
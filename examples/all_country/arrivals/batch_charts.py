@@ -0,0 +1,23 @@
+from traveller.data.arrow_trend_analyzer import ArrowMonthlyTrendAnalyzer
+from traveller.data.loader import DataLoader
+from traveller.plot.batch import BatchRenderer, ChartSpec
+
+year = 2019
+file_path = "data/arrival/all_countries/all_country_arrivals_" + str(year) + ".csv"
+data_loader = DataLoader(file_path)
+data_loader.load_data()
+data = data_loader.get_data()
+
+
+if data is not None:
+    trend = ArrowMonthlyTrendAnalyzer(data).analyze_trend(year).to_pandas()
+
+    # One chart per country plus one of the top 10 countries; a second run only
+    # re-renders the charts whose data changed
+    renderer = BatchRenderer("charts/arrivals", workers=4)
+    for spec in [
+        ChartSpec("Month", ["Arrivals"], ["Country"], facet_col="Year"),
+        ChartSpec("Month", ["Arrivals"], ["Year"], title="{metric} {Year}", top_n=10),
+    ]:
+        result = renderer.render(trend, spec)
+        print(f"Rendered {len(result['rendered'])} charts, skipped {len(result['skipped'])}")
@@ -1,5 +1,5 @@
+from traveller.data.arrow_trend_analyzer import ArrowMonthlyTrendAnalyzer
 from traveller.data.loader import DataLoader
-from traveller.data.trend_analyzer import MonthlyTrendAnalyzer
 from traveller.plot.plotter import TrendPlotter
 
 year = 2019
@@ -10,9 +10,9 @@ data = data_loader.get_data()
 
 
 if data is not None:
-    df = data.to_pandas()
-    monthly_trend_analyzer = MonthlyTrendAnalyzer(df)
-    trend = monthly_trend_analyzer.analyze_trend(2019)
+    # Analyze on the Arrow table, only the aggregated trend is handed to pandas for plotting
+    monthly_trend_analyzer = ArrowMonthlyTrendAnalyzer(data)
+    trend = monthly_trend_analyzer.analyze_trend(year).to_pandas()
 
     trend_plotter = TrendPlotter()
     trend_plotter.plot_trend(
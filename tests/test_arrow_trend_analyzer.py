@@ -0,0 +1,60 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pytest
+
+from traveller.data.arrow_trend_analyzer import ArrowMonthlyTrendAnalyzer
+from traveller.data.loader import DataLoader
+from traveller.data.trend_analyzer import MonthlyTrendAnalyzer
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "arrival", "all_countries")
+# 2019 and 2024 label their total row in the Index column, 2020 and 2021 in the Country
+# column, as "Total" and "TOTAL"
+YEARS = [2019, 2020, 2021, 2024]
+
+
+def csv_path(year):
+    return os.path.join(DATA_DIR, f"all_country_arrivals_{year}.csv")
+
+
+def expected(year):
+    return MonthlyTrendAnalyzer(pd.read_csv(csv_path(year))).analyze_trend(year)
+
+
+def assert_same_trend(table, year):
+    trend = ArrowMonthlyTrendAnalyzer(table).analyze_trend(year).to_pandas()
+    reference = expected(year)
+    reference["Month"] = reference["Month"].astype(str)
+    # Arrivals are float64, pandas has int64 when no month of the CSV has a gap
+    pd.testing.assert_frame_equal(trend, reference, check_dtype=False)
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_trend_of_load_data(year):
+    loader = DataLoader(csv_path(year))
+    loader.load_data()
+    assert_same_trend(loader.get_data(), year)
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_trend_of_iter_batches(year):
+    """Typed int64 batches give the trend of the pandas analyzer's string cleaning"""
+    batches = list(DataLoader(csv_path(year), block_size=4096).iter_batches())
+    assert len(batches) > 1
+    assert_same_trend(pa.Table.from_batches(batches), year)
+
+
+@pytest.mark.parametrize("year, total", [(2020, "Total"), (2021, "TOTAL")])
+def test_total_row_in_the_country_column(year, total):
+    """Kept as a country by both analyzers, so the two still agree on it"""
+    trend = ArrowMonthlyTrendAnalyzer(
+        pa.Table.from_batches(DataLoader(csv_path(year)).iter_batches())
+    ).analyze_trend(year)
+    totals = trend.filter(pc.equal(trend["Country"], total))
+    assert totals.num_rows == 12
+    reference = expected(year)
+    assert totals["Arrivals"].to_pylist() == list(
+        reference.loc[reference["Country"] == total, "Arrivals"]
+    )
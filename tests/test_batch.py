@@ -0,0 +1,59 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from traveller.data.trend_analyzer import MONTHS
+from traveller.plot.batch import MANIFEST_FILE, BatchRenderer, ChartSpec, chart_name
+
+# Country names change case between the years' CSVs
+COUNTRIES = {2019: ["AFGHANISTAN", "Total", "China"], 2020: ["Afghanistan", "TOTAL", "China"]}
+
+
+def make_trend():
+    rows = [
+        {"Year": year, "Month": month, "Country": country, "Arrivals": year + number * 10 + index}
+        for year, countries in COUNTRIES.items()
+        for index, country in enumerate(countries)
+        for number, month in enumerate(MONTHS[:3])
+    ]
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_every_chart_has_its_own_file(tmp_path, workers):
+    trend = make_trend()
+    spec = ChartSpec("Month", ["Arrivals"], ["Country"], facet_col="Year")
+    renderer = BatchRenderer(str(tmp_path), workers=workers, formats=("html", "json"))
+
+    result = renderer.render(trend, spec)
+    countries = sorted(trend["Country"].unique())
+    assert sorted(result["rendered"]) == sorted(chart_name([c], "Arrivals") for c in countries)
+    assert result["failed"] == {}
+    for country in countries:
+        with open(tmp_path / f"{chart_name([country], 'Arrivals')}.json") as f:
+            figure = json.load(f)
+        assert {trace["name"] for trace in figure["data"]} == {country}
+    with open(tmp_path / MANIFEST_FILE) as f:
+        assert len(json.load(f)) == len(countries)
+
+    again = renderer.render(trend, spec)
+    assert again["rendered"] == []
+    assert sorted(again["skipped"]) == sorted(result["rendered"])
+
+
+def test_changed_slice_is_rendered_again(tmp_path):
+    trend = make_trend()
+    spec = ChartSpec("Month", ["Arrivals"], ["Country"], facet_col="Year")
+    renderer = BatchRenderer(str(tmp_path), workers=1)
+    renderer.render(trend, spec)
+
+    trend.loc[trend["Country"] == "China", "Arrivals"] += 1
+    assert renderer.render(trend, spec)["rendered"] == [chart_name(["China"], "Arrivals")]
+
+
+def test_chart_names_differ_by_case():
+    assert chart_name(["Total"], "Arrivals") != chart_name(["TOTAL"], "Arrivals")
+    assert chart_name(["Total"], "Arrivals").startswith("total-arrivals-")
+    assert os.sep not in chart_name(["a/b"], "Arrivals")
@@ -0,0 +1,124 @@
+import json
+import os
+
+import pyarrow.csv as pv
+import pytest
+
+from traveller.data import cache as cache_module
+from traveller.data.cache import ArrowFileCache
+
+CSV = "Country,January\nFrance,10\nIndia,20\n"
+
+
+class Parser:
+    """``pyarrow.csv.read_csv`` counting its calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, source):
+        self.calls += 1
+        return pv.read_csv(source)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "arrivals.csv"
+    path.write_text(CSV)
+    return str(path)
+
+
+@pytest.fixture
+def hashes(monkeypatch):
+    """The sources hashed by the cache"""
+    hashed = []
+
+    def file_sha256(path, *args):
+        hashed.append(path)
+        return original(path, *args)
+
+    original = cache_module.file_sha256
+    monkeypatch.setattr(cache_module, "file_sha256", file_sha256)
+    return hashed
+
+
+def touch(path, seconds=10):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10**9))
+
+
+def test_unchanged_source_is_a_hit(tmp_path, source, hashes):
+    cache, parse = ArrowFileCache(str(tmp_path / "cache")), Parser()
+    table = cache.load(source, parse)
+    assert cache.load(source, parse).equals(table)
+    assert parse.calls == 1
+    # Size and mtime match, so the source is not hashed again
+    assert len(hashes) == 1
+
+
+def test_touched_source_is_a_hit(tmp_path, source, hashes):
+    cache, parse = ArrowFileCache(str(tmp_path / "cache")), Parser()
+    table = cache.load(source, parse)
+    touch(source)
+
+    assert cache.load(source, parse).equals(table)
+    assert parse.calls == 1
+    assert len(hashes) == 2
+    # The fingerprint now has the new mtime, so the next load does not hash
+    assert cache.load(source, parse).equals(table)
+    assert len(hashes) == 2
+
+
+@pytest.mark.parametrize("content", ["Country,January\nFrance,10\nIndia,30\n", CSV + "Peru,5\n"])
+def test_changed_source_is_a_miss(tmp_path, source, content):
+    """Same size (only the hash tells) or a different size"""
+    cache, parse = ArrowFileCache(str(tmp_path / "cache")), Parser()
+    cache.load(source, parse)
+    with open(source, "w") as f:
+        f.write(content)
+    touch(source)
+
+    assert not cache.is_fresh(source)
+    assert cache.load(source, parse).equals(pv.read_csv(source))
+    assert parse.calls == 2
+    assert cache.is_fresh(source)
+
+
+def truncate(path):
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) // 2)
+
+
+def overwrite(content):
+    def corrupt(path):
+        with open(path, "w") as f:
+            f.write(content)
+
+    return corrupt
+
+
+@pytest.mark.parametrize(
+    "file, corrupt",
+    [
+        ("data", truncate),
+        ("data", overwrite("")),
+        ("data", overwrite("not an arrow file")),
+        ("meta", truncate),
+        ("meta", overwrite("")),
+        ("meta", overwrite(json.dumps({"size": len(CSV)}))),
+        ("meta", overwrite("[]")),
+    ],
+)
+def test_corrupt_copy_is_rebuilt(tmp_path, source, file, corrupt):
+    cache, parse = ArrowFileCache(str(tmp_path / "cache")), Parser()
+    # Not kept, a table mapping the file would fault once it is truncated in place
+    cache.load(source, parse)
+    table = pv.read_csv(source)
+    data_path, meta_path = cache._paths(source)
+    corrupt(data_path if file == "data" else meta_path)
+
+    assert cache.load(source, parse).equals(table)
+    assert parse.calls == 2
+    # And the rebuilt copy is used from then on
+    assert cache.load(source, parse).equals(table)
+    assert parse.calls == 2
@@ -0,0 +1,154 @@
+import csv
+import io
+import re
+import sqlite3
+import threading
+
+import pyarrow as pa
+import pytest
+
+from traveller.data.db_loader import ARRIVALS_SCHEMA, DatabaseLoader
+from traveller.data.trend_analyzer import MONTHS
+
+COUNTRIES = [(f"C{number:03d}", f"Country {number}, the {number}th") for number in range(300)]
+YEARS = [2022, 2023]
+
+
+class CopyConnection:
+    """A psycopg2 connection whose ``COPY (query) TO STDOUT`` runs the query on SQLite.
+
+    The copy writes the first ``pause_after`` rows, then waits for ``resume`` before
+    writing the rest, or raises ``fail_with`` instead.
+    """
+
+    def __init__(self, database, pause_after=None, fail_with=None):
+        self.database = database
+        self.pause_after = pause_after
+        self.fail_with = fail_with
+        self.resume = threading.Event()
+        self.finished = False
+        self.cancelled = False
+        self.closed = False
+
+    def cursor(self):
+        return CopyCursor(self)
+
+    def cancel(self):
+        self.cancelled = True
+        self.resume.set()
+
+    def close(self):
+        self.closed = True
+
+
+class CopyCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def copy_expert(self, sql, file):
+        query = re.fullmatch(r"COPY \((.*)\) TO STDOUT WITH \(FORMAT csv, HEADER\)", sql, re.S)
+        cursor = self.connection.database.execute(query.group(1))
+        self.write(file, [column[0] for column in cursor.description])
+        for number, row in enumerate(cursor, 1):
+            self.write(file, ["" if value is None else value for value in row])
+            if number == self.connection.pause_after:
+                file.flush()
+                if self.connection.fail_with:
+                    raise self.connection.fail_with
+                assert self.connection.resume.wait(10), "the first batch was not read"
+                if self.connection.cancelled:
+                    raise RuntimeError("canceling statement due to user request")
+        self.connection.finished = True
+
+    def write(self, file, values):
+        line = io.StringIO()
+        csv.writer(line, lineterminator="\n").writerow(values)
+        file.write(line.getvalue().encode())
+
+
+@pytest.fixture
+def database():
+    database = sqlite3.connect(":memory:", check_same_thread=False)
+    database.execute("CREATE TABLE touristats_timeframe (id INTEGER PRIMARY KEY, year, month)")
+    database.execute(
+        "CREATE TABLE touristats_allcountrystats "
+        "(id INTEGER PRIMARY KEY, country_id, timeframe_id, country, passengers)"
+    )
+    timeframes = [(year, month) for year in YEARS for month in range(1, 13)]
+    database.executemany("INSERT INTO touristats_timeframe (year, month) VALUES (?, ?)", timeframes)
+    stats = [
+        (country_id, timeframe_id, country, number * 7 + timeframe_id)
+        for number, (country_id, country) in enumerate(COUNTRIES + [("TOTAL", "Total")])
+        for timeframe_id in range(1, len(timeframes) + 1)
+        # Leave gaps, which come out as nulls
+        if (number + timeframe_id) % 11
+    ]
+    database.executemany(
+        "INSERT INTO touristats_allcountrystats "
+        "(country_id, timeframe_id, country, passengers) VALUES (?, ?, ?, ?)",
+        stats,
+    )
+    yield database
+    database.close()
+
+
+def expected_rows(year=None):
+    """The pivot of the ``database`` fixture's rows, worked out without SQL"""
+    rows = []
+    for year_index, row_year in enumerate(YEARS):
+        for number, (_, country) in sorted(enumerate(COUNTRIES), key=lambda item: item[1][1]):
+            row = {"Country": country, "Year": row_year}
+            for month_index, month in enumerate(MONTHS):
+                timeframe_id = year_index * 12 + month_index + 1
+                passengers = number * 7 + timeframe_id
+                row[month] = passengers if (number + timeframe_id) % 11 else None
+            rows.append(row)
+    return [row for row in rows if year in (None, row["Year"])]
+
+
+def connect(monkeypatch, connection):
+    monkeypatch.setattr(DatabaseLoader, "_connect", lambda self: connection)
+
+
+@pytest.mark.parametrize("year", [None, 2023])
+def test_batches_are_streamed(monkeypatch, database, year):
+    connection = CopyConnection(database, pause_after=200)
+    connect(monkeypatch, connection)
+    batches = []
+    for batch in DatabaseLoader(year=year, block_size=4096).iter_batches():
+        if not batches:
+            # The first batch arrives while the COPY is still waiting to write the rest
+            assert not connection.finished
+            connection.resume.set()
+        batches.append(batch)
+
+    assert len(batches) > 2
+    assert connection.finished and connection.closed and not connection.cancelled
+    table = pa.Table.from_batches(batches, ARRIVALS_SCHEMA)
+    assert table.schema == ARRIVALS_SCHEMA
+    assert table.to_pylist() == expected_rows(year)
+
+
+def test_closing_early_cancels_the_query(monkeypatch, database):
+    connection = CopyConnection(database, pause_after=200)
+    connect(monkeypatch, connection)
+    batches = DatabaseLoader(block_size=4096).iter_batches()
+    first = next(batches)
+    assert first.num_rows > 0
+    batches.close()
+    assert connection.cancelled and connection.closed
+    assert not connection.finished
+
+
+def test_copy_error_is_raised(monkeypatch, database):
+    """The error of the COPY, not that of the reader seeing the output cut short"""
+    error = RuntimeError("canceling statement due to statement timeout")
+    connect(monkeypatch, CopyConnection(database, pause_after=200, fail_with=error))
+    with pytest.raises(RuntimeError, match="statement timeout"):
+        list(DatabaseLoader(block_size=4096).iter_batches())
@@ -0,0 +1,227 @@
+import hashlib
+import os
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from traveller.download.downloader import MANIFEST_FILE, ReportDownloader
+
+LAST_MODIFIED = formatdate(1700000000, usegmt=True)
+
+
+class ReportServer(ThreadingHTTPServer):
+    """Serves ``files`` with ETag / Last-Modified validators and Range support.
+
+    ``truncate`` maps a file name to the number of bytes its next full response is
+    cut off at, and ``requests`` records (path, request headers, status).
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ReportHandler)
+        self.files = {}
+        self.etags = True
+        self.last_modified = True
+        self.truncate = {}
+        self.requests = []
+
+    def url(self, name):
+        return f"http://127.0.0.1:{self.server_address[1]}/{name}"
+
+    def statuses(self):
+        return [status for _, _, status in self.requests]
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, status, headers=(), body=b"", length=None):
+        self.server.requests.append((self.path, dict(self.headers), status))
+        self.send_response(status)
+        for header in headers:
+            self.send_header(*header)
+        self.send_header("Content-Length", str(len(body) if length is None else length))
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+        self.close_connection = True
+
+    def do_GET(self):
+        name = self.path.lstrip("/")
+        if name not in self.server.files:
+            return self.respond(404)
+        data = self.server.files[name]
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        validators = []
+        if self.server.etags:
+            validators.append(("ETag", etag))
+        if self.server.last_modified:
+            validators.append(("Last-Modified", LAST_MODIFIED))
+
+        if self.server.etags and self.headers.get("If-None-Match") == etag:
+            return self.respond(304, validators)
+        if (
+            self.server.last_modified
+            and not self.server.etags
+            and self.headers.get("If-Modified-Since") == LAST_MODIFIED
+        ):
+            return self.respond(304, validators)
+
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        range_valid = if_range in ({etag} if self.server.etags else set()) | (
+            {LAST_MODIFIED} if self.server.last_modified else set()
+        )
+        if range_header and range_valid:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            if start >= len(data):
+                return self.respond(416, [("Content-Range", f"bytes */{len(data)}")])
+            content_range = f"bytes {start}-{len(data) - 1}/{len(data)}"
+            return self.respond(206, validators + [("Content-Range", content_range)], data[start:])
+
+        cut = self.server.truncate.pop(name, None)
+        if cut is not None:
+            return self.respond(200, validators, data[:cut], length=len(data))
+        return self.respond(200, validators, data)
+
+
+@pytest.fixture
+def server():
+    server = ReportServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def report(size=400_000, seed=b"report"):
+    return (hashlib.sha256(seed).digest() * (size // 32 + 1))[:size]
+
+
+def downloader(path, **options):
+    return ReportDownloader(str(path), workers=2, retries=1, backoff=0, **options)
+
+
+def read(path, name):
+    with open(os.path.join(path, name), "rb") as f:
+        return f.read()
+
+
+def test_download(server, tmp_path):
+    server.files = {"a.pdf": report(seed=b"a"), "b.pdf": report(seed=b"b")}
+    urls = [server.url("a.pdf"), server.url("b.pdf"), server.url("missing.pdf")]
+    result = downloader(tmp_path).download(urls)
+    assert sorted(result["downloaded"]) == ["a.pdf", "b.pdf"]
+    assert list(result["failed"]) == [server.url("missing.pdf")]
+    assert read(tmp_path, "a.pdf") == server.files["a.pdf"]
+    assert os.path.exists(tmp_path / MANIFEST_FILE)
+    assert not os.path.exists(tmp_path / "a.pdf.part")
+
+
+@pytest.mark.parametrize("etags", [True, False])
+def test_unchanged_file_is_not_downloaded(server, tmp_path, etags):
+    server.etags = etags
+    server.files = {"a.pdf": report()}
+    downloader(tmp_path).download([server.url("a.pdf")])
+
+    result = downloader(tmp_path).download([server.url("a.pdf")])
+    assert result["unchanged"] == ["a.pdf"]
+    _, headers, status = server.requests[-1]
+    assert status == 304
+    assert ("If-None-Match" in headers) == etags
+    assert headers["If-Modified-Since"] == LAST_MODIFIED
+
+
+def test_truncated_download_is_resumed(server, tmp_path):
+    server.files = {"a.pdf": report()}
+    server.truncate = {"a.pdf": 150_000}
+    result = downloader(tmp_path).download([server.url("a.pdf")])
+
+    assert result["downloaded"] == ["a.pdf"]
+    assert server.statuses() == [200, 206]
+    _, headers, _ = server.requests[-1]
+    assert headers["Range"] == "bytes=150000-"
+    assert headers["If-Range"].startswith('"')
+    assert read(tmp_path, "a.pdf") == server.files["a.pdf"]
+    # The resumed file is recorded whole, so the next run is a 304
+    assert downloader(tmp_path).download([server.url("a.pdf")])["unchanged"] == ["a.pdf"]
+
+
+def test_truncated_download_fails_without_retries(server, tmp_path):
+    server.files = {"a.pdf": report()}
+    server.truncate = {"a.pdf": 150_000}
+    result = ReportDownloader(str(tmp_path), retries=0).download([server.url("a.pdf")])
+
+    assert "150000 of 400000" in result["failed"][server.url("a.pdf")]
+    assert not os.path.exists(tmp_path / "a.pdf")
+    assert os.path.getsize(tmp_path / "a.pdf.part") == 150_000
+
+    # The next run resumes the part
+    assert downloader(tmp_path).download([server.url("a.pdf")])["downloaded"] == ["a.pdf"]
+    assert server.statuses()[-1] == 206
+    assert read(tmp_path, "a.pdf") == server.files["a.pdf"]
+
+
+def test_part_of_a_changed_file_is_discarded(server, tmp_path):
+    """If-Range no longer matches, so the server sends the whole new file"""
+    server.files = {"a.pdf": report(seed=b"old")}
+    server.truncate = {"a.pdf": 150_000}
+    ReportDownloader(str(tmp_path), retries=0).download([server.url("a.pdf")])
+
+    server.files = {"a.pdf": report(seed=b"new")}
+    result = downloader(tmp_path).download([server.url("a.pdf")])
+    assert result["downloaded"] == ["a.pdf"]
+    assert server.statuses()[-1] == 200
+    assert "Range" in server.requests[-1][1]
+    assert read(tmp_path, "a.pdf") == server.files["a.pdf"]
+
+
+def test_stale_part_is_discarded(server, tmp_path):
+    """A part as long as the file gets a 416, and the file is downloaded again"""
+    server.files = {"a.pdf": report()}
+    server.truncate = {"a.pdf": 150_000}
+    ReportDownloader(str(tmp_path), retries=0).download([server.url("a.pdf")])
+    with open(tmp_path / "a.pdf.part", "wb") as f:
+        f.write(report(size=400_000, seed=b"other"))
+
+    result = downloader(tmp_path).download([server.url("a.pdf")])
+    assert result["downloaded"] == ["a.pdf"]
+    assert server.statuses()[-2:] == [416, 200]
+    assert read(tmp_path, "a.pdf") == server.files["a.pdf"]
+
+
+def test_changed_file_is_downloaded_again(server, tmp_path):
+    server.files = {"a.pdf": report(seed=b"old")}
+    downloader(tmp_path).download([server.url("a.pdf")])
+
+    server.files = {"a.pdf": report(size=1000, seed=b"new")}
+    result = downloader(tmp_path).download([server.url("a.pdf")])
+    assert result["downloaded"] == ["a.pdf"]
+    assert "If-None-Match" in server.requests[-1][1]
+    assert read(tmp_path, "a.pdf") == server.files["a.pdf"]
+
+    # A local file that no longer matches the manifest is not asked for conditionally
+    with open(tmp_path / "a.pdf", "wb") as f:
+        f.write(b"x" * 1000)
+    assert downloader(tmp_path).download([server.url("a.pdf")])["downloaded"] == ["a.pdf"]
+    assert "If-None-Match" not in server.requests[-1][1]
+    assert read(tmp_path, "a.pdf") == server.files["a.pdf"]
+
+
+def test_same_bytes_without_validators(server, tmp_path):
+    """Without validators the file is downloaded, but kept when its hash is unchanged"""
+    server.etags = server.last_modified = False
+    server.files = {"a.pdf": report()}
+    downloader(tmp_path).download([server.url("a.pdf")])
+    mtime = os.stat(tmp_path / "a.pdf").st_mtime_ns
+
+    result = downloader(tmp_path).download([server.url("a.pdf")])
+    assert result["unchanged"] == ["a.pdf"]
+    assert server.statuses() == [200, 200]
+    assert os.stat(tmp_path / "a.pdf").st_mtime_ns == mtime
+    assert not os.path.exists(tmp_path / "a.pdf.part")
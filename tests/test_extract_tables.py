@@ -0,0 +1,95 @@
+import calendar
+import os
+import warnings
+
+import pytest
+
+from traveller.extract.tables import daily_arrivals, hotel_categorization, room_distribution
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "extract")
+
+
+def page(name):
+    """Text of a report page as ``pypdf`` extracted it."""
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+def parse_daily(text, *args):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        return dict(daily_arrivals(text, *args))
+
+
+def test_daily_arrivals_with_spaced_thousands():
+    """November 2023 has "6, 390" for the 14th and weekly "TOTAL (...)" figures"""
+    arrivals = parse_daily(page("daily_arrivals_2023_11.txt"))
+    assert list(arrivals) == [f"2023-11-{day:02d}" for day in range(1, 31)]
+    assert arrivals["2023-11-14"] == 6390
+    assert arrivals["2023-11-29"] == 5316
+    # The monthly figure of the arrivals CSVs
+    assert sum(arrivals.values()) == 151_496
+
+
+def test_daily_arrivals_with_stray_labels():
+    """Chart artifacts ("6", "33") between the pairs are neither days nor values"""
+    arrivals = parse_daily(page("daily_arrivals_2024_12.txt"))
+    assert len(arrivals) == 31
+    assert (arrivals["2024-12-08"], arrivals["2024-12-09"]) == (5984, 6119)
+    assert arrivals["2024-12-27"] == 11232
+
+
+def test_daily_arrivals_with_a_total_on_the_value_line():
+    """February 2024 has "6,862 52,361", the 1st and the first week's total"""
+    arrivals = parse_daily(page("daily_arrivals_2024_02.txt"))
+    assert len(arrivals) == calendar.monthrange(2024, 2)[1]
+    assert arrivals["2024-02-01"] == 6862
+
+
+def test_daily_arrivals_with_the_month_glued_to_the_title():
+    """January 2024's title reads "01 st to 31stJanuary 2024" """
+    arrivals = parse_daily(page("daily_arrivals_2024_01.txt"))
+    assert list(arrivals) == [f"2024-01-{day:02d}" for day in range(1, 32)]
+    assert arrivals["2024-01-01"] == 5912
+    # The report's weekly totals
+    assert sum(arrivals[f"2024-01-{day:02d}"] for day in range(1, 8)) == 45_303
+    assert sum(arrivals[f"2024-01-{day:02d}"] for day in range(29, 32)) == 18_679
+
+
+def test_daily_arrivals_warns_about_missing_days():
+    text = page("daily_arrivals_2023_11.txt").replace("14 \n6, 390", "14 \n")
+    with pytest.warns(UserWarning) as record:
+        arrivals = dict(daily_arrivals(text))
+    assert "2023-11-14" not in arrivals
+    messages = [str(warning.message) for warning in record]
+    assert any("day(s) 14" in message for message in messages)
+    assert any("days 8 to 14 add up to 32621" in message for message in messages)
+
+
+def test_daily_arrivals_without_the_chart():
+    assert daily_arrivals(page("hotel_categorization_2019_Q1.txt"), 2019, 3) == []
+
+
+def test_hotel_categorization():
+    rows = {
+        name: (establishments, rooms)
+        for name, establishments, rooms in hotel_categorization(
+            page("hotel_categorization_2019_Q1.txt")
+        )
+    }
+    assert len(rows) == 17
+    assert rows["Guest House"] == (969, 10594)
+    # Labels wrapped over two lines, "Heritage" above "Bungalow 4 19"
+    assert rows["Heritage Bungalow"] == (4, 19)
+    stars = ["Five Star", "Four Star", "Three Star", "Two Star", "One Star"]
+    assert (
+        tuple(map(sum, zip(*(rows[star] for star in stars)))) == rows["Classified Tourist Hotels"]
+    )
+
+
+def test_room_distribution():
+    rows = room_distribution(page("room_distribution_2019_Q1.txt"), 2019, 3)
+    assert len(rows) == 24
+    assert rows[0] == [2019, 3, "none", "Ampara", 7, 95, "NA"]
+    assert {row[3] for row in rows} >= {"Colombo", "Nuwara Eliya", "Vavunia"}
+    assert [row for row in rows if row[3] == "Colombo"][0][4:6] == [45, 5353]
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from traveller.data.incremental import IncrementalTrendAggregator, period_of
+from traveller.data.trend_analyzer import MONTHS
+
+COUNTRIES = ["India", "China", "Germany", "France", "Russia"]
+
+
+def make_trend(seed=0, years=(2021, 2022, 2023)):
+    """Long format monthly trend with some country-months missing."""
+    rng = np.random.default_rng(seed)
+    rows = [
+        {"Year": year, "Month": month, "Country": country, "Arrivals": int(rng.integers(0, 5000))}
+        for year in years
+        for month in MONTHS
+        for country in COUNTRIES
+        if rng.random() > 0.15
+    ]
+    return pd.DataFrame(rows)
+
+
+def expected_frame(trend, window):
+    """The statistics computed directly with pandas over the whole grid."""
+    periods = period_of(trend["Year"], trend["Month"].map(MONTHS.index) + 1)
+    grid = (
+        pd.DataFrame(
+            {"Country": trend["Country"], "Period": periods, "Arrivals": trend["Arrivals"]}
+        )
+        .pivot_table(index="Country", columns="Period", values="Arrivals", aggfunc="sum")
+        .reindex(columns=range(periods.min(), periods.max() + 1))
+    )
+    known = grid.notna()
+    arrivals = grid.fillna(0).astype(float)
+    years = pd.Series(arrivals.columns // 12, index=arrivals.columns)
+    statistics = {
+        "Arrivals": arrivals,
+        "RunningTotal": arrivals.cumsum(axis=1),
+        "YTD": arrivals.T.groupby(years).cumsum().T,
+        "RollingMean": arrivals.T.rolling(window, min_periods=1).mean().T,
+    }
+    rows = known.stack()
+    rows = rows[rows].index
+    frame = pd.DataFrame(
+        {
+            "Year": rows.get_level_values("Period") // 12,
+            "Month": pd.Categorical(
+                [MONTHS[period % 12] for period in rows.get_level_values("Period")],
+                categories=MONTHS,
+                ordered=True,
+            ),
+            "Country": rows.get_level_values("Country"),
+        }
+    )
+    for name, values in statistics.items():
+        frame[name] = values.stack().loc[rows].to_numpy()
+    return frame.sort_values(["Year", "Month", "Country"]).reset_index(drop=True)
+
+
+def months_of(trend):
+    return [rows for _, rows in trend.groupby(["Year", "Month"], sort=False)]
+
+
+def test_full_update_matches_pandas():
+    trend = make_trend()
+    aggregator = IncrementalTrendAggregator(window=3)
+    aggregator.update(trend)
+    pd.testing.assert_frame_equal(aggregator.to_frame(), expected_frame(trend, 3))
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_monthly_updates_match_full_update(seed):
+    """Months in shuffled order, including ones before the first seen, then revisions."""
+    trend = make_trend(seed)
+    rng = np.random.default_rng(seed)
+    months = months_of(trend)
+    incremental = IncrementalTrendAggregator(window=3)
+    for index in rng.permutation(len(months)):
+        incremental.update(months[index])
+
+    # Revise a few earlier months, adding the countries missing from their first publication
+    for index in rng.choice(len(months) // 2, size=3, replace=False):
+        year, month = months[index][["Year", "Month"]].iloc[0]
+        months[index] = pd.DataFrame(
+            {
+                "Year": year,
+                "Month": month,
+                "Country": COUNTRIES,
+                "Arrivals": rng.integers(0, 5000, size=len(COUNTRIES)),
+            }
+        )
+        incremental.update(months[index])
+    revised = pd.concat(months, ignore_index=True)
+
+    full = IncrementalTrendAggregator(window=3)
+    full.update(revised)
+    pd.testing.assert_frame_equal(incremental.to_frame(), full.to_frame())
+    pd.testing.assert_frame_equal(incremental.to_frame(), expected_frame(revised, 3))
+
+
+def test_save_and_load(tmp_path):
+    trend = make_trend(4)
+    months = months_of(trend)
+    path = str(tmp_path / "trend_state.npz")
+
+    aggregator = IncrementalTrendAggregator.load(path, window=4)
+    for month in months[: len(months) // 2]:
+        aggregator.update(month)
+    aggregator.save(path)
+
+    restored = IncrementalTrendAggregator.load(path)
+    assert restored.window == 4
+    pd.testing.assert_frame_equal(restored.to_frame(), aggregator.to_frame())
+    for month in months[len(months) // 2 :]:
+        restored.update(month)
+    pd.testing.assert_frame_equal(restored.to_frame(), expected_frame(trend, 4))
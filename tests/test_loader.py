@@ -0,0 +1,50 @@
+import glob
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from traveller.data.loader import COUNT_COLUMNS, DataLoader
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+ARRIVAL_CSVS = sorted(
+    glob.glob(os.path.join(DATA_DIR, "arrival", "all_countries", "all_country_arrivals_*.csv"))
+)
+
+
+@pytest.mark.parametrize("path", ARRIVAL_CSVS[:1] + ARRIVAL_CSVS[-1:])
+def test_batches_match_load_data(path):
+    """Small blocks, so the file is streamed as several batches"""
+    loader = DataLoader(path, block_size=4096)
+    batches = list(loader.iter_batches())
+    assert len(batches) > 1
+    table = pa.Table.from_batches(batches)
+
+    loader.load_data()
+    expected = loader.get_data().to_pandas()
+    assert table.schema.names == list(expected.columns)
+    for name in table.schema.names:
+        column = table.column(name)
+        if name in COUNT_COLUMNS:
+            assert column.type == pa.int64()
+            values = pd.to_numeric(expected[name].astype(str).str.replace(",", ""), errors="coerce")
+            assert column.to_pylist() == [None if pd.isna(v) else int(v) for v in values]
+        else:
+            assert column.type == pa.string()
+            assert column.to_pylist() == expected[name].astype(str).tolist()
+
+
+def test_non_integer_counts_are_null(tmp_path):
+    path = tmp_path / "arrivals.csv"
+    path.write_text(
+        "Index,Country,January,February,Total\n"
+        '1,India,"1,234",12.5,1246.5\n'
+        "2,China,7,n/a,7.0\n"
+        "Total,All,1241,,1253\n"
+    )
+    table = pa.Table.from_batches(list(DataLoader(str(path)).iter_batches()))
+    assert table.column("Index").to_pylist() == ["1", "2", "Total"]
+    assert table.column("January").to_pylist() == [1234, 7, 1241]
+    assert table.column("February").to_pylist() == [None, None, None]
+    assert table.column("Total").to_pylist() == [None, 7, 1253]
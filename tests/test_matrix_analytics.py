@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from traveller.data.matrix_analytics import ArrivalMatrix
+from traveller.data.trend_analyzer import MONTHS, MonthlyTrendAnalyzer
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "arrival", "all_countries")
+COUNTRIES = ["China", "France", "Germany", "India"]
+
+
+def make_trend(seed=0, years=(2021, 2022, 2023)):
+    rng = np.random.default_rng(seed)
+    rows = [
+        {"Year": year, "Month": month, "Country": country, "Arrivals": int(rng.integers(0, 5))}
+        for year in years
+        for month in MONTHS
+        for country in COUNTRIES
+    ]
+    trend = pd.DataFrame(rows)
+    totals = trend.groupby(["Year", "Month"], sort=False)["Arrivals"].sum().reset_index()
+    return pd.concat([trend, totals.assign(Country="Total")], ignore_index=True)
+
+
+def expected(trend, window=3):
+    """Every metric computed with plain pandas on a countries x periods frame."""
+    trend = trend[trend["Country"] != "Total"]
+    periods = (trend["Year"] - trend["Year"].min()) * 12 + trend["Month"].map(MONTHS.index)
+    grid = (
+        trend.assign(Period=periods)
+        .pivot_table(index="Country", columns="Period", values="Arrivals", aggfunc="sum")
+        .astype(float)
+    )
+    previous = grid.shift(12, axis=1)
+    by_month = grid.T.groupby(grid.columns % 12).mean().T
+    return {
+        "YoYGrowth": ((grid - previous) / previous.where(previous != 0)).to_numpy(),
+        "RollingMean": grid.T.rolling(window, min_periods=1).mean().T.to_numpy(),
+        "SeasonalIndex": by_month.div(by_month.mean(axis=1), axis=0).to_numpy(),
+        "MarketShare": (grid / grid.sum()).to_numpy(),
+        "Rank": grid.rank(ascending=False, method="first").astype(int).to_numpy(),
+    }
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_metrics_match_pandas(seed):
+    trend = make_trend(seed)
+    matrix = ArrivalMatrix.from_trend(trend)
+    assert matrix.countries.tolist() == COUNTRIES
+    assert matrix.years.tolist() == [2021, 2022, 2023]
+
+    metrics = expected(trend)
+    np.testing.assert_allclose(matrix.yoy_growth(), metrics["YoYGrowth"])
+    np.testing.assert_allclose(matrix.rolling_mean(3), metrics["RollingMean"])
+    np.testing.assert_allclose(matrix.seasonal_index(), metrics["SeasonalIndex"])
+    np.testing.assert_allclose(matrix.market_share(), metrics["MarketShare"])
+    np.testing.assert_array_equal(matrix.rank(), metrics["Rank"])
+
+
+@pytest.mark.parametrize("year", [2020, 2021])
+def test_total_rows_of_the_csvs_are_dropped(year):
+    data = pd.read_csv(os.path.join(DATA_DIR, f"all_country_arrivals_{year}.csv"))
+    trend = MonthlyTrendAnalyzer(data).analyze_trend(year)
+    assert trend["Country"].str.upper().eq("TOTAL").any()
+
+    matrix = ArrivalMatrix.from_trend(trend)
+    assert "TOTAL" not in [country.upper() for country in matrix.countries]
+    shares = matrix.market_share()
+    months = ~np.isnan(shares).all(axis=0)
+    np.testing.assert_allclose(np.nansum(shares, axis=0)[months], 1.0)
+    assert matrix.rank().min() == 1
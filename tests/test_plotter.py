@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from traveller.data.trend_analyzer import MONTHS
+from traveller.plot.plotter import OTHER, collapse_top_n, decimate
+
+GROUP_COLS = ["Year", "Month"]
+
+
+def make_trend(countries=20, years=(2023, 2024), seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        [
+            {"Year": year, "Month": month, "Country": f"Country {number:02d}", "Arrivals": value}
+            for year in years
+            for month in MONTHS
+            for number in range(countries)
+            for value in [int(rng.integers(0, 1000)) * (number + 1)]
+        ]
+    )
+
+
+def make_daily(days=365, countries=("France", "India"), seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        [
+            {"Country": country, "Day": day, "Arrivals": float(rng.normal(100, 30))}
+            for country in countries
+            for day in range(days)
+        ]
+    )
+
+
+def test_collapse_top_n():
+    trend = make_trend()
+    collapsed = collapse_top_n(trend, "Arrivals", 5, GROUP_COLS)
+
+    top = trend.groupby("Country")["Arrivals"].sum().nlargest(5).index
+    assert set(collapsed["Country"]) == set(top) | {OTHER}
+    periods = trend[GROUP_COLS].drop_duplicates()
+    other = collapsed[collapsed["Country"] == OTHER]
+    # One "Other" row per period, in period order
+    assert other[GROUP_COLS].reset_index(drop=True).equals(periods.reset_index(drop=True))
+    assert not collapsed.duplicated(GROUP_COLS + ["Country"]).any()
+
+    # The totals of every period and country are kept
+    by_period = trend.groupby(GROUP_COLS, sort=False)["Arrivals"].sum()
+    assert collapsed.groupby(GROUP_COLS, sort=False)["Arrivals"].sum().equals(by_period)
+    kept = trend[trend["Country"].isin(top)].set_index(GROUP_COLS + ["Country"])["Arrivals"]
+    assert collapsed.set_index(GROUP_COLS + ["Country"])["Arrivals"].loc[kept.index].equals(kept)
+
+
+@pytest.mark.parametrize("top_n", [20, 50])
+def test_collapse_top_n_with_few_countries(top_n):
+    trend = make_trend()
+    assert collapse_top_n(trend, "Arrivals", top_n, GROUP_COLS) is trend
+
+
+@pytest.mark.parametrize("max_points", [2, 3, 50, 101])
+def test_decimate(max_points):
+    daily = make_daily()
+    decimated = decimate(daily, "Arrivals", max_points, ["Country"])
+
+    for country, series in daily.groupby("Country"):
+        kept = decimated[decimated["Country"] == country]
+        assert 0 < len(kept) <= max_points
+        # Rows keep their x order
+        assert kept["Day"].is_monotonic_increasing
+
+        # Each of the max_points // 2 buckets keeps its low and its high
+        buckets = max_points // 2
+        bucket = np.arange(len(series)) * buckets // len(series)
+        values = series["Arrivals"].to_numpy()
+        for number in range(buckets):
+            in_bucket = values[bucket == number]
+            assert in_bucket.min() in kept["Arrivals"].to_numpy()
+            assert in_bucket.max() in kept["Arrivals"].to_numpy()
+        assert kept["Arrivals"].min() == values.min()
+        assert kept["Arrivals"].max() == values.max()
+
+
+def test_decimate_keeps_short_series():
+    """Only the series over max_points are thinned"""
+    daily = pd.concat(
+        [make_daily(days=365, countries=["France"]), make_daily(days=30, countries=["Peru"])]
+    )
+    decimated = decimate(daily, "Arrivals", 60, ["Country"])
+    assert len(decimated[decimated["Country"] == "France"]) <= 60
+    peru = decimated[decimated["Country"] == "Peru"].reset_index(drop=True)
+    assert peru.equals(daily[daily["Country"] == "Peru"].reset_index(drop=True))
+
+
+@pytest.mark.parametrize("max_points", [730, 1000])
+def test_decimate_small_input(max_points):
+    daily = make_daily()
+    assert decimate(daily, "Arrivals", max_points, ["Country"]) is daily
+
+
+def test_decimate_needs_two_points():
+    with pytest.raises(ValueError, match="at least 2"):
+        decimate(make_daily(), "Arrivals", 1, ["Country"])
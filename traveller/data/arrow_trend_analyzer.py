@@ -0,0 +1,93 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from traveller.data.trend_analyzer import MONTHS
+
+# Whole or decimal numbers, after thousands separators have been stripped
+NUMERIC_PATTERN = r"^-?\d+(\.\d*)?$"
+
+
+def to_numeric(column):
+    """Arrow counterpart of ``pd.to_numeric(column.str.replace(",", ""), errors="coerce")``.
+
+    Numeric columns are passed through, text is stripped of thousands separators and
+    anything that is not a number becomes null.
+    """
+    if pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+        return pc.cast(column, pa.float64())
+    if pa.types.is_null(column.type):
+        return pc.cast(column, pa.float64())
+
+    text = pc.utf8_trim_whitespace(pc.replace_substring(pc.cast(column, pa.string()), ",", ""))
+    valid = pc.match_substring_regex(text, NUMERIC_PATTERN)
+    return pc.cast(pc.if_else(valid, text, pa.scalar(None, pa.string())), pa.float64())
+
+
+class ArrowMonthlyTrendAnalyzer:
+    """Monthly trend analysis on a ``pyarrow.Table`` using Arrow compute kernels.
+
+    Produces the same long format trend as ``MonthlyTrendAnalyzer`` (Year, Month,
+    Country, Arrivals ordered by year, month and country) without converting the
+    wide table to pandas first. The input is the table returned by
+    ``DataLoader.get_data()``.
+    """
+
+    def __init__(self, table):
+        self.table = table
+
+    def transform_data(self, year):
+        table = self.table
+
+        # Drop the 'Total' column if it exists
+        if "Total" in table.column_names:
+            table = table.drop_columns(["Total"])
+
+        # Filter out rows where 'Country' is empty or null
+        country = pc.cast(table["Country"], pa.string())
+        table = table.filter(
+            pc.and_kleene(
+                pc.is_valid(country),
+                pc.greater(pc.utf8_length(pc.utf8_trim_whitespace(country)), 0),
+            )
+        )
+        num_rows = table.num_rows
+
+        if "Year" in table.column_names:
+            years = pc.cast(table["Year"], pa.int64())
+        else:
+            years = pa.repeat(pa.scalar(year, pa.int64()), num_rows)
+
+        # Convert wide format to long format, one slice per month
+        slices = []
+        for month_number, month in enumerate(MONTHS, 1):
+            slices.append(
+                pa.table(
+                    {
+                        "Year": years,
+                        "MonthNumber": pa.repeat(pa.scalar(month_number, pa.int8()), num_rows),
+                        "Month": pa.repeat(pa.scalar(month, pa.string()), num_rows),
+                        "Country": pc.cast(table["Country"], pa.string()),
+                        "Arrivals": pc.fill_null(to_numeric(table[month]), 0.0),
+                    }
+                )
+            )
+        return pa.concat_tables(slices)
+
+    def analyze_trend(self, year):
+        long_table = self.transform_data(year)
+
+        # Group by year, month, and country, then sum the arrivals
+        trend = long_table.group_by(["Year", "MonthNumber", "Month", "Country"]).aggregate(
+            [("Arrivals", "sum")]
+        )
+        trend = trend.sort_by(
+            [("Year", "ascending"), ("MonthNumber", "ascending"), ("Country", "ascending")]
+        )
+        return pa.table(
+            {
+                "Year": trend["Year"],
+                "Month": trend["Month"],
+                "Country": trend["Country"],
+                "Arrivals": trend["Arrivals_sum"],
+            }
+        )
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+
+import pyarrow as pa
+
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArrowFileCache:
+    """Cache of typed Arrow IPC (Feather v2) copies of parsed source files.
+
+    Each source is keyed on its absolute path and fingerprinted by size, mtime and
+    content hash. A matching size and mtime is trusted without hashing, a changed
+    mtime with unchanged content only refreshes the fingerprint, and a changed source
+    is re-converted, as is a cached copy that cannot be read. Cached files are written
+    uncompressed so they can be memory mapped instead of being read and decoded.
+
+    Example:
+        >>> cache = ArrowFileCache(".traveller_cache")
+        >>> table = cache.load("data/arrival/all_countries/all_country_arrivals_2019.csv",
+        ...                    pyarrow.csv.read_csv)
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _paths(self, source):
+        key = hashlib.sha256(os.path.abspath(source).encode()).hexdigest()[:32]
+        base = os.path.join(self.cache_dir, key)
+        return base + ".arrow", base + ".json"
+
+    def _fingerprint(self, source, stat, sha256=None):
+        return {
+            "path": os.path.abspath(source),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256 or file_sha256(source),
+        }
+
+    def _write_json(self, path, data):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def is_fresh(self, source):
+        """Whether a cached copy of ``source`` exists and matches its current contents."""
+        data_path, meta_path = self._paths(source)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return False
+
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            size, mtime_ns, cached_sha256 = meta["size"], meta["mtime_ns"], meta["sha256"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # Unreadable or partly written, the copy is rebuilt
+            return False
+        stat = os.stat(source)
+        if size != stat.st_size:
+            return False
+        if mtime_ns == stat.st_mtime_ns:
+            return True
+
+        # Touched but possibly unchanged, only the content hash can tell
+        sha256 = file_sha256(source)
+        if sha256 != cached_sha256:
+            return False
+        self._write_json(meta_path, self._fingerprint(source, stat, sha256))
+        return True
+
+    def read(self, source):
+        """Memory map the cached copy of ``source``."""
+        data_path, _ = self._paths(source)
+        # The table's buffers point into the map and keep it alive
+        return pa.ipc.open_file(pa.memory_map(data_path, "r")).read_all()
+
+    def write(self, source, table):
+        """Store ``table`` as the cached copy of ``source``."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data_path, meta_path = self._paths(source)
+        stat = os.stat(source)
+
+        tmp_path = data_path + ".tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, data_path)
+        self._write_json(meta_path, self._fingerprint(source, stat))
+
+    def load(self, source, parse):
+        """Return the cached table of ``source``, converting it with ``parse`` when stale."""
+        if self.is_fresh(source):
+            try:
+                return self.read(source)
+            except (OSError, pa.ArrowInvalid):
+                pass  # A corrupt or truncated copy, convert the source again
+        table = parse(source)
+        self.write(source, table)
+        return self.read(source)
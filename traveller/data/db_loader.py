@@ -0,0 +1,142 @@
+import os
+import threading
+from urllib.parse import urlparse
+
+import pyarrow as pa
+import pyarrow.csv as pv
+
+from traveller.data.trend_analyzer import MONTHS
+
+# Tables of the touristats Django app in traveller_service
+ALL_COUNTRY_STATS_TABLE = "touristats_allcountrystats"
+TIME_FRAME_TABLE = "touristats_timeframe"
+
+ARRIVALS_SCHEMA = pa.schema(
+    [("Country", pa.string()), ("Year", pa.int64())] + [(month, pa.int64()) for month in MONTHS]
+)
+
+
+def arrivals_query(year=None):
+    """SQL pivoting AllCountryStats into the wide Country, Year, January..December shape."""
+    months = ",\n".join(
+        f'    SUM(s.passengers) FILTER (WHERE t.month = {month_number}) AS "{month}"'
+        for month_number, month in enumerate(MONTHS, 1)
+    )
+    where = "s.country_id <> 'TOTAL'"
+    if year is not None:
+        where += f" AND t.year = {int(year)}"
+    return (
+        f'SELECT MIN(s.country) AS "Country", t.year AS "Year",\n{months}\n'
+        f"FROM {ALL_COUNTRY_STATS_TABLE} s\n"
+        f"JOIN {TIME_FRAME_TABLE} t ON t.id = s.timeframe_id\n"
+        f"WHERE {where}\n"
+        f"GROUP BY s.country_id, t.year\n"
+        f'ORDER BY t.year, "Country"'
+    )
+
+
+class DatabaseLoader:
+    """Load the touristats arrivals from PostgreSQL straight into a ``pyarrow.Table``.
+
+    The pivoted query result is streamed out of the server with ``COPY ... TO STDOUT``
+    and parsed by Arrow's CSV reader in record batches, so no ORM objects or per row
+    Python values are created. The table has the wide shape of the all-country CSVs
+    plus a Year column and can be passed to ``MonthlyTrendAnalyzer`` (via
+    ``to_pandas()``) or ``ArrowMonthlyTrendAnalyzer``.
+
+    Requires ``psycopg2`` from the ``db`` extra.
+
+    Example:
+        >>> loader = DatabaseLoader(year=2023)  # reads DATABASE_URL from the environment
+        >>> loader.load_data()
+        >>> trend = ArrowMonthlyTrendAnalyzer(loader.get_data()).analyze_trend(2023)
+    """
+
+    def __init__(self, database_url=None, year=None, block_size=1 << 20):
+        self.database_url = database_url or os.getenv("DATABASE_URL")
+        self.year = year
+        self.block_size = block_size
+        self.table = None
+
+    def _connect(self):
+        try:
+            import psycopg2
+        except ImportError as e:
+            raise ImportError(
+                "DatabaseLoader requires psycopg2, install the `db` extra (psycopg2-binary)"
+            ) from e
+
+        url = urlparse(self.database_url)
+        return psycopg2.connect(
+            dbname=url.path.lstrip("/"),
+            user=url.username,
+            password=url.password,
+            host=url.hostname,
+            port=url.port or 5432,
+        )
+
+    def iter_batches(self):
+        """Yield the query result as ``pyarrow.RecordBatch`` objects.
+
+        ``COPY`` writes into a pipe from a background thread while the CSV reader parses
+        the other end, so batches are yielded as the rows arrive and only about one
+        ``block_size`` of the output is held at a time.
+        """
+        connection = self._connect()
+        read_fd, write_fd = os.pipe()
+        errors = []
+
+        def copy():
+            try:
+                with os.fdopen(write_fd, "wb") as sink, connection.cursor() as cursor:
+                    cursor.copy_expert(
+                        f"COPY ({arrivals_query(self.year)}) TO STDOUT WITH (FORMAT csv, HEADER)",
+                        sink,
+                    )
+            except BrokenPipeError:
+                pass  # The reader stopped before the end of the output
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=copy, daemon=True)
+        thread.start()
+        try:
+            with os.fdopen(read_fd, "rb") as source:
+                reader = pv.open_csv(
+                    source,
+                    read_options=pv.ReadOptions(block_size=self.block_size),
+                    convert_options=pv.ConvertOptions(column_types=ARRIVALS_SCHEMA),
+                )
+                try:
+                    for batch in reader:
+                        yield batch
+                except GeneratorExit:
+                    # Closed early. Stop the query before closing the pipe, the reader may
+                    # be blocked on it waiting for more output.
+                    connection.cancel()
+                    raise
+        except Exception as e:
+            # A failed COPY cuts the output short, which is what the reader complains about
+            thread.join()
+            if errors:
+                raise errors[0] from e
+            raise
+        finally:
+            thread.join()
+            connection.close()
+        if errors:
+            raise errors[0]
+
+    def load_data(self):
+        try:
+            self.table = pa.Table.from_batches(list(self.iter_batches()), ARRIVALS_SCHEMA)
+            print("Data loaded successfully.")
+        except Exception as e:
+            print(f"An error occurred while loading the data: {e}")
+
+    def get_data(self):
+        if self.table is not None:
+            return self.table
+        else:
+            print("Data not loaded. Please call load_data() first.")
+            return None
@@ -0,0 +1,205 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from traveller.data.trend_analyzer import MONTHS
+
+
+def period_of(year, month):
+    """Months since year 0, so consecutive months are consecutive integers."""
+    return year * 12 + month - 1
+
+
+class IncrementalTrendAggregator:
+    """Monthly arrivals per country with derived statistics, updated one month at a time.
+
+    The state is a countries x periods grid of arrivals plus the running total, the
+    year-to-date total and the rolling mean over ``window`` months of every cell, with
+    months a country has no rows for counted as zero.
+    ``update`` takes the rows of a newly published (or revised) month in the long
+    format produced by ``MonthlyTrendAnalyzer`` and only recomputes the cells those
+    rows affect: a new month costs time proportional to its own rows, a revision of an
+    older month additionally touches the later months of the same countries. The state
+    can be persisted with ``save`` and restored with ``load``.
+
+    Example:
+        >>> aggregator = IncrementalTrendAggregator.load("trend_state.npz")
+        >>> aggregator.update(trend[trend["Month"] == "March"])
+        >>> aggregator.save("trend_state.npz")
+        >>> aggregator.to_frame()
+    """
+
+    STATISTICS = ["Arrivals", "RunningTotal", "YTD", "RollingMean"]
+
+    def __init__(self, window=3):
+        self.window = window
+        self.countries = {}
+        self.origin = None
+        # Number of periods (columns) in use and allocated
+        self.size = 0
+        self.known = np.zeros((0, 0), dtype=bool)
+        self.values = {name: np.zeros((0, 0)) for name in self.STATISTICS}
+        # Last period each country's derived statistics are computed up to
+        self.computed_until = np.zeros(0, dtype=np.int64)
+
+    def _grow(self, rows, columns, shift=0):
+        """Ensure room for ``rows`` x ``columns`` cells, moving used columns right by ``shift``.
+
+        Capacity at least doubles, so appending months and countries is amortized O(1).
+        """
+        old_rows, old_columns = self.known.shape
+        if rows <= old_rows and columns <= old_columns and not shift:
+            return
+        new_rows = max(rows, 2 * old_rows, 8) if rows > old_rows else old_rows
+        new_columns = max(columns, 2 * old_columns, 24) if columns > old_columns else old_columns
+        # At most the first ``columns - shift`` existing columns are in use
+        kept = min(columns - shift, old_columns)
+
+        known = np.zeros((new_rows, new_columns), dtype=bool)
+        known[:old_rows, shift : shift + kept] = self.known[:, :kept]
+        self.known = known
+        for name, array in self.values.items():
+            grown = np.zeros((new_rows, new_columns))
+            grown[:old_rows, shift : shift + kept] = array[:, :kept]
+            self.values[name] = grown
+        computed_until = np.full(new_rows, -1, dtype=np.int64)
+        computed_until[:old_rows] = self.computed_until + shift
+        computed_until[:old_rows][self.computed_until < 0] = -1
+        self.computed_until = computed_until
+
+    def _normalize(self, rows):
+        if hasattr(rows, "to_pandas"):
+            rows = rows.to_pandas()
+        months = rows["Month"]
+        if not pd.api.types.is_integer_dtype(months):
+            months = months.astype(str).map(
+                {month: number for number, month in enumerate(MONTHS, 1)}
+            )
+        frame = pd.DataFrame(
+            {
+                "Country": rows["Country"].astype(str).to_numpy(),
+                "Period": period_of(
+                    rows["Year"].astype(int).to_numpy(), months.astype(int).to_numpy()
+                ),
+                "Arrivals": pd.to_numeric(rows["Arrivals"], errors="coerce").fillna(0).to_numpy(),
+            }
+        )
+        return frame.groupby(["Country", "Period"], sort=False)["Arrivals"].sum().reset_index()
+
+    def update(self, rows):
+        """Set (or replace) the arrivals in ``rows`` and refresh the affected statistics.
+
+        Args:
+            rows: pandas DataFrame or pyarrow Table with Year, Month (name or number),
+                Country and Arrivals columns, e.g. one month of a trend.
+        """
+        frame = self._normalize(rows)
+        if frame.empty:
+            return
+
+        first, last = int(frame["Period"].min()), int(frame["Period"].max())
+        shift = 0
+        if self.origin is None:
+            self.origin = first
+        elif first < self.origin:
+            shift = self.origin - first
+            self.origin = first
+
+        for country in frame["Country"].unique():
+            if country not in self.countries:
+                self.countries[country] = len(self.countries)
+        self.size = max(self.size + shift, last - self.origin + 1)
+        self._grow(len(self.countries), self.size, shift)
+
+        if shift:
+            # Months before the first one seen are rare, so simply recompute every country
+            for row in np.flatnonzero(self.computed_until >= 0):
+                self._recompute(row, 0, self.computed_until[row])
+
+        rows_index = frame["Country"].map(self.countries).to_numpy()
+        columns = frame["Period"].to_numpy() - self.origin
+        self.values["Arrivals"][rows_index, columns] = frame["Arrivals"].to_numpy()
+        self.known[rows_index, columns] = True
+
+        # From the earliest changed (or not yet computed) column to the latest known one
+        changed = pd.DataFrame({"row": rows_index, "column": columns}).groupby("row")["column"]
+        for row, start, end in zip(changed.min().index, changed.min(), changed.max()):
+            computed_until = self.computed_until[row]
+            self._recompute(row, min(start, computed_until + 1), max(end, computed_until))
+
+    def _recompute(self, row, start, end):
+        """Recompute the derived statistics of one country over columns start..end."""
+        arrivals = self.values["Arrivals"][row]
+        previous = self.values["RunningTotal"][row, start - 1] if start > 0 else 0.0
+        self.values["RunningTotal"][row, start : end + 1] = previous + np.cumsum(
+            arrivals[start : end + 1]
+        )
+
+        # Year to date restarts every January, so begin at the January of ``start``
+        january = start - (self.origin + start) % 12
+        first = max(january, 0)
+        segment = arrivals[first : end + 1]
+        ytd = np.cumsum(segment)
+        year_starts = np.flatnonzero((self.origin + np.arange(first, end + 1)) % 12 == 0)
+        for year_start in year_starts:
+            if year_start > 0:
+                ytd[year_start:] -= ytd[year_start - 1]
+        self.values["YTD"][row, first : end + 1] = ytd
+
+        low = max(start - self.window + 1, 0)
+        window_sums = np.convolve(arrivals[low : end + 1], np.ones(self.window))[
+            start - low : end - low + 1
+        ]
+        counts = np.minimum(np.arange(start, end + 1) + 1, self.window)
+        self.values["RollingMean"][row, start : end + 1] = window_sums / counts
+
+        self.computed_until[row] = end
+
+    def to_frame(self):
+        """Long format trend with the derived statistics of every known cell."""
+        rows, columns = np.nonzero(self.known[: len(self.countries), : self.size])
+        periods = columns + (self.origin or 0)
+        names = np.array(list(self.countries), dtype=object)
+        frame = pd.DataFrame(
+            {
+                "Year": periods // 12,
+                "Month": pd.Categorical(
+                    np.array(MONTHS, dtype=object)[periods % 12], categories=MONTHS, ordered=True
+                ),
+                "Country": names[rows] if len(rows) else np.array([], dtype=object),
+            }
+        )
+        for name in self.STATISTICS:
+            frame[name] = self.values[name][rows, columns]
+        return frame.sort_values(["Year", "Month", "Country"]).reset_index(drop=True)
+
+    def save(self, path):
+        rows, size = len(self.countries), self.size
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            window=self.window,
+            origin=-1 if self.origin is None else self.origin,
+            countries=np.array(list(self.countries), dtype=str),
+            known=self.known[:rows, :size],
+            computed_until=self.computed_until[:rows],
+            **{name: array[:rows, :size] for name, array in self.values.items()},
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, window=3):
+        """Restore a saved state, or start an empty one if ``path`` does not exist."""
+        if not os.path.exists(path):
+            return cls(window=window)
+        with np.load(path) as state:
+            aggregator = cls(window=int(state["window"]))
+            origin = int(state["origin"])
+            aggregator.origin = None if origin < 0 else origin
+            aggregator.countries = {name: index for index, name in enumerate(state["countries"])}
+            aggregator.known = state["known"].copy()
+            aggregator.size = aggregator.known.shape[1]
+            aggregator.computed_until = state["computed_until"].copy()
+            aggregator.values = {name: state[name].copy() for name in cls.STATISTICS}
+        return aggregator
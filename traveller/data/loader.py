@@ -1,14 +1,47 @@
+import csv
+
+import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.csv as pv
 
+from traveller.data.arrow_trend_analyzer import to_numeric
+from traveller.data.cache import ArrowFileCache
+from traveller.data.trend_analyzer import MONTHS
+
+# Count columns that may hold thousands separators ("12,345")
+COUNT_COLUMNS = MONTHS + ["Total"]
+
+
+def to_count(column):
+    """``to_numeric`` as int64, with values that are not whole numbers (e.g. "12.5") null."""
+    values = to_numeric(column)
+    whole = pc.equal(pc.floor(values), values)
+    return pc.cast(pc.if_else(whole, values, pa.scalar(None, pa.float64())), pa.int64())
+
 
 class DataLoader:
-    def __init__(self, file_path):
+    def __init__(self, file_path, cache_dir=None, block_size=None, use_threads=True):
+        """
+        Args:
+            file_path: Path to the CSV file.
+            cache_dir: Optional directory for a typed, memory mapped copy of the parsed
+                CSV. The copy is reused until the CSV changes.
+            block_size: Bytes of CSV parsed per record batch by ``iter_batches()``.
+                Defaults to Arrow's block size (1 MiB).
+            use_threads: Parse blocks on Arrow's thread pool.
+        """
         self.file_path = file_path
+        self.cache = ArrowFileCache(cache_dir) if cache_dir else None
+        self.block_size = block_size
+        self.use_threads = use_threads
         self.table = None
 
     def load_data(self):
         try:
-            self.table = pv.read_csv(self.file_path)
+            if self.cache is not None:
+                self.table = self.cache.load(self.file_path, pv.read_csv)
+            else:
+                self.table = pv.read_csv(self.file_path)
             print("Data loaded successfully.")
         except Exception as e:
             print(f"An error occurred while loading the data: {e}")
@@ -19,3 +52,32 @@ class DataLoader:
         else:
             print("Data not loaded. Please call load_data() first.")
             return None
+
+    def iter_batches(self):
+        """Stream the CSV as record batches, holding only one block in memory at a time.
+
+        Every column is typed up front, so a late block cannot contradict the types
+        inferred from the first one (e.g. a "Total" row label in a numeric Index
+        column). Other columns stay strings, and count columns are cleaned of
+        thousands separators as each batch is parsed and come out as int64 (null where
+        the value is not a whole number). Analyzers can use the batches without their own
+        string cleaning pass.
+        """
+        read_options = pv.ReadOptions(use_threads=self.use_threads)
+        if self.block_size:
+            read_options.block_size = self.block_size
+        with open(self.file_path, newline="") as f:
+            header = next(csv.reader(f), [])
+        column_types = {column: pa.string() for column in header}
+
+        reader = pv.open_csv(
+            self.file_path,
+            read_options=read_options,
+            convert_options=pv.ConvertOptions(column_types=column_types),
+        )
+        for batch in reader:
+            columns = [
+                to_count(column) if name in COUNT_COLUMNS else column
+                for name, column in zip(batch.schema.names, batch.columns)
+            ]
+            yield pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+from traveller.data.trend_analyzer import MONTHS
+
+
+class ArrivalMatrix:
+    """Arrivals as a dense countries x periods matrix with vectorized analytics.
+
+    Periods are consecutive months from January of the first year to December of the
+    last one, so column ``p`` is month ``p % 12`` of year ``years[0] + p // 12``. Every
+    metric is computed for all countries at once with NumPy array operations and has
+    the same shape as the matrix, except ``seasonal_index`` (countries x 12). Missing
+    months are zero.
+
+    Example:
+        >>> trend = MonthlyTrendAnalyzer(data).analyze_trend(2023)
+        >>> matrix = ArrivalMatrix.from_trend(trend)
+        >>> TrendPlotter().plot_trend(
+        ...     matrix.to_long(), "Month", "YoYGrowth", "YoY growth", "Month", "Growth", "Year"
+        ... )
+    """
+
+    def __init__(self, countries, first_year, values):
+        self.countries = np.asarray(countries, dtype=object)
+        self.first_year = first_year
+        self.values = np.asarray(values, dtype=np.float64)
+
+    @classmethod
+    def from_trend(cls, trend):
+        """Pivot a long format trend (Year, Month, Country, Arrivals) into a matrix.
+
+        Accepts the output of ``MonthlyTrendAnalyzer`` or ``ArrowMonthlyTrendAnalyzer``.
+        Duplicate cells are summed. The "Total" rows some CSVs have ("TOTAL" in others)
+        are dropped, so they neither rank as a country nor halve every share.
+        """
+        if hasattr(trend, "to_pandas"):
+            trend = trend.to_pandas()
+        trend = trend[trend["Country"].astype(str).str.strip().str.upper() != "TOTAL"]
+        months = trend["Month"]
+        if not pd.api.types.is_integer_dtype(months):
+            months = months.astype(str).map({month: index for index, month in enumerate(MONTHS)})
+        else:
+            months = months - 1
+        years = trend["Year"].astype(int).to_numpy()
+
+        country_codes, countries = pd.factorize(trend["Country"].astype(str), sort=True)
+        first_year = int(years.min()) if len(years) else 0
+        periods = (years - first_year) * 12 + months.astype(int).to_numpy()
+        num_periods = (int(years.max()) - first_year + 1) * 12 if len(years) else 0
+
+        values = np.zeros((len(countries), num_periods))
+        arrivals = pd.to_numeric(trend["Arrivals"], errors="coerce").fillna(0).to_numpy()
+        np.add.at(values, (country_codes, periods), arrivals)
+        return cls(countries, first_year, values)
+
+    @property
+    def years(self):
+        return np.arange(self.first_year, self.first_year + self.values.shape[1] // 12)
+
+    def yoy_growth(self):
+        """Growth over the same month of the previous year, NaN for the first year and 0/0."""
+        growth = np.full_like(self.values, np.nan)
+        previous = self.values[:, :-12]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth[:, 12:] = np.where(
+                previous != 0, (self.values[:, 12:] - previous) / previous, np.nan
+            )
+        return growth
+
+    def rolling_mean(self, window=3):
+        """Mean over the last ``window`` months, over fewer months at the start."""
+        totals = np.cumsum(self.values, axis=1)
+        sums = totals.copy()
+        sums[:, window:] -= totals[:, :-window]
+        counts = np.minimum(np.arange(1, self.values.shape[1] + 1), window)
+        return sums / counts
+
+    def seasonal_index(self):
+        """Average arrivals of each calendar month relative to the average month.
+
+        A value of 1.2 for July means July is 20% above the country's monthly average.
+        """
+        by_month = self.values.reshape(len(self.countries), -1, 12).mean(axis=1)
+        average = by_month.mean(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(average != 0, by_month / average, np.nan)
+
+    def market_share(self):
+        """Share of each country in the month's total arrivals."""
+        totals = self.values.sum(axis=0, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(totals != 0, self.values / totals, np.nan)
+
+    def rank(self):
+        """Rank of each country within the month, 1 for the most arrivals.
+
+        Ties are broken by country name.
+        """
+        order = np.argsort(-self.values, axis=0, kind="stable")
+        ranks = np.empty_like(order)
+        positions = np.broadcast_to(np.arange(1, len(self.countries) + 1)[:, None], order.shape)
+        np.put_along_axis(ranks, order, positions, axis=0)
+        return ranks
+
+    def metrics(self, window=3):
+        return {
+            "Arrivals": self.values,
+            "YoYGrowth": self.yoy_growth(),
+            "RollingMean": self.rolling_mean(window),
+            "MarketShare": self.market_share(),
+            "Rank": self.rank(),
+        }
+
+    def to_long(self, window=3):
+        """Long format frame with Year, Month, Country and one column per metric.
+
+        The frame can be passed to ``TrendPlotter.plot_trend`` with any metric as ``y_col``.
+        """
+        num_countries, num_periods = self.values.shape
+        periods = np.tile(np.arange(num_periods), num_countries)
+        frame = pd.DataFrame(
+            {
+                "Year": self.first_year + periods // 12,
+                "Month": pd.Categorical(
+                    np.asarray(MONTHS, dtype=object)[periods % 12], categories=MONTHS, ordered=True
+                ),
+                "Country": np.repeat(self.countries, num_periods),
+            }
+        )
+        for name, values in self.metrics(window).items():
+            frame[name] = values.ravel()
+        return frame
+
+    def to_dict(self, window=3):
+        """JSON serializable metrics, one row per country and one column per period.
+
+        Undefined values (e.g. growth over a month without arrivals) are ``None``.
+        """
+        labels = [f"{year}-{month:02d}" for year in self.years for month in range(1, 13)]
+        metrics = {}
+        for name, values in self.metrics(window).items():
+            values = values.astype(object)
+            values[pd.isna(values)] = None
+            metrics[name] = values.tolist()
+        seasonal = self.seasonal_index().astype(object)
+        seasonal[pd.isna(seasonal)] = None
+        return {
+            "countries": self.countries.tolist(),
+            "labels": labels,
+            "metrics": metrics,
+            "seasonal_index": {"labels": MONTHS, "data": seasonal.tolist()},
+        }
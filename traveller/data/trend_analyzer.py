@@ -1,5 +1,20 @@
 import pandas as pd
 
+MONTHS = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+
 
 class BaseTrendAnalyzer:
     def __init__(self, data_frame):
@@ -7,26 +22,16 @@ class BaseTrendAnalyzer:
 
     def transform_data(self, year):
         # Ensure all monthly columns are numeric
-        months = [
-            "January",
-            "February",
-            "March",
-            "April",
-            "May",
-            "June",
-            "July",
-            "August",
-            "September",
-            "October",
-            "November",
-            "December",
-        ]
+        months = MONTHS
 
         for month in months:
+            column = self.data_frame[month]
+            # Strip thousands separators from text columns, numeric columns (e.g. from the
+            # database) are already clean
+            if not pd.api.types.is_numeric_dtype(column):
+                column = column.str.replace(",", "")
             # Convert each month's data to numeric, coercing errors to NaN
-            self.data_frame[month] = pd.to_numeric(
-                self.data_frame[month].str.replace(",", ""), errors="coerce"
-            )
+            self.data_frame[month] = pd.to_numeric(column, errors="coerce")
 
         # Drop the 'Total' column if it exists
         if "Total" in self.data_frame.columns:
@@ -58,7 +63,7 @@ class BaseTrendAnalyzer:
         self.data_frame["Arrivals"] = pd.to_numeric(self.data_frame["Arrivals"], errors="coerce")
 
         # Handle NaN values in Arrivals only
-        self.data_frame["Arrivals"].fillna(0, inplace=True)
+        self.data_frame["Arrivals"] = self.data_frame["Arrivals"].fillna(0)
 
 
 class MonthlyTrendAnalyzer(BaseTrendAnalyzer):
@@ -0,0 +1,246 @@
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+from traveller.data.cache import file_sha256
+
+MANIFEST_FILE = "manifest.json"
+
+# Bytes read from the response per write
+CHUNK_SIZE = 1 << 16
+
+
+def file_name(url):
+    """Local name of a download, as ``scripts/download_tourism_data.sh`` names it."""
+    return os.path.basename(urlparse(url).path).replace(" ", "_")
+
+
+def read_urls(path):
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+class ReportDownloader:
+    """Download report URLs into a directory, a few at a time, skipping unchanged files.
+
+    A manifest in the directory records the ETag, Last-Modified, size and SHA-256 of
+    every downloaded file. Files still matching it are requested conditionally
+    (If-None-Match / If-Modified-Since), so an unchanged report costs a 304 and no
+    body. A body shorter than its Content-Length (or Content-Range total) is an
+    error, and the ``.part`` file holding it is resumed by the retry (or the next
+    run) with a Range request, guarded by If-Range so a changed file is downloaded
+    again from the start.
+
+    Example:
+        >>> downloader = ReportDownloader("data/annual", workers=4)
+        >>> downloader.download(read_urls("data/annual/urls_annual.txt"))
+        {'downloaded': [...], 'unchanged': [...], 'failed': {}}
+    """
+
+    def __init__(
+        self, output_dir, workers=4, timeout=60, retries=2, backoff=1.0, user_agent="traveller"
+    ):
+        self.output_dir = output_dir
+        self.workers = workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.user_agent = user_agent
+        self.manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+        self.manifest = self._load_manifest()
+        self._lock = threading.Lock()
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        tmp_path = f"{self.manifest_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _record(self, name, entry):
+        with self._lock:
+            self.manifest[name] = entry
+            self._save_manifest()
+
+    def is_intact(self, name):
+        """Whether the local file is the one recorded in the manifest.
+
+        A matching size and mtime is trusted, otherwise the SHA-256 is compared.
+        """
+        entry = self.manifest.get(name)
+        path = os.path.join(self.output_dir, name)
+        if entry is None or "sha256" not in entry or not os.path.exists(path):
+            return False
+        stat = os.stat(path)
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+        return file_sha256(path) == entry["sha256"]
+
+    def _request(self, url, headers):
+        request = urllib.request.Request(url, headers={"User-Agent": self.user_agent, **headers})
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            if e.code in (304, 416):
+                return e
+            raise
+
+    def fetch(self, url):
+        """Download one URL unless it is unchanged. Returns "downloaded" or "unchanged"."""
+        name = file_name(url)
+        path = os.path.join(self.output_dir, name)
+        part_path = path + ".part"
+        entry = self.manifest.get(name, {})
+
+        headers = {}
+        if self.is_intact(name):
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        partial = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        part_validator = entry.get("part_etag") or entry.get("part_last_modified")
+        if partial and part_validator and not headers:
+            headers["Range"] = f"bytes={partial}-"
+            headers["If-Range"] = part_validator
+
+        with self._request(url, headers) as response:
+            status = response.status if hasattr(response, "status") else response.code
+            if status == 304:
+                return "unchanged"
+            if status == 416:
+                # The part is no longer a prefix of the file, start over
+                os.remove(part_path)
+                return self.fetch(url)
+
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            resumed = status == 206
+            if resumed:
+                content_range = re.match(
+                    r"bytes (\d+)-\d+/(\d+|\*)", response.headers.get("Content-Range", "")
+                )
+                if content_range is None or int(content_range.group(1)) != partial:
+                    # Not the continuation of the part, start over
+                    os.remove(part_path)
+                    return self.fetch(url)
+                total = content_range.group(2)
+                expected = None if total == "*" else int(total)
+            else:
+                length = response.headers.get("Content-Length")
+                expected = int(length) if length else None
+
+            digest = hashlib.sha256()
+            if resumed:
+                with open(part_path, "rb") as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                        digest.update(chunk)
+            else:
+                # Remember the validators, so an interrupted download can be resumed
+                self._record(
+                    name, {**entry, "part_etag": etag, "part_last_modified": last_modified}
+                )
+
+            with open(part_path, "ab" if resumed else "wb") as f:
+                for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                    f.write(chunk)
+                    digest.update(chunk)
+
+        received = os.path.getsize(part_path)
+        if expected is not None and received != expected:
+            if received > expected:
+                os.remove(part_path)
+            # A short part and its validators are kept, so a retry resumes it
+            raise urllib.error.ContentTooShortError(
+                f"{name}: got {received} of {expected} bytes", None
+            )
+
+        if not resumed and digest.hexdigest() == entry.get("sha256") and self.is_intact(name):
+            # No validators to ask with, but the same bytes as before
+            os.remove(part_path)
+            self._record(name, {**entry, "etag": etag, "last_modified": last_modified})
+            return "unchanged"
+
+        os.replace(part_path, path)
+        stat = os.stat(path)
+        self._record(
+            name,
+            {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": digest.hexdigest(),
+            },
+        )
+        return "downloaded"
+
+    def _fetch_with_retries(self, url):
+        for attempt in range(self.retries + 1):
+            try:
+                return self.fetch(url)
+            except (urllib.error.URLError, http.client.HTTPException, OSError) as e:
+                client_error = isinstance(e, urllib.error.HTTPError) and e.code < 500
+                if client_error or attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2**attempt)
+
+    def download(self, urls):
+        """Download every URL with at most ``workers`` in flight.
+
+        Returns:
+            dict: Names of the ``downloaded`` and ``unchanged`` files, and the error of
+            every ``failed`` URL
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        result = {"downloaded": [], "unchanged": [], "failed": {}}
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            futures = {pool.submit(self._fetch_with_retries, url): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    result[future.result()].append(file_name(url))
+                except Exception as e:
+                    result["failed"][url] = str(e)
+                    print(f"An error occurred while downloading {url}: {e}")
+        return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Download the SLTDA reports listed in a file")
+    parser.add_argument("url_file", help="File with one URL per line")
+    parser.add_argument("output_dir", help="Directory to download the reports to")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent downloads")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds per request")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    downloader = ReportDownloader(args.output_dir, workers=args.workers, timeout=args.timeout)
+    result = downloader.download(read_urls(args.url_file))
+    print(
+        f"{len(result['downloaded'])} downloaded, {len(result['unchanged'])} unchanged, "
+        f"{len(result['failed'])} failed in {time.perf_counter() - started:.1f}s"
+    )
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
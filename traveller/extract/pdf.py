@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from traveller.data.cache import file_sha256
+from traveller.extract.tables import TABLES
+
+MONTH_NAMES = [
+    "january",
+    "february",
+    "march",
+    "april",
+    "may",
+    "june",
+    "july",
+    "august",
+    "september",
+    "october",
+    "november",
+    "december",
+]
+
+
+def read_page_texts(path):
+    """Text of every page of a PDF, extracted with ``pypdf``."""
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise ImportError("PDF extraction requires pypdf, install the `pdf` extra") from e
+
+    return [page.extract_text() or "" for page in PdfReader(path).pages]
+
+
+def report_period(path):
+    """(year, month) a report covers, read from its file name.
+
+    Quarterly reports ("annual_2018_Q1.pdf") end in the quarter's last month, monthly
+    ones in their month and annual ones in December. The year is None if the name
+    has none.
+    """
+    name = os.path.basename(path)
+    year = re.search(r"(20\d\d)", name)
+    quarter = re.search(r"Q([1-4])", name)
+    if quarter:
+        month = int(quarter.group(1)) * 3
+    else:
+        lowered = name.lower()
+        month = next(
+            (number for number, month in enumerate(MONTH_NAMES, 1) if month in lowered), 12
+        )
+    if year is None:
+        # Weekly reports of a year live in a directory named after it
+        year = re.search(r"(20\d\d)", os.path.basename(os.path.dirname(os.path.abspath(path))))
+    return (int(year.group(1)) if year else None), month
+
+
+def parse_pages(pages, year=None, month=None):
+    """Rows of every known table on the pages, as {table: rows}."""
+    tables = {}
+    for text in pages:
+        for name, (parser, _) in TABLES.items():
+            rows = parser(text, year, month)
+            if rows:
+                tables.setdefault(name, []).extend(rows)
+    return tables
+
+
+class PageCache:
+    """Page texts of extracted PDFs, keyed on the SHA-256 of the file.
+
+    A renamed or copied report is not extracted again, and a changed one gets a new
+    key. The parsers run on the cached texts, so they can change without
+    re-extracting anything.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _path(self, sha256):
+        return os.path.join(self.cache_dir, f"{sha256}.json")
+
+    def get(self, sha256):
+        try:
+            with open(self._path(sha256)) as f:
+                return json.load(f)["pages"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, sha256, pages):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(sha256)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"pages": pages}, f)
+        os.replace(tmp_path, path)
+
+
+def extract_report(path, cache_dir=None, sha256=None):
+    """Extract the known tables of one report, reusing its cached page texts."""
+    cache = PageCache(cache_dir) if cache_dir else None
+    pages = None
+    if cache is not None:
+        sha256 = sha256 or file_sha256(path)
+        pages = cache.get(sha256)
+    if pages is None:
+        pages = read_page_texts(path)
+        if cache is not None:
+            cache.put(sha256, pages)
+    return parse_pages(pages, *report_period(path))
+
+
+class ReportExtractor:
+    """Extract the tables of SLTDA PDF reports into the CSV schemas of ``data/``.
+
+    Reports are extracted in a process pool, one report per task. With a
+    ``cache_dir`` the page texts of every report are cached under its content hash,
+    so a rerun only extracts new or changed reports, without starting the pool when
+    there are none.
+
+    Example:
+        >>> extractor = ReportExtractor(cache_dir=".traveller_cache/pdf", workers=4)
+        >>> results = extractor.extract(glob.glob("data/annual/*.pdf"))
+        >>> extractor.write_csv(results, "data/extracted")
+    """
+
+    def __init__(self, cache_dir=None, workers=None):
+        self.cache_dir = cache_dir
+        self.workers = workers or os.cpu_count() or 1
+
+    def extract(self, paths):
+        """Extract every report, as {path: {table: DataFrame}}.
+
+        Reports that cannot be read are reported and left out.
+        """
+        cache = PageCache(self.cache_dir) if self.cache_dir else None
+        tables, pending = {}, []
+        for path in paths:
+            sha256 = file_sha256(path) if cache is not None else None
+            if cache is not None and cache.get(sha256) is not None:
+                tables[path] = extract_report(path, self.cache_dir, sha256)
+            else:
+                pending.append((path, sha256))
+
+        if self.workers == 1 or len(pending) <= 1:
+            for path, sha256 in pending:
+                try:
+                    tables[path] = extract_report(path, self.cache_dir, sha256)
+                except Exception as e:
+                    print(f"An error occurred while extracting {path}: {e}")
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(pending))) as pool:
+                futures = {
+                    pool.submit(extract_report, path, self.cache_dir, sha256): path
+                    for path, sha256 in pending
+                }
+                for future in as_completed(futures):
+                    path = futures[future]
+                    try:
+                        tables[path] = future.result()
+                    except Exception as e:
+                        print(f"An error occurred while extracting {path}: {e}")
+
+        return {
+            path: {
+                name: pd.DataFrame(rows, columns=TABLES[name][1])
+                for name, rows in tables[path].items()
+            }
+            for path in paths
+            if path in tables
+        }
+
+    def write_csv(self, results, output_dir):
+        """Write every extracted table to ``<output_dir>/<table>/<report>.csv``."""
+        written = []
+        for path, tables in results.items():
+            stem = os.path.splitext(os.path.basename(path))[0]
+            for name, frame in tables.items():
+                os.makedirs(os.path.join(output_dir, name), exist_ok=True)
+                csv_path = os.path.join(output_dir, name, f"{stem}.csv")
+                frame.to_csv(csv_path, index=False)
+                written.append(csv_path)
+        return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract the tables of SLTDA PDF reports")
+    parser.add_argument("paths", nargs="+", help="PDF reports or directories of them")
+    parser.add_argument("--output", required=True, help="Directory to write the CSVs to")
+    parser.add_argument("--cache-dir", default=".traveller_cache/pdf", help="Page text cache")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: cores)")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            paths.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.lower().endswith(".pdf")
+            )
+        else:
+            paths.append(path)
+
+    extractor = ReportExtractor(cache_dir=args.cache_dir, workers=args.workers)
+    written = extractor.write_csv(extractor.extract(paths), args.output)
+    print(f"Wrote {len(written)} tables from {len(paths)} reports to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Parsers of the tables in the text of SLTDA report pages.
+
+Each parser takes the text of one page (as extracted by ``pypdf``) and the period of
+the report, and returns the rows of its table found on the page in the column order
+of the CSVs under ``data/``. Pages without the table give no rows.
+"""
+
+import calendar
+import re
+import warnings
+
+# A count with or without thousands separators, e.g. "2,499", "6, 390" or "865"
+NUMBER = r"(\d{1,3}(?:,\s*\d{3})+|\d+)"
+
+HOTEL_CATEGORIZATION_COLUMNS = ["Categorization", "Num Establishments", "Num Rooms"]
+ROOM_DISTRIBUTION_COLUMNS = [
+    "year",
+    "month",
+    "project_status",
+    "district",
+    "num_of_projects",
+    "num_of_rooms",
+    "investments",
+]
+DAILY_ARRIVALS_COLUMNS = ["Date", "Arrivals"]
+
+# Accommodation categories of the quarterly and annual reports
+CATEGORIES = [
+    "Classified Tourist Hotels",
+    "Classified Tourist Hotel",
+    "Five Star",
+    "Four Star",
+    "Three Star",
+    "Two Star",
+    "One Star",
+    "Tourist Hotels (Unclassified)",
+    "Tourist Hotel (Unclassified)",
+    "Tourist Hotel",
+    "Boutique Hotel",
+    "Boutique Villa",
+    "Heritage Hotel",
+    "Heritage Bungalows",
+    "Heritage Bungalow",
+    "Heritage Homes",
+    "Heritage Home",
+    "Bungalow",
+    "Guest House",
+    "Home Stay Units",
+    "Home Stay Unit",
+    "Rented Apartments",
+    "Rented Apartment",
+    "Rented Homes",
+    "Rented Home",
+    "Hostels",
+    "Eco Lodge",
+    "Themed Accommodation & Value-added Activities",
+    "Themed Accommodation",
+]
+
+# Districts of Sri Lanka, with the spellings used across the reports
+DISTRICTS = [
+    "Ampara",
+    "Anuradhapura",
+    "Badulla",
+    "Batticaloa",
+    "Colombo",
+    "Galle",
+    "Gampaha",
+    "Hambantota",
+    "Jaffna",
+    "Kalutara",
+    "Kaluthara",
+    "Kandy",
+    "Kegalle",
+    "Kilinochchi",
+    "Kurunegala",
+    "Mannar",
+    "Manar",
+    "Matale",
+    "Matara",
+    "Monaragala",
+    "Moneragala",
+    "Mullaitivu",
+    "Nuwara Eliya",
+    "Polonnaruwa",
+    "Puttalam",
+    "Puttlam",
+    "Ratnapura",
+    "Rathnapura",
+    "Trincomalee",
+    "Vavuniya",
+    "Vavunia",
+]
+
+# Longest names first, so "Tourist Hotel (Unclassified)" is not read as "Tourist Hotel"
+_CATEGORY_LINE = re.compile(
+    r"^\s*("
+    + "|".join(re.escape(name) for name in sorted(CATEGORIES, key=len, reverse=True))
+    + rf")s?\s+{NUMBER}\s+{NUMBER}\s*$",
+    re.IGNORECASE,
+)
+_DISTRICT_LINE = re.compile(
+    r"^\s*("
+    + "|".join(re.escape(name) for name in sorted(DISTRICTS, key=len, reverse=True))
+    + rf")\s+{NUMBER}\s+{NUMBER}(?:\s+([\d,]+(?:\.\d+)?))?\s*$",
+    re.IGNORECASE,
+)
+
+_MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+# The month may be glued to the day before it, e.g. "01 st to 31stJanuary 2024"
+_DAILY_TITLE = re.compile(
+    r"daily tourist arrivals[^\n]*?("
+    + "|".join(name for name in calendar.month_name if name)
+    + r")\b[\s,]*(\d{4})?",
+    re.IGNORECASE,
+)
+
+
+# A weekly subtotal of the 2023 daily charts, e.g. "TOTAL (1st to 7th) 30,394". Later
+# reports scatter their subtotals over the chart and are not cross-checked.
+_WEEK_TOTAL = re.compile(
+    rf"TOTAL\s*\(\s*(\d{{1,2}})\s*(?:st|nd|rd|th)\s+to\s+(\d{{1,2}})\s*(?:st|nd|rd|th)\s*\)"
+    rf"\s*{NUMBER}",
+    re.IGNORECASE,
+)
+
+
+def to_int(value):
+    return int(re.sub(r"[,\s]", "", value))
+
+
+def _matches(text, pattern):
+    """Matches of ``pattern`` on the lines of a page, with labels wrapped over lines.
+
+    Table cells often wrap, e.g. "Heritage" above "Bungalow 4 19", so a line is also
+    tried with up to two preceding lines without numbers prepended to it.
+    """
+    labels = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        candidates = [
+            " ".join(labels[-count:] + [line]) for count in (2, 1) if len(labels) >= count
+        ]
+        match = next((match for match in map(pattern.match, candidates + [line]) if match), None)
+        if match:
+            labels = []
+            yield match
+        elif re.search(r"\d", line):
+            labels = []
+        else:
+            labels.append(line)
+
+
+def _canonical(name, names):
+    for known in names:
+        if known.lower() == name.lower():
+            return known
+    return name
+
+
+def hotel_categorization(text, year=None, month=None):
+    """Establishments and rooms per accommodation category."""
+    if "establishment" not in text.lower():
+        return []
+    rows = []
+    for match in _matches(text, _CATEGORY_LINE):
+        name, establishments, rooms = match.groups()
+        rows.append([_canonical(name, CATEGORIES), to_int(establishments), to_int(rooms)])
+    return rows
+
+
+def room_distribution(text, year=None, month=None):
+    """Projects, rooms and (where reported) investments per district."""
+    if "district" not in text.lower():
+        return []
+    rows = []
+    for match in _matches(text, _DISTRICT_LINE):
+        district, projects, rooms, investments = match.groups()
+        rows.append(
+            [
+                year,
+                month,
+                "none",
+                _canonical(district, DISTRICTS),
+                to_int(projects),
+                to_int(rooms),
+                investments.replace(",", "") if investments else "NA",
+            ]
+        )
+    return rows
+
+
+def daily_arrivals(text, year=None, month=None):
+    """Arrivals per day of the "Daily tourist arrivals" chart of a weekly report.
+
+    The chart's labels come out as a day ("01") on one line and its arrivals
+    ("2,246") on the next, in no particular order. The month and year are read from
+    the chart's title, e.g. "Daily tourist arrivals, 1st to 31st January 2023", and
+    default to the report's. A warning is issued when days are missing or do not add
+    up to the chart's weekly totals.
+    """
+    title = _DAILY_TITLE.search(text)
+    if title is None:
+        return []
+    month = _MONTHS.get(title.group(1).lower(), month)
+    year = int(title.group(2)) if title.group(2) else year
+    if year is None or month is None:
+        return []
+
+    days = calendar.monthrange(year, month)[1]
+    arrivals = {}
+    lines = [line.strip() for line in text[title.end() :].splitlines() if line.strip()]
+    # A value may share its line with a weekly total, e.g. "6,862 52,361"
+    values = [re.match(rf"{NUMBER}(?:\s|$)", line) for line in lines] + [None]
+    index = 0
+    while index < len(lines) - 1:
+        label, value = lines[index], values[index + 1]
+        day = int(label) if re.fullmatch(r"\d{1,2}", label) else None
+        # A day followed by its value is a label, not the value of the line before it
+        next_is_label = re.fullmatch(r"\d{1,2}", lines[index + 1]) and values[index + 2]
+        if value and day and day <= days and day not in arrivals and not next_is_label:
+            arrivals[day] = to_int(value.group(1))
+            # The value is not the label of the next pair
+            index += 2
+        else:
+            index += 1
+
+    period = f"{calendar.month_name[month]} {year}"
+    if len(arrivals) != days:
+        missing = ", ".join(str(day) for day in range(1, days + 1) if day not in arrivals)
+        warnings.warn(f"Daily arrivals of {period}: no arrivals read for day(s) {missing}")
+    for total in _WEEK_TOTAL.finditer(text, title.end()):
+        first, last, expected = int(total.group(1)), int(total.group(2)), to_int(total.group(3))
+        found = sum(arrivals.get(day, 0) for day in range(first, last + 1))
+        if found != expected:
+            warnings.warn(
+                f"Daily arrivals of {period}: days {first} to {last} add up to {found}, "
+                f"the report's total is {expected}"
+            )
+    return [[f"{year:04d}-{month:02d}-{day:02d}", arrivals[day]] for day in sorted(arrivals)]
+
+
+# Table name: (parser, CSV columns)
+TABLES = {
+    "hotel_categorization": (hotel_categorization, HOTEL_CATEGORIZATION_COLUMNS),
+    "room_distribution": (room_distribution, ROOM_DISTRIBUTION_COLUMNS),
+    "daily_arrivals": (daily_arrivals, DAILY_ARRIVALS_COLUMNS),
+}
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from traveller.plot.plotter import TrendPlotter
+
+# The plotly.js bundle shared by every HTML chart of an output directory
+PLOTLYJS_FILE = "plotly.min.js"
+MANIFEST_FILE = "manifest.json"
+FORMATS = ("html", "json")
+
+
+def _slug(value):
+    return re.sub(r"[^A-Za-z0-9]+", "_", str(value)).strip("_").lower() or "all"
+
+
+def chart_name(key, metric):
+    """File name of a chart: readable slugs plus a short hash of the exact values.
+
+    The slugs alone collide, e.g. "AFGHANISTAN" and "Afghanistan" of two years' CSVs.
+    """
+    exact = json.dumps([str(value) for value in key] + [str(metric)])
+    digest = hashlib.sha256(exact.encode()).hexdigest()[:8]
+    return "-".join([_slug(value) for value in key] + [_slug(metric), digest])
+
+
+def _write_atomic(path, content):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class ChartSpec:
+    """Which charts to build from a long format trend and how to draw them.
+
+    One chart is built per metric and per combination of the ``group_by`` values,
+    e.g. ``group_by=["Country"]`` gives one chart per country and metric and
+    ``group_by=["Year"]`` one chart of all countries per year and metric. The other
+    arguments are passed to ``TrendPlotter.plot_trend``; ``title`` is formatted with
+    the metric and the group values.
+
+    Example:
+        >>> spec = ChartSpec("Month", ["Arrivals", "YoYGrowth"], ["Country"], facet_col="Year")
+    """
+
+    def __init__(
+        self,
+        x_col,
+        metrics,
+        group_by,
+        title="{metric} - {group}",
+        xlabel=None,
+        facet_col=None,
+        render_mode="auto",
+        top_n=None,
+        max_points=None,
+    ):
+        self.x_col = x_col
+        self.metrics = list(metrics)
+        self.group_by = list(group_by)
+        self.title = title
+        self.xlabel = xlabel or x_col
+        self.facet_col = facet_col
+        self.render_mode = render_mode
+        self.top_n = top_n
+        self.max_points = max_points
+
+    def options(self, metric, key):
+        """Arguments of ``plot_trend`` for one chart."""
+        group = ", ".join(str(value) for value in key)
+        return {
+            "x_col": self.x_col,
+            "y_col": metric,
+            "title": self.title.format(metric=metric, group=group, **dict(zip(self.group_by, key))),
+            "xlabel": self.xlabel,
+            "ylabel": metric,
+            "year_col": self.facet_col,
+            "render_mode": self.render_mode,
+            "top_n": self.top_n,
+            "max_points": self.max_points,
+        }
+
+    def charts(self, trend_data):
+        """Yield the name, ``plot_trend`` options and input slice of every chart."""
+        facet = [self.facet_col] if self.facet_col else []
+        columns = list(dict.fromkeys(self.group_by + facet + [self.x_col, "Country"]))
+        groups = (
+            trend_data.groupby(self.group_by, sort=True, observed=True)
+            if self.group_by
+            else [((), trend_data)]
+        )
+        for key, rows in groups:
+            key = key if isinstance(key, tuple) else (key,)
+            for metric in self.metrics:
+                name = chart_name(key, metric)
+                yield name, self.options(metric, key), rows[columns + [metric]]
+
+
+def chart_hash(options, rows):
+    """Fingerprint of a chart: its options and the contents of its input slice."""
+    digest = hashlib.sha256(json.dumps(options, sort_keys=True, default=str).encode())
+    digest.update(",".join(map(str, rows.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def render_chart(output_dir, name, options, rows, formats):
+    """Build one chart and write it as ``<name>.html`` and/or ``<name>.json``."""
+    fig = TrendPlotter().plot_trend(rows, show=False, **options)
+    if "html" in formats:
+        # References the shared bundle next to it instead of embedding 3 MB of plotly.js
+        html = fig.to_html(include_plotlyjs="directory", full_html=True)
+        _write_atomic(os.path.join(output_dir, f"{name}.html"), html)
+    if "json" in formats:
+        _write_atomic(os.path.join(output_dir, f"{name}.json"), fig.to_json())
+    return name
+
+
+class BatchRenderer:
+    """Render the charts of a ``ChartSpec`` to standalone files in a process pool.
+
+    HTML charts share a single ``plotly.min.js`` in the output directory. A manifest
+    records the fingerprint of every chart's options and input slice, and charts whose
+    fingerprint and files are unchanged since the last run are skipped.
+
+    Example:
+        >>> renderer = BatchRenderer("charts", workers=4)
+        >>> renderer.render(trend, ChartSpec("Month", ["Arrivals"], ["Country"], facet_col="Year"))
+        {'rendered': [...], 'skipped': [...], 'failed': {}}
+    """
+
+    def __init__(self, output_dir, workers=None, formats=("html",)):
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown formats: {', '.join(sorted(unknown))}")
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.formats = tuple(formats)
+        self.manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _up_to_date(self, manifest, name, fingerprint):
+        if manifest.get(name) != fingerprint:
+            return False
+        return all(
+            os.path.exists(os.path.join(self.output_dir, f"{name}.{fmt}")) for fmt in self.formats
+        )
+
+    def _write_plotlyjs(self):
+        path = os.path.join(self.output_dir, PLOTLYJS_FILE)
+        bundle = get_plotlyjs()
+        if os.path.exists(path) and os.path.getsize(path) == len(bundle.encode("utf-8")):
+            return
+        _write_atomic(path, bundle)
+
+    def render(self, trend_data, spec, force=False):
+        """Render every chart of ``spec`` whose input changed (or all with ``force``).
+
+        Returns:
+            dict: Names of the ``rendered`` and ``skipped`` charts, and the error
+            message of every ``failed`` one
+        """
+        if hasattr(trend_data, "to_pandas"):
+            trend_data = trend_data.to_pandas()
+        os.makedirs(self.output_dir, exist_ok=True)
+        if "html" in self.formats:
+            self._write_plotlyjs()
+
+        manifest = self.load_manifest()
+        # The options are part of the fingerprint, so a changed format is re-rendered too
+        formats = {"formats": sorted(self.formats)}
+        jobs, skipped, names = [], [], set()
+        for name, options, rows in spec.charts(trend_data):
+            if name in names:
+                raise ValueError(f"Two charts of the spec are both named {name}")
+            names.add(name)
+            fingerprint = chart_hash({**options, **formats}, rows)
+            if not force and self._up_to_date(manifest, name, fingerprint):
+                skipped.append(name)
+            else:
+                jobs.append((name, options, rows, fingerprint))
+
+        rendered, failed = [], {}
+        fingerprints = {name: fingerprint for name, _, _, fingerprint in jobs}
+        if self.workers == 1 or len(jobs) <= 1:
+            for name, options, rows, _ in jobs:
+                try:
+                    rendered.append(
+                        render_chart(self.output_dir, name, options, rows, self.formats)
+                    )
+                except Exception as e:
+                    failed[name] = str(e)
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+                futures = {
+                    pool.submit(
+                        render_chart, self.output_dir, name, options, rows, self.formats
+                    ): name
+                    for name, options, rows, _ in jobs
+                }
+                for future in as_completed(futures):
+                    try:
+                        rendered.append(future.result())
+                    except Exception as e:
+                        failed[futures[future]] = str(e)
+
+        for name in rendered:
+            manifest[name] = fingerprints[name]
+        for name in failed:
+            manifest.pop(name, None)
+            print(f"An error occurred while rendering {name}: {failed[name]}")
+        _write_atomic(self.manifest_path, json.dumps(manifest, indent=2, sort_keys=True))
+
+        return {"rendered": sorted(rendered), "skipped": skipped, "failed": failed}
@@ -1,8 +1,89 @@
+import numpy as np
+import pandas as pd
 import plotly.express as px
 
+# Series that the countries outside the top N are summed into
+OTHER = "Other"
+
+
+def collapse_top_n(trend_data, y_col, top_n, group_cols):
+    """Keep the ``top_n`` countries with the most ``y_col`` and sum the rest into "Other".
+
+    Rows are summed per ``group_cols`` (e.g. year and month), so "Other" has one row
+    per period like every other country. Row order follows the first appearance of
+    each period.
+    """
+    totals = trend_data.groupby("Country", sort=False)[y_col].sum()
+    top = totals.nlargest(top_n).index
+    if len(top) == len(totals):
+        return trend_data
+
+    country = trend_data["Country"].where(trend_data["Country"].isin(top), OTHER)
+    return (
+        trend_data.assign(Country=country)
+        .groupby(group_cols + ["Country"], sort=False, observed=True)[y_col]
+        .sum()
+        .reset_index()
+    )
+
+
+def decimate(trend_data, y_col, max_points, group_cols):
+    """Thin every series (rows sharing ``group_cols``) to at most ``max_points`` rows.
+
+    Longer series are split into ``max_points // 2`` consecutive buckets of which only
+    the rows with the lowest and the highest value are kept, so peaks and dips survive
+    the thinning. Shorter series are kept as they are. Rows must be in x order.
+    """
+    if max_points < 2:
+        raise ValueError(f"max_points must be at least 2 (a low and a high), got {max_points}")
+    if len(trend_data) <= max_points:
+        return trend_data
+
+    data = trend_data.reset_index(drop=True)
+    series = data.groupby(group_cols, sort=False, observed=True)
+    position = series.cumcount().to_numpy()
+    size = series[y_col].transform("size").to_numpy()
+    buckets = max(1, max_points // 2)
+    bucket = np.where(size > max_points, position * buckets // size, position)
+
+    values = pd.to_numeric(data[y_col], errors="coerce").fillna(0)
+    keys = [data[column] for column in group_cols] + [pd.Series(bucket, name="_bucket")]
+    by_bucket = values.groupby(keys, sort=False, observed=True)
+    keep = np.union1d(by_bucket.idxmin().to_numpy(), by_bucket.idxmax().to_numpy())
+    return data.loc[keep]
+
 
 class TrendPlotter:
-    def plot_trend(self, trend_data, x_col, y_col, title, xlabel, ylabel, year_col):
+    def plot_trend(
+        self,
+        trend_data,
+        x_col,
+        y_col,
+        title,
+        xlabel,
+        ylabel,
+        year_col,
+        show=True,
+        render_mode="auto",
+        top_n=None,
+        max_points=None,
+    ):
+        """Plot one line per country, with one facet per year.
+
+        ``render_mode`` is passed to ``px.line``, whose "auto" draws a line with WebGL
+        once it has over 1000 points. For large trends (hundreds of countries, daily
+        series) pass ``render_mode="webgl"`` to draw every line with WebGL, ``top_n``
+        to keep only the largest countries and sum the others into an "Other" line,
+        and ``max_points`` to decimate each line before the figure is serialized.
+        Together they bound the number of traces and points whatever the data size.
+        """
+        group_cols = [year_col, x_col] if year_col else [x_col]
+        if top_n is not None:
+            trend_data = collapse_top_n(trend_data, y_col, top_n, group_cols)
+        if max_points is not None:
+            series_cols = [year_col, "Country"] if year_col else ["Country"]
+            trend_data = decimate(trend_data, y_col, max_points, series_cols)
+
         fig = px.line(
             trend_data,
             x=x_col,
@@ -12,6 +93,7 @@ class TrendPlotter:
             labels={x_col: xlabel, y_col: ylabel},
             facet_col=year_col,
             facet_col_wrap=1,
+            render_mode=render_mode,
         )  # Facet by year
 
         # Auto-scale y-axis
@@ -36,4 +118,6 @@ class TrendPlotter:
             margin=dict(r=200),  # Adjust right margin to accommodate the legend
         )
 
-        fig.show()
+        if show:
+            fig.show()
+        return fig
@@ -0,0 +1,169 @@
+"""Async counterparts of the arrivals views, for serving under an ASGI server.
+
+While a request waits on the database the event loop serves other requests, so one
+uvicorn process handles many slow queries at once instead of tying up a worker
+thread for each. Responses are cached per dataset version like the sync views.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+
+from .models import AirConnectivityDistribution, TourismIncome
+from .utils.async_util import gather_queries
+from .utils.cache_util import cache_versioned
+from .utils.cube import get_current_cube
+from .utils.model_util import normalize_country_id
+from .utils.period_util import parse_period_range
+from .views import (
+    EXPORT_CHUNK_SIZE,
+    _arrivals_page_data,
+    _chart_data,
+    _country_arrivals_queryset,
+    _encode_rows,
+    _export_queryset,
+)
+
+
+async def _aencode_rows(rows, separator):
+    """Async counterpart of ``views._encode_rows``."""
+    chunk = []
+    async for row in rows:
+        chunk.append(row)
+        if len(chunk) == EXPORT_CHUNK_SIZE:
+            for encoded in _encode_rows(chunk, separator):
+                yield encoded
+            chunk = []
+    for encoded in _encode_rows(chunk, separator):
+        yield encoded
+
+
+async def _astream_json_results(rows):
+    yield '{"results": ['
+    index = 0
+    async for chunk in _aencode_rows(rows, ", "):
+        yield (", " if index else "") + chunk
+        index += 1
+    yield "]}"
+
+
+async def _astream_ndjson(rows):
+    async for chunk in _aencode_rows(rows, "\n"):
+        yield chunk + "\n"
+
+
+@cache_versioned()
+async def get_all_arrivals(request):
+    """Async ``views.get_all_arrivals``, reading the server-side cursor with ``aiterator``."""
+    try:
+        arrivals = _export_queryset(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    rows = arrivals.aiterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    if request.GET.get("format") == "ndjson":
+        return StreamingHttpResponse(_astream_ndjson(rows), content_type="application/x-ndjson")
+    return StreamingHttpResponse(_astream_json_results(rows), content_type="application/json")
+
+
+@cache_versioned()
+async def arrivals_paginated_json(request):
+    """Async ``views.arrivals_paginated_json``."""
+    return JsonResponse(await sync_to_async(_arrivals_page_data)(request))
+
+
+async def _country_series(request, country_id, start, end):
+    if country_id == "TOTAL":
+        return []
+    cube = await sync_to_async(get_current_cube)(getattr(request, "dataset_version", None))
+    if cube is not None:
+        return cube.country_series(country_id, start, end)
+    return [row async for row in _country_arrivals_queryset(country_id, start, end)]
+
+
+@cache_versioned()
+async def country_arrivals_view(request, country_name):
+    """Async ``views.country_arrivals_view``."""
+    try:
+        start, end = parse_period_range(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    arrivals = await _country_series(request, normalize_country_id(country_name), start, end)
+    return JsonResponse(_chart_data(arrivals))
+
+
+def _year_range(queryset, start, end):
+    if start:
+        queryset = queryset.filter(timeframe__year__gte=start[0])
+    if end:
+        queryset = queryset.filter(timeframe__year__lte=end[0])
+    return queryset
+
+
+@cache_versioned()
+async def country_overview(request, country_name):
+    """A country's monthly arrivals with the tourism income and airline shares of the period.
+
+    The three queries are independent, so they run concurrently on separate
+    connections and the response takes as long as the slowest of them rather than
+    their sum. Periods are limited with ?from= / ?to= like the arrivals view; income
+    and air connectivity are matched on the years of the period.
+    """
+    try:
+        start, end = parse_period_range(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    country_id = normalize_country_id(country_name)
+    cube = await sync_to_async(get_current_cube)(getattr(request, "dataset_version", None))
+
+    def arrivals():
+        if country_id == "TOTAL":
+            return []
+        if cube is not None:
+            return cube.country_series(country_id, start, end)
+        return list(_country_arrivals_queryset(country_id, start, end))
+
+    def income():
+        return list(
+            _year_range(TourismIncome.objects.all(), start, end)
+            .order_by("timeframe__year", "timeframe__month")
+            .values(
+                "timeframe__year",
+                "timeframe__month",
+                "number_of_tourists",
+                "average_expenditure_month",
+                "average_expenditure_day",
+                "total_value",
+            )
+        )
+
+    def air_connectivity():
+        return list(
+            _year_range(AirConnectivityDistribution.objects.all(), start, end)
+            .order_by("timeframe__year", "-number_of_passengers")
+            .values("timeframe__year", "airline", "number_of_passengers", "percentage")
+        )
+
+    arrival_rows, income_rows, airline_rows = await gather_queries(
+        arrivals, income, air_connectivity
+    )
+
+    return JsonResponse(
+        {
+            "country_id": country_id,
+            "arrivals": _chart_data(arrival_rows),
+            "income": [
+                {
+                    "year": row.pop("timeframe__year"),
+                    "month": row.pop("timeframe__month"),
+                    **row,
+                }
+                for row in income_rows
+            ],
+            "air_connectivity": [
+                {"year": row.pop("timeframe__year"), **row} for row in airline_rows
+            ],
+        }
+    )
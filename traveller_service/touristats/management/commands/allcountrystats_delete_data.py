@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from touristats.models import AllCountryStats, TimeFrame
+from touristats.utils.refresh_util import arrivals_changed
 
 
 class Command(BaseCommand):
@@ -74,4 +75,6 @@ class Command(BaseCommand):
         else:
             TimeFrame.objects.filter(allcountrystats__isnull=True).delete()
 
+        arrivals_changed([year] if year else None)
+
         self.stdout.write(self.style.SUCCESS(f"Successfully deleted {count} records!"))
@@ -2,7 +2,10 @@ import sys
 
 import pandas as pd
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from touristats.models import AllCountryStats, TimeFrame
+from touristats.utils.ingest_util import bulk_upsert_arrivals, read_arrivals_frame
+from touristats.utils.refresh_util import arrivals_changed
 from tqdm import tqdm
 
 
@@ -19,10 +22,17 @@ class Command(BaseCommand):
         - Automatic country_id generation
         - Data type conversion
 
+    With --bulk the whole CSV is cleaned and reshaped at once, all TimeFrames of the
+    year are resolved up front and the rows are upserted on (country_id, timeframe)
+    in batches of --batch-size, instead of a couple of queries per country and month.
+
     Examples:
         Insert data for year 2023:
             >>> python manage.py allcountrystats_insert_data 2023 /path/to/data.csv
 
+        Insert (or update) data for year 2023 in batches of 500 rows:
+            >>> python manage.py allcountrystats_insert_data 2023 data.csv --bulk --batch-size 500
+
     CSV Format Expected:
         Country,January,February,March,April,May,June,July,August,September,October,November,December
         India,5000,6000,4500,...
@@ -31,6 +41,8 @@ class Command(BaseCommand):
     Args:
         year (int): The year for which the data is being inserted
         file_path (str): Path to the CSV file containing the arrival data
+        --bulk (bool, optional): Use the set-based bulk upsert path.
+        --batch-size (int, optional): Rows per bulk insert statement. Defaults to 1000.
 
     Returns:
         None. Prints success message with number of records inserted.
@@ -45,16 +57,37 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument("year", type=int)
         parser.add_argument("file_path", type=str)
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Upsert all rows with batched bulk inserts instead of row by row",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows per bulk insert statement (default: 1000)",
+        )
 
     def handle(self, *args, **options):
         year = options["year"]
         file_path = options["file_path"]
 
+        if options["bulk"]:
+            self.handle_bulk(year, file_path, options["batch_size"])
+            return
+
         data = pd.read_csv(file_path)
         total_rows = len(data)
 
         self.stdout.write(f"Starting import for {total_rows} countries...")
 
+        # Look the TimeFrames up once per month rather than once per country and month
+        timeframes = {
+            month_num: TimeFrame.objects.get_or_create(year=year, month=month_num)[0]
+            for month_num in range(1, 13)
+        }
+
         # Create progress bar for countries
         for index, row in tqdm(data.iterrows(), total=total_rows, desc="Importing data"):
             country_name = row["Country"]
@@ -81,10 +114,8 @@ class Command(BaseCommand):
                 arrival_value = pd.to_numeric(str(row[month]).replace(",", ""), errors="coerce")
                 arrival_value = 0 if pd.isna(arrival_value) else arrival_value
 
-                timeframe, _ = TimeFrame.objects.get_or_create(year=year, month=month_num)
-
                 AllCountryStats.objects.create(
-                    timeframe=timeframe,
+                    timeframe=timeframes[month_num],
                     country=country_name,
                     passengers=arrival_value,
                     days_of_stay=0,
@@ -93,8 +124,26 @@ class Command(BaseCommand):
 
         # Add a newline at the end
         sys.stdout.write("\n")
+        arrivals_changed([year])
         self.stdout.write(
             self.style.SUCCESS(
                 f"Successfully imported data for {total_rows} countries in year {year}"
             )
         )
+
+    def handle_bulk(self, year, file_path, batch_size):
+        frame = read_arrivals_frame(file_path)
+        total_countries = frame["country_id"].nunique()
+
+        self.stdout.write(f"Starting bulk import for {total_countries} countries...")
+
+        with transaction.atomic():
+            count = bulk_upsert_arrivals(frame, year, batch_size=batch_size)
+        arrivals_changed([year])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully imported {count} records for {total_countries} countries "
+                f"in year {year}"
+            )
+        )
@@ -0,0 +1,103 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from touristats.utils.ingest_util import discover_arrival_files, ingest_year, init_ingest_worker
+from touristats.utils.refresh_util import arrivals_changed
+
+
+class Command(BaseCommand):
+    """Insert tourist arrival statistics for many years from a directory of CSV files.
+
+    The year of each file is inferred from its name, following the
+    ``all_country_arrivals_<year>.csv`` naming scheme. Years are ingested concurrently
+    in a process pool, each worker with its own database connection. Every year is
+    bulk upserted on (country_id, timeframe) inside its own transaction, so a failing
+    year is rolled back without affecting the others and can simply be re-run.
+
+    Examples:
+        Insert every year found in a directory:
+            >>> python manage.py allcountrystats_insert_directory data/arrival/all_countries
+
+        Insert the files matching a glob with 8 worker processes:
+            >>> python manage.py allcountrystats_insert_directory \\
+            ...     "data/arrival/all_countries/all_country_arrivals_20*.csv" --workers 8
+
+    Args:
+        source (str): Directory holding the CSV files or a glob pattern matching them
+        --workers (int, optional): Number of worker processes. Defaults to the CPU count.
+        --batch-size (int, optional): Rows per bulk insert statement. Defaults to 1000.
+
+    Returns:
+        None. Prints one line per ingested year.
+
+    Raises:
+        CommandError: If no files are found or any year failed to import
+    """
+
+    help = "Insert AllCountryStats data for many years from a directory or glob of CSVs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", type=str)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes (default: number of CPUs)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows per bulk insert statement (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            files = discover_arrival_files(options["source"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if not files:
+            raise CommandError(f"No CSV files found for {options['source']}")
+
+        workers = max(1, min(options["workers"], len(files)))
+        batch_size = options["batch_size"]
+
+        self.stdout.write(f"Starting import for {len(files)} years with {workers} workers...")
+
+        failed = []
+        if workers == 1:
+            for year, file_path in files:
+                try:
+                    self.report(year, ingest_year(year, file_path, batch_size))
+                except Exception as e:
+                    failed.append(year)
+                    self.stderr.write(self.style.ERROR(f"Failed to import {year}: {e}"))
+        else:
+            # Forked workers must not share the parent's open connection
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_ingest_worker) as pool:
+                futures = {
+                    pool.submit(ingest_year, year, file_path, batch_size): year
+                    for year, file_path in files
+                }
+                for future in as_completed(futures):
+                    year = futures[future]
+                    try:
+                        self.report(year, future.result())
+                    except Exception as e:
+                        failed.append(year)
+                        self.stderr.write(self.style.ERROR(f"Failed to import {year}: {e}"))
+
+        if len(failed) < len(files):
+            arrivals_changed([year for year, _ in files if year not in failed])
+
+        if failed:
+            raise CommandError(f"Import failed for years: {', '.join(map(str, sorted(failed)))}")
+
+        self.stdout.write(self.style.SUCCESS(f"Successfully imported data for {len(files)} years"))
+
+    def report(self, year, count):
+        self.stdout.write(f"Imported {count} records for year {year}")
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from touristats.utils.cube import build_cube
+
+
+class Command(BaseCommand):
+    """Build the memory-mapped arrivals cube read by the arrivals views.
+
+    The AllCountryStats rows are written as a countries x years x months int32 array
+    with its dictionaries (country_ids, names, first year) in a JSON file next to it.
+    Web workers map the array read-only and pick up a rebuilt cube on their next
+    request. The ingest and delete commands rebuild it automatically when
+    ``TOURISTATS_CUBE_DIR`` is set.
+
+    Examples:
+        Build the cube in the configured TOURISTATS_CUBE_DIR:
+            >>> python manage.py build_arrivals_cube
+
+        Build the cube in another directory:
+            >>> python manage.py build_arrivals_cube --output /var/lib/touristats/cube
+
+    Args:
+        --output (str, optional): Directory to write the cube to. Defaults to
+            TOURISTATS_CUBE_DIR.
+
+    Returns:
+        None. Prints the shape of the cube.
+
+    Raises:
+        CommandError: If no output directory is given or configured
+    """
+
+    help = "Build the memory-mapped arrivals cube from AllCountryStats"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=None,
+            help="Directory to write the cube to (default: TOURISTATS_CUBE_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["output"] or getattr(settings, "TOURISTATS_CUBE_DIR", None)
+        if not directory:
+            raise CommandError("No output directory given and TOURISTATS_CUBE_DIR is not set")
+
+        meta = build_cube(directory)
+        countries, years, _ = meta["shape"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Built arrivals cube of {countries} countries x {years} years "
+                f"(version {meta['version']}) in {directory}"
+            )
+        )
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from touristats.utils.snapshot_util import build_snapshots
+
+
+class Command(BaseCommand):
+    """Write the chart data of the arrivals chart page as static JSON snapshots.
+
+    Every country's series and the comparison of the top 10 countries are written as
+    content-hashed JSON files with gzipped copies, plus a manifest of their current
+    names. The chart page fetches them instead of querying the views while they match
+    the current arrivals. The ingest and delete commands rebuild them automatically
+    when ``TOURISTATS_SNAPSHOT_DIR`` is set.
+
+    Examples:
+        Build the snapshots in the configured TOURISTATS_SNAPSHOT_DIR:
+            >>> python manage.py build_chart_snapshots
+
+        Build the snapshots in another directory:
+            >>> python manage.py build_chart_snapshots --output /var/www/snapshots
+
+    Args:
+        --output (str, optional): Directory to write the snapshots to. Defaults to
+            TOURISTATS_SNAPSHOT_DIR.
+
+    Returns:
+        None. Prints the number of snapshots.
+
+    Raises:
+        CommandError: If no output directory is given or configured
+    """
+
+    help = "Write the chart data snapshots served as static files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=None,
+            help="Directory to write the snapshots to (default: TOURISTATS_SNAPSHOT_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["output"] or getattr(settings, "TOURISTATS_SNAPSHOT_DIR", None)
+        if not directory:
+            raise CommandError("No output directory given and TOURISTATS_SNAPSHOT_DIR is not set")
+
+        manifest = build_snapshots(directory)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Built chart snapshots of {len(manifest['countries'])} countries "
+                f"(version {manifest['version']}) in {directory}"
+            )
+        )
@@ -1,11 +1,54 @@
+import time
+
 from django.core.management.base import BaseCommand
 from django.db import connections
 from django.db.utils import OperationalError
 
 
+def _percentile(values, percent):
+    """Nearest-rank percentile of sorted values."""
+    index = max(0, -(-len(values) * percent // 100) - 1)
+    return values[int(index)]
+
+
 class Command(BaseCommand):
+    """Check the database connection, optionally measuring its latency.
+
+    With ``--probe`` the command also opens a fresh connection to time the connect
+    (handshake and authentication, or the checkout from the pool), runs ``--queries``
+    round trips of ``SELECT 1`` on the shared connection and prints their latency
+    percentiles, the connection reuse settings and the pool's statistics.
+
+    Examples:
+        Check the connection:
+            >>> python manage.py check_db
+
+        Measure connect time and the latency of 500 round trips:
+            >>> python manage.py check_db --probe --queries 500
+
+    Args:
+        --probe (bool, optional): Measure connect time and query latency
+        --queries (int, optional): Round trips measured by the probe. Defaults to 100.
+
+    Returns:
+        None. Prints the connection details and measurements.
+    """
+
     help = "Check database connection"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--probe",
+            action="store_true",
+            help="Measure connect time, query latency and pool usage",
+        )
+        parser.add_argument(
+            "--queries",
+            type=int,
+            default=100,
+            help="Number of round trips measured by --probe (default: 100)",
+        )
+
     def handle(self, *args, **options):
         self.stdout.write("Testing database connection...")
 
@@ -25,5 +68,53 @@ class Command(BaseCommand):
                 self.stdout.write(f"Host: {db_conn.settings_dict['HOST']}")
                 self.stdout.write(f"User: {db_conn.settings_dict['USER']}")
 
+            if options["probe"]:
+                self.probe(db_conn, max(1, options["queries"]))
+
         except OperationalError as e:
             self.stdout.write(self.style.ERROR(f"Database connection failed! Error: {str(e)}"))
+
+    def probe(self, db_conn, queries):
+        self.stdout.write(
+            f"Persistent connections: CONN_MAX_AGE={db_conn.settings_dict['CONN_MAX_AGE']}, "
+            f"CONN_HEALTH_CHECKS={db_conn.settings_dict['CONN_HEALTH_CHECKS']}"
+        )
+
+        # A separate connection, so the shared one (and its transaction) stays untouched
+        fresh = connections.create_connection(db_conn.alias)
+        started = time.perf_counter()
+        try:
+            fresh.ensure_connection()
+            connect_ms = (time.perf_counter() - started) * 1000
+        finally:
+            fresh.close()
+        self.stdout.write(f"Connect time: {connect_ms:.2f} ms")
+
+        latencies = []
+        with db_conn.cursor() as cursor:
+            for _ in range(queries):
+                started = time.perf_counter()
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+                latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        self.stdout.write(
+            f"Round trip over {queries} queries: "
+            f"min {latencies[0]:.2f} ms, "
+            f"p50 {_percentile(latencies, 50):.2f} ms, "
+            f"p95 {_percentile(latencies, 95):.2f} ms, "
+            f"p99 {_percentile(latencies, 99):.2f} ms, "
+            f"max {latencies[-1]:.2f} ms"
+        )
+
+        pool = getattr(db_conn, "pool", None)
+        if pool is None:
+            self.stdout.write("Connection pool: disabled")
+            return
+        stats = pool.get_stats()
+        in_use = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+        self.stdout.write(
+            f"Connection pool: {in_use} of {stats.get('pool_size', 0)} connections in use "
+            f"(min {stats.get('pool_min')}, max {stats.get('pool_max')}), "
+            f"{stats.get('requests_waiting', 0)} requests waiting"
+        )
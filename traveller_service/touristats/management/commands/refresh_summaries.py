@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from touristats.utils.summary_util import refresh_summaries, summaries_current
+
+
+class Command(BaseCommand):
+    """Rebuild the arrivals summary tables read by the aggregation views.
+
+    MonthlyArrivalsSummary holds the total arrivals of every month and
+    CountryAnnualSummary every country's arrivals and rank in a year. Quarterly and
+    annual totals are rolled up from the monthly rows and shares computed against
+    them, so the totals, top markets and ranking endpoints read a few rows per period
+    instead of aggregating AllCountryStats. The ingest and delete commands refresh the
+    affected years automatically; this command is for rebuilding them by hand.
+
+    Examples:
+        Rebuild all summaries:
+            >>> python manage.py refresh_summaries
+
+        Rebuild the summaries of 2022 and 2023:
+            >>> python manage.py refresh_summaries --year 2022 --year 2023
+
+    Args:
+        --year (int, optional): Year to refresh, may be repeated. Ignored (everything
+            is rebuilt) if the summaries are not up to date for the other years.
+
+    Returns:
+        None. Prints the refreshed years.
+    """
+
+    help = "Rebuild the arrivals summary tables from AllCountryStats"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--year",
+            type=int,
+            action="append",
+            dest="years",
+            help="Year to refresh, may be repeated (default: all years)",
+        )
+
+    def handle(self, *args, **options):
+        years = options["years"]
+        if years and not summaries_current():
+            self.stdout.write(self.style.WARNING("Summaries are out of date, rebuilding all years"))
+            years = None
+
+        refreshed = refresh_summaries(years)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Refreshed summaries for {len(refreshed)} years: "
+                f"{', '.join(map(str, refreshed)) or 'none'}"
+            )
+        )
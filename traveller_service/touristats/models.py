@@ -1,7 +1,7 @@
 from django.db import models
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
-from touristats.utils.model_util import verified_model
+from touristats.utils.model_util import normalize_country_id, verified_model
 
 
 class TimeFrame(models.Model):
@@ -26,6 +26,12 @@ class AllCountryStats(models.Model):
 
     class Meta:
         unique_together = ["country_id", "timeframe"]
+        indexes = [
+            # Keyset pagination order of the arrivals listing
+            models.Index(
+                fields=["timeframe", "country_id", "id"], name="allcountrystats_keyset_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"""
@@ -44,11 +50,65 @@ def generate_country_id(sender, instance, **kwargs):
     Example: "United States of America" -> "UNITED_STATES_OF_AMERICA"
     """
     if not instance.country_id:
-        # Convert country name to uppercase and replace spaces with underscores
-        country_id = instance.country.upper().replace(" ", "_")
-        # Remove any special characters
-        country_id = "".join(e for e in country_id if e.isalnum() or e == "_")
-        instance.country_id = country_id
+        instance.country_id = normalize_country_id(instance.country)
+
+
+class DatasetVersion(models.Model):
+    """
+    Version counter of a dataset, bumped by every management command that changes it.
+
+    Cached responses are keyed on the version of the dataset they were built from,
+    so a bump invalidates all of them at once in every process.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.version}"
+
+
+class MonthlyArrivalsSummary(models.Model):
+    """
+    Total arrivals of all countries ('Total' excluded) per month.
+
+    Precomputed from AllCountryStats by the refresh_summaries command, which the
+    ingest and delete commands run for the years they change.
+    """
+
+    year = models.IntegerField()
+    month = models.IntegerField()
+    arrivals = models.BigIntegerField()
+    countries = models.IntegerField()
+
+    class Meta:
+        unique_together = ["year", "month"]
+
+    def __str__(self):
+        return f"{self.year}-{self.month}: {self.arrivals}"
+
+
+class CountryAnnualSummary(models.Model):
+    """
+    Arrivals of one country in one year with its rank among all countries.
+
+    Precomputed from AllCountryStats by the refresh_summaries command, see
+    MonthlyArrivalsSummary.
+    """
+
+    country_id = models.CharField(max_length=100)
+    country = models.CharField(max_length=100)
+    year = models.IntegerField()
+    arrivals = models.BigIntegerField()
+    rank = models.IntegerField()
+
+    class Meta:
+        unique_together = ["country_id", "year"]
+        indexes = [models.Index(fields=["year", "rank"], name="countryannual_rank_idx")]
+
+    def __str__(self):
+        return f"{self.country} {self.year}: {self.arrivals} (#{self.rank})"
 
 
 @verified_model(
@@ -217,7 +277,8 @@ class AccomodationTypeDistribution(UnmanagedModel):
     """
 
     accomodation_type_distribution_id = models.CharField(max_length=100, primary_key=True)
-    timeframe = models.ForeignKey(TimeFrame, on_delete=models.CASCADE)
+    # Unmanaged, there is no table to cascade into when a TimeFrame is deleted
+    timeframe = models.ForeignKey(TimeFrame, on_delete=models.DO_NOTHING)
     type_of_accomodation = models.CharField(max_length=100)
     percentage = models.FloatField()
 
@@ -1,10 +1,41 @@
+import gzip
+import json
+import os
+import tempfile
 from io import StringIO
+from unittest import skipUnless
 from unittest.mock import patch
 
+from django.core.cache import cache
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
 from django.db.utils import OperationalError
-from django.test import TestCase
-from touristats.models import AllCountryStats
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from touristats.management.commands.check_db import _percentile
+from touristats.models import (
+    AirConnectivityDistribution,
+    AllCountryStats,
+    CountryAnnualSummary,
+    MonthlyArrivalsSummary,
+    TimeFrame,
+    TourismIncome,
+)
+from touristats.utils.aggregate_util import country_ranking, top_markets
+from touristats.utils.cache_util import bump_dataset_version
+from touristats.utils.cube import ArrivalsCube
+from touristats.utils.ingest_util import MONTHS
+from touristats.utils.model_util import normalize_country_id
+from touristats.utils.pagination import KeysetPaginator, decode_cursor, encode_cursor
+from touristats.utils.period_util import period_range_q
+from touristats.utils.snapshot_util import get_current_snapshots, read_manifest
+from touristats.utils.summary_util import refresh_summaries, summaries_current
+from touristats.views import (
+    ARRIVALS_ORDERING,
+    _compare_queryset,
+    _country_arrivals_queryset,
+)
 
 
 class CheckDBCommandTest(TestCase):
@@ -35,6 +66,22 @@ class CheckDBCommandTest(TestCase):
         self.assertIn("Host:", output)
         self.assertIn("User:", output)
 
+    def test_probe(self):
+        """Test the probe reports connect time and latency percentiles"""
+        call_command("check_db", "--probe", "--queries", "20", stdout=self.out)
+        output = self.out.getvalue()
+
+        self.assertIn("Connect time:", output)
+        self.assertIn("Round trip over 20 queries", output)
+        self.assertIn("p95", output)
+        self.assertIn("Connection pool: disabled", output)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(_percentile(values, 50), 50)
+        self.assertEqual(_percentile(values, 99), 99)
+        self.assertEqual(_percentile([7], 95), 7)
+
     def tearDown(self):
         self.out.close()
 
@@ -55,3 +102,989 @@ class TouristatsViewTest(TestCase):
         self.assertEqual(arrivals_list[0].year, "2043")
         self.assertEqual(arrivals_list[0].month, "January")
         self.assertEqual(arrivals_list[0].passengers, 1)
+
+
+class AllCountryStatsBulkInsertTest(TestCase):
+    def setUp(self):
+        self.out = StringIO()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp_dir.name, "all_country_arrivals_2023.csv")
+
+    def write_csv(self, rows):
+        with open(self.file_path, "w") as f:
+            f.write("Index,Country," + ",".join(MONTHS) + ",Total\n")
+            for index, (country, values) in enumerate(rows, 1):
+                f.write(f"{index},{country}," + ",".join(values) + ",0\n")
+
+    def test_bulk_insert(self):
+        """Test bulk import cleans values and links every month to a TimeFrame"""
+        self.write_csv(
+            [
+                ("India", ['"1,500"'] + ["10"] * 11),
+                ("United Kingdom", ["n/a"] + ["20"] * 11),
+            ]
+        )
+        call_command("allcountrystats_insert_data", 2023, self.file_path, "--bulk", stdout=self.out)
+
+        self.assertEqual(AllCountryStats.objects.count(), 24)
+        self.assertEqual(TimeFrame.objects.filter(year=2023).count(), 12)
+        january = AllCountryStats.objects.filter(timeframe__year=2023, timeframe__month=1)
+        self.assertEqual(january.get(country_id="INDIA").passengers, 1500)
+        self.assertEqual(january.get(country_id="UNITED_KINGDOM").passengers, 0)
+
+    def test_bulk_insert_upserts(self):
+        """Test re-importing a year updates rows instead of duplicating them"""
+        self.write_csv([("India", ["10"] * 12)])
+        call_command(
+            "allcountrystats_insert_data",
+            2023,
+            self.file_path,
+            "--bulk",
+            "--batch-size",
+            "5",
+            stdout=self.out,
+        )
+        self.write_csv([("India", ["30"] * 12)])
+        call_command(
+            "allcountrystats_insert_data",
+            2023,
+            self.file_path,
+            "--bulk",
+            "--batch-size",
+            "5",
+            stdout=self.out,
+        )
+
+        self.assertEqual(AllCountryStats.objects.count(), 12)
+        self.assertEqual(set(AllCountryStats.objects.values_list("passengers", flat=True)), {30})
+
+    def tearDown(self):
+        self.out.close()
+        self.tmp_dir.cleanup()
+
+
+class AllCountryStatsInsertDirectoryTest(TestCase):
+    def setUp(self):
+        self.out = StringIO()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def write_csv(self, name, passengers):
+        with open(os.path.join(self.tmp_dir.name, name), "w") as f:
+            f.write("Country," + ",".join(MONTHS) + "\n")
+            f.write("India," + ",".join([str(passengers)] * 12) + "\n")
+
+    def test_insert_directory(self):
+        """Test every file is imported under the year taken from its name"""
+        self.write_csv("all_country_arrivals_2019.csv", 5)
+        self.write_csv("all_country_arrivals_2020.csv", 7)
+        call_command(
+            "allcountrystats_insert_directory", self.tmp_dir.name, "--workers", "1", stdout=self.out
+        )
+
+        self.assertEqual(AllCountryStats.objects.filter(timeframe__year=2019).count(), 12)
+        self.assertEqual(
+            set(
+                AllCountryStats.objects.filter(timeframe__year=2020).values_list(
+                    "passengers", flat=True
+                )
+            ),
+            {7},
+        )
+
+    def test_file_without_year(self):
+        """Test a file name without a year is rejected before anything is imported"""
+        self.write_csv("all_country_arrivals_2019.csv", 5)
+        self.write_csv("all_country_arrivals.csv", 5)
+        with self.assertRaises(CommandError):
+            call_command("allcountrystats_insert_directory", self.tmp_dir.name, stdout=self.out)
+        self.assertEqual(AllCountryStats.objects.count(), 0)
+
+    def tearDown(self):
+        self.out.close()
+        self.tmp_dir.cleanup()
+
+
+class GetAllArrivalsViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        for year in [2022, 2023]:
+            timeframe = TimeFrame.objects.create(year=year, month=1)
+            for country, passengers in [("India", 100), ("United Kingdom", 50)]:
+                AllCountryStats.objects.create(
+                    timeframe=timeframe, country=country, passengers=passengers
+                )
+
+    def get(self, **params):
+        response = self.client.get(reverse("get_all_arrivals"), params)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_json_results(self):
+        """Test the streamed document holds every row"""
+        _, content = self.get()
+        results = json.loads(content)["results"]
+        self.assertEqual(len(results), 4)
+        self.assertEqual(
+            set(results[0]),
+            {
+                "id",
+                "country_id",
+                "timeframe_id",
+                "country",
+                "passengers",
+                "days_of_stay",
+                "purpose_of_visit",
+            },
+        )
+
+    def test_ndjson_filtered(self):
+        """Test year and country filters with NDJSON output"""
+        response, content = self.get(year=2023, country="united kingdom", format="ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["country_id"], "UNITED_KINGDOM")
+        self.assertEqual(rows[0]["passengers"], 50)
+
+    def test_invalid_year(self):
+        response = self.client.get(reverse("get_all_arrivals"), {"year": "abc"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ArrivalsPaginatedViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        for month in range(1, 6):
+            timeframe = TimeFrame.objects.create(year=2023, month=month)
+            for country in ["India", "China", "Germany", "France", "Russia"]:
+                AllCountryStats.objects.create(timeframe=timeframe, country=country, passengers=1)
+
+    def get_json(self, **params):
+        return self.client.get(reverse("allcountry_arrivals_json"), params).json()
+
+    def test_walk_pages(self):
+        """Test following next cursors visits every row once in keyset order"""
+        seen = []
+        page = self.get_json(page_size=10)
+        self.assertIsNone(page["previous"])
+        while True:
+            seen.extend(row["id"] for row in page["results"])
+            if page["next"] is None:
+                break
+            page = self.get_json(page_size=10, after=page["next"])
+
+        expected = AllCountryStats.objects.order_by("timeframe_id", "country_id", "id")
+        self.assertEqual(seen, list(expected.values_list("id", flat=True)))
+        self.assertEqual(page["count_estimate"], 25)
+
+    def test_previous_cursor(self):
+        """Test the previous cursor of the second page leads back to the first page"""
+        first = self.get_json(page_size=10)
+        second = self.get_json(page_size=10, after=first["next"])
+        back = self.get_json(page_size=10, before=second["previous"])
+        self.assertEqual(back["results"], first["results"])
+        self.assertIsNone(back["previous"])
+
+    def test_page_size_capped(self):
+        page = self.get_json(page_size=100000)
+        self.assertEqual(page["page_size"], 100)
+        self.assertEqual(len(page["results"]), 25)
+
+    def test_cursor_with_invalid_values(self):
+        """Test a well formed cursor holding values of the wrong type falls back to page one"""
+        cursor = encode_cursor(["a", ["b"], {"c": 1}])
+        page = self.get_json(page_size=10, after=cursor)
+        self.assertEqual(page["results"], self.get_json(page_size=10)["results"])
+
+    def test_html_page(self):
+        response = self.client.get(reverse("allcountry_arrivals"), {"after": "not-a-cursor"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["page_obj"]), 10)
+        self.assertContains(response, "next")
+
+
+class CountryArrivalsViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        for year in [2022, 2023]:
+            for month in [3, 1, 2]:
+                timeframe = TimeFrame.objects.create(year=year, month=month)
+                AllCountryStats.objects.create(
+                    timeframe=timeframe, country="Sri Lanka", passengers=year * 100 + month
+                )
+                AllCountryStats.objects.create(timeframe=timeframe, country="Total", passengers=1)
+
+    def get(self, country_name, **params):
+        url = reverse("country_arrivals_json", kwargs={"country_name": country_name})
+        return self.client.get(url, params)
+
+    def test_series_in_one_query(self):
+        """Test the series is chronological and costs a single query besides the version"""
+        with self.assertNumQueries(2):
+            data = self.get("sri lanka").json()
+        self.assertEqual(data["labels"][0], "January 2022")
+        self.assertEqual(data["data"], [202201, 202202, 202203, 202301, 202302, 202303])
+
+    def test_period_range(self):
+        data = self.get("Sri Lanka", **{"from": "2022-03", "to": "2023-02"}).json()
+        self.assertEqual(data["data"], [202203, 202301, 202302])
+
+    def test_total_excluded(self):
+        self.assertEqual(self.get("Total").json()["data"], [])
+
+    def test_invalid_period(self):
+        self.assertEqual(self.get("Sri Lanka", to="2023-13").status_code, 400)
+
+
+class VersionedCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.out = StringIO()
+        timeframe = TimeFrame.objects.create(year=2023, month=1)
+        AllCountryStats.objects.create(timeframe=timeframe, country="India", passengers=10)
+        self.url = reverse("country_arrivals_json", kwargs={"country_name": "India"})
+
+    def test_hit_costs_only_the_version_lookup(self):
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.json()["data"], [10])
+
+    def test_query_parameters_are_part_of_the_key(self):
+        self.client.get(self.url)
+        self.assertEqual(self.client.get(self.url, {"from": "2023-02"}).json()["data"], [])
+
+    def test_streamed_response_cached(self):
+        url = reverse("get_all_arrivals")
+        first = b"".join(self.client.get(url).streaming_content)
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.content, first)
+
+    @override_settings(TOURISTATS_MAX_CACHED_RESPONSE_BYTES=16)
+    def test_large_responses_not_cached(self):
+        """Entries are bounded in bytes as well as in number"""
+        url = reverse("get_all_arrivals")
+        for _ in range(2):
+            self.assertEqual(self.client.get(self.url)["X-Cache"], "MISS")
+            response = self.client.get(url)
+            self.assertEqual(response["X-Cache"], "MISS")
+            self.assertGreater(len(b"".join(response.streaming_content)), 16)
+
+    def test_delete_command_invalidates(self):
+        """Test the delete command bumps the version so the next request is not stale"""
+        self.client.get(self.url)
+        call_command("allcountrystats_delete_data", "--confirm", stdout=self.out)
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["data"], [])
+
+    def test_insert_command_invalidates(self):
+        self.client.get(self.url)
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+            f.write("Country," + ",".join(MONTHS) + "\n" + "India," + ",".join(["20"] * 12))
+            f.flush()
+            call_command("allcountrystats_insert_data", 2023, f.name, "--bulk", stdout=self.out)
+        self.assertEqual(self.client.get(self.url).json()["data"], [20] * 12)
+
+    def tearDown(self):
+        self.out.close()
+
+
+class ArrivalsCubeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.out = StringIO()
+        self.cube_dir = tempfile.TemporaryDirectory()
+        for year, month, passengers in [(2022, 12, 5), (2023, 1, 10), (2023, 3, 0)]:
+            timeframe = TimeFrame.objects.create(year=year, month=month)
+            AllCountryStats.objects.create(
+                timeframe=timeframe, country="India", passengers=passengers
+            )
+        self.url = reverse("country_arrivals_json", kwargs={"country_name": "India"})
+
+    def build(self):
+        with self.settings(TOURISTATS_CUBE_DIR=self.cube_dir.name):
+            call_command("build_arrivals_cube", stdout=self.out)
+
+    def test_build_and_lookup(self):
+        self.build()
+        cube = ArrivalsCube(self.cube_dir.name)
+        self.assertEqual(cube.get("INDIA", 2023, 1), 10)
+        self.assertEqual(cube.get("INDIA", 2023, 3), 0)
+        self.assertIsNone(cube.get("INDIA", 2023, 2))
+        self.assertIsNone(cube.get("CHINA", 2023, 1))
+        self.assertEqual(
+            cube.country_series("INDIA", start=(2023, 1)), [(2023, 1, 10), (2023, 3, 0)]
+        )
+
+    def test_view_reads_the_cube(self):
+        """Test the view only looks up the dataset version when the cube is current"""
+        self.build()
+        with self.settings(TOURISTATS_CUBE_DIR=self.cube_dir.name):
+            with self.assertNumQueries(1):
+                data = self.client.get(self.url).json()
+        self.assertEqual(data["labels"], ["December 2022", "January 2023", "March 2023"])
+        self.assertEqual(data["data"], [5, 10, 0])
+
+    def test_stale_cube_not_used(self):
+        self.build()
+        AllCountryStats.objects.filter(passengers=10).update(passengers=11)
+        call_command("allcountrystats_delete_data", "--year", "2022", "--confirm", stdout=self.out)
+        with self.settings(TOURISTATS_CUBE_DIR=self.cube_dir.name):
+            self.assertEqual(self.client.get(self.url).json()["data"], [11, 0])
+
+    def test_rebuilt_after_ingest(self):
+        with self.settings(TOURISTATS_CUBE_DIR=self.cube_dir.name):
+            call_command(
+                "allcountrystats_delete_data", "--year", "2022", "--confirm", stdout=self.out
+            )
+            self.assertEqual(ArrivalsCube(self.cube_dir.name).country_series("INDIA")[0][0], 2023)
+            with self.assertNumQueries(1):
+                self.assertEqual(self.client.get(self.url).json()["data"], [10, 0])
+
+    def test_output_required(self):
+        with self.settings(TOURISTATS_CUBE_DIR=None):
+            with self.assertRaises(CommandError):
+                call_command("build_arrivals_cube", stdout=self.out)
+
+    def tearDown(self):
+        self.cube_dir.cleanup()
+        self.out.close()
+
+
+class ChartSnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.out = StringIO()
+        self.snapshot_dir = tempfile.TemporaryDirectory()
+        for year, month in [(2022, 12), (2023, 1)]:
+            timeframe = TimeFrame.objects.create(year=year, month=month)
+            AllCountryStats.objects.create(timeframe=timeframe, country="India", passengers=month)
+            AllCountryStats.objects.create(timeframe=timeframe, country="China", passengers=5)
+            AllCountryStats.objects.create(timeframe=timeframe, country="Total", passengers=99)
+
+    def build(self):
+        with self.settings(TOURISTATS_SNAPSHOT_DIR=self.snapshot_dir.name):
+            call_command("build_chart_snapshots", stdout=self.out)
+        return read_manifest(self.snapshot_dir.name)
+
+    def read(self, path, compressed=False):
+        full_path = os.path.join(self.snapshot_dir.name, path)
+        if compressed:
+            with gzip.open(full_path + ".gz") as f:
+                return json.load(f)
+        with open(full_path) as f:
+            return json.load(f)
+
+    def test_snapshots_match_the_views(self):
+        manifest = self.build()
+        self.assertEqual(sorted(manifest["countries"]), ["CHINA", "INDIA"])
+
+        india = self.read(manifest["countries"]["INDIA"])
+        view = self.client.get(reverse("country_arrivals_json", kwargs={"country_name": "India"}))
+        self.assertEqual({"labels": india["labels"], "data": india["data"]}, view.json())
+        self.assertEqual(india, self.read(manifest["countries"]["INDIA"], compressed=True))
+
+        compare = self.read(manifest["compare"]["top10"])
+        self.assertEqual(compare, self.client.get(reverse("compare_arrivals"), {"top": 10}).json())
+
+    def test_content_hashed(self):
+        first = self.build()
+        AllCountryStats.objects.filter(country_id="INDIA", passengers=1).update(passengers=7)
+        bump_dataset_version()
+        second = self.build()
+        self.assertEqual(first["countries"]["CHINA"], second["countries"]["CHINA"])
+        self.assertNotEqual(first["countries"]["INDIA"], second["countries"]["INDIA"])
+        # The previous build's files stay for pages that were loaded before
+        self.assertTrue(
+            os.path.exists(os.path.join(self.snapshot_dir.name, first["countries"]["INDIA"]))
+        )
+
+    def test_page_uses_current_snapshots(self):
+        manifest = self.build()
+        with self.settings(TOURISTATS_SNAPSHOT_DIR=self.snapshot_dir.name):
+            snapshots = self.client.get(reverse("country_arrival_page")).context["snapshots"]
+            self.assertEqual(
+                snapshots["countries"]["INDIA"], "/snapshots/" + manifest["countries"]["INDIA"]
+            )
+            bump_dataset_version()
+            self.assertIsNone(self.client.get(reverse("country_arrival_page")).context["snapshots"])
+
+    def test_rebuilt_after_ingest(self):
+        with self.settings(TOURISTATS_SNAPSHOT_DIR=self.snapshot_dir.name):
+            call_command(
+                "allcountrystats_delete_data", "--year", "2022", "--confirm", stdout=self.out
+            )
+            self.assertIsNotNone(get_current_snapshots())
+        manifest = read_manifest(self.snapshot_dir.name)
+        self.assertEqual(self.read(manifest["countries"]["INDIA"])["labels"], ["January 2023"])
+
+    def test_output_required(self):
+        with self.settings(TOURISTATS_SNAPSHOT_DIR=None):
+            with self.assertRaises(CommandError):
+                call_command("build_chart_snapshots", stdout=self.out)
+
+    def tearDown(self):
+        self.snapshot_dir.cleanup()
+        self.out.close()
+
+
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        for month in [1, 2]:
+            timeframe = TimeFrame.objects.create(year=2023, month=month)
+            AllCountryStats.objects.create(
+                timeframe=timeframe, country="India", passengers=month * 10
+            )
+        timeframe = TimeFrame.objects.create(year=2023)
+        TourismIncome.objects.create(
+            timeframe=timeframe,
+            number_of_tourists=100,
+            average_expenditure_month=1.5,
+            average_expenditure_day=0.5,
+            total_value=150.0,
+        )
+        AirConnectivityDistribution.objects.create(
+            air_connectivity_id="2023_UL",
+            timeframe=timeframe,
+            airline="SriLankan Airlines",
+            number_of_passengers=50,
+            percentage=50.0,
+        )
+
+    async def test_country_arrivals(self):
+        url = reverse("country_arrivals_json_async", kwargs={"country_name": "india"})
+        response = await self.async_client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["data"], [10, 20])
+        self.assertEqual((await self.async_client.get(url))["X-Cache"], "HIT")
+
+    async def test_streamed_export(self):
+        url = reverse("get_all_arrivals_async")
+        response = await self.async_client.get(url, {"format": "ndjson"})
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([row["passengers"] for row in rows], [10, 20])
+
+    async def test_paginated(self):
+        response = await self.async_client.get(reverse("allcountry_arrivals_json_async"))
+        self.assertEqual(len(response.json()["results"]), 2)
+
+    async def test_country_overview(self):
+        url = reverse("country_overview", kwargs={"country_name": "India"})
+        data = (await self.async_client.get(url, {"from": "2023", "to": "2023"})).json()
+        self.assertEqual(data["arrivals"]["data"], [10, 20])
+        self.assertEqual(data["income"][0]["year"], 2023)
+        self.assertEqual(data["income"][0]["total_value"], 150.0)
+        self.assertEqual(data["air_connectivity"][0]["airline"], "SriLankan Airlines")
+
+        data = (await self.async_client.get(url, {"from": "2024"})).json()
+        self.assertEqual(data["income"], [])
+
+
+class CompareArrivalsViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        arrivals = {
+            "India": {1: 30, 2: 40, 3: 50},
+            "China": {1: 20, 3: 25},
+            "Germany": {2: 5},
+            "Total": {1: 55, 2: 45, 3: 75},
+        }
+        timeframes = {
+            month: TimeFrame.objects.create(year=2023, month=month) for month in [1, 2, 3]
+        }
+        for country, months in arrivals.items():
+            for month, passengers in months.items():
+                AllCountryStats.objects.create(
+                    timeframe=timeframes[month], country=country, passengers=passengers
+                )
+
+    def get(self, **params):
+        return self.client.get(reverse("compare_arrivals"), params)
+
+    def test_countries_in_one_query(self):
+        """Test all series are aligned and zero-filled from a single query besides the version"""
+        with self.assertNumQueries(2):
+            data = self.get(countries="china,India").json()
+        self.assertEqual(data["labels"], ["January 2023", "February 2023", "March 2023"])
+        self.assertEqual([series["country_id"] for series in data["series"]], ["CHINA", "INDIA"])
+        self.assertEqual(data["series"][0]["data"], [20, 0, 25])
+        self.assertEqual(data["series"][1]["total"], 120)
+
+    def test_top_countries(self):
+        with self.assertNumQueries(2):
+            data = self.get(top=2, **{"from": "2023-02"}).json()
+        self.assertEqual(data["labels"], ["February 2023", "March 2023"])
+        self.assertEqual([series["country"] for series in data["series"]], ["India", "China"])
+        self.assertEqual(data["series"][1]["data"], [0, 25])
+
+    def test_period_zero_filled(self):
+        data = self.get(countries="Germany", **{"from": "2022-12", "to": "2023-02"}).json()
+        self.assertEqual(data["series"][0]["data"], [0, 0, 5])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.get().status_code, 400)
+        self.assertEqual(self.get(countries="India", top=2).status_code, 400)
+        self.assertEqual(self.get(top=0).status_code, 400)
+        self.assertEqual(self.get(top="ten").status_code, 400)
+        self.assertEqual(self.get(countries="Total").status_code, 400)
+
+    def test_chart_page(self):
+        response = self.client.get(reverse("country_arrival_page"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, reverse("compare_arrivals"))
+
+
+class AggregationViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        arrivals = {
+            (2022, 1): {"India": 10, "China": 30},
+            (2023, 1): {"India": 40, "China": 20, "Germany": 40},
+            (2023, 2): {"India": 50, "Germany": 5},
+        }
+        for (year, month), countries in arrivals.items():
+            timeframe = TimeFrame.objects.create(year=year, month=month)
+            AllCountryStats.objects.create(timeframe=timeframe, country="Total", passengers=999)
+            for country, passengers in countries.items():
+                AllCountryStats.objects.create(
+                    timeframe=timeframe, country=country, passengers=passengers
+                )
+
+    def test_monthly_totals(self):
+        totals = self.client.get(reverse("arrivals_totals")).json()["totals"]
+        self.assertEqual(
+            [total["label"] for total in totals], ["January 2022", "January 2023", "February 2023"]
+        )
+        self.assertEqual([total["arrivals"] for total in totals], [40, 100, 55])
+        self.assertEqual(totals[1]["yoy"], 1.5)
+        self.assertIsNone(totals[2]["previous"])
+
+    def test_annual_totals_from(self):
+        """Test the first year of a range still gets its previous year"""
+        response = self.client.get(
+            reverse("arrivals_totals"), {"granularity": "year", "from": "2023"}
+        )
+        totals = response.json()["totals"]
+        self.assertEqual(len(totals), 1)
+        self.assertEqual((totals[0]["arrivals"], totals[0]["previous"]), (155, 40))
+
+    def add_arrivals(self, year, month, countries):
+        timeframe = TimeFrame.objects.create(year=year, month=month)
+        for country, passengers in countries.items():
+            AllCountryStats.objects.create(
+                timeframe=timeframe, country=country, passengers=passengers
+            )
+
+    def test_totals_from_mid_year(self):
+        """Test a range starting mid-year counts and compares only the months within it"""
+        self.add_arrivals(2022, 6, {"India": 7})
+        self.add_arrivals(2023, 6, {"India": 9, "China": 5})
+        params = {"granularity": "year", "from": "2023-05"}
+        totals = self.client.get(reverse("arrivals_totals"), params).json()["totals"]
+        self.assertEqual([total["label"] for total in totals], ["2023"])
+        self.assertEqual((totals[0]["arrivals"], totals[0]["previous"]), (14, 7))
+
+        params = {"granularity": "quarter", "from": "2023-05"}
+        totals = self.client.get(reverse("arrivals_totals"), params).json()["totals"]
+        self.assertEqual([total["label"] for total in totals], ["Q2 2023"])
+        self.assertEqual((totals[0]["arrivals"], totals[0]["previous"]), (14, 7))
+
+    def test_totals_to_mid_year(self):
+        """Test the previous total of a range ending mid-year stops at the same month"""
+        self.add_arrivals(2022, 6, {"India": 7})
+        params = {"granularity": "year", "from": "2022", "to": "2023-02"}
+        totals = self.client.get(reverse("arrivals_totals"), params).json()["totals"]
+        self.assertEqual([total["arrivals"] for total in totals], [47, 155])
+        self.assertEqual(totals[1]["previous"], 40)
+
+    def test_top_markets(self):
+        periods = self.client.get(reverse("arrivals_top_markets"), {"top": 2}).json()["periods"]
+        self.assertEqual([period["label"] for period in periods], ["2022", "2023"])
+        markets = periods[1]["markets"]
+        self.assertEqual([market["country"] for market in markets], ["India", "Germany"])
+        self.assertEqual(markets[0]["rank"], 1)
+        self.assertAlmostEqual(markets[0]["share"], 90 / 155)
+
+    def test_ranking(self):
+        ranking = self.client.get(reverse("arrivals_ranking"), {"year": 2023, "month": 1}).json()
+        ranks = {row["country_id"]: row for row in ranking["ranking"]}
+        # India and Germany tie for the first place
+        self.assertEqual(ranks["INDIA"]["rank"], 1)
+        self.assertEqual(ranks["GERMANY"]["rank"], 1)
+        self.assertEqual(ranks["CHINA"]["rank"], 3)
+        self.assertEqual(ranks["INDIA"]["yoy"], 3.0)
+        self.assertIsNone(ranks["GERMANY"]["yoy"])
+        self.assertAlmostEqual(ranks["CHINA"]["share"], 0.2)
+        self.assertNotIn("TOTAL", ranks)
+
+    def test_invalid_requests(self):
+        self.assertEqual(
+            self.client.get(reverse("arrivals_totals"), {"granularity": "week"}).status_code, 400
+        )
+        self.assertEqual(
+            self.client.get(reverse("arrivals_top_markets"), {"top": 0}).status_code, 400
+        )
+        self.assertEqual(self.client.get(reverse("arrivals_ranking")).status_code, 400)
+        self.assertEqual(
+            self.client.get(reverse("arrivals_ranking"), {"year": 2023, "month": 13}).status_code,
+            400,
+        )
+
+
+class SummaryAggregationViewTest(AggregationViewTest):
+    """The aggregation views must answer the same from the summary tables."""
+
+    def setUp(self):
+        super().setUp()
+        refresh_summaries()
+
+    def add_arrivals(self, year, month, countries):
+        super().add_arrivals(year, month, countries)
+        refresh_summaries()
+
+    def test_served_from_summaries(self):
+        with patch("touristats.views.period_totals") as period_totals:
+            with patch("touristats.views.top_markets") as top_markets:
+                with patch("touristats.views.country_ranking") as country_ranking:
+                    self.client.get(reverse("arrivals_totals"), {"granularity": "year"})
+                    self.client.get(reverse("arrivals_top_markets"), {"from": "2023", "to": "2023"})
+                    self.client.get(reverse("arrivals_ranking"), {"year": 2023})
+        period_totals.assert_not_called()
+        top_markets.assert_not_called()
+        country_ranking.assert_not_called()
+
+    def test_quarterly_totals(self):
+        response = self.client.get(reverse("arrivals_totals"), {"granularity": "quarter"})
+        totals = response.json()["totals"]
+        self.assertEqual([total["label"] for total in totals], ["Q1 2022", "Q1 2023"])
+        self.assertEqual((totals[1]["arrivals"], totals[1]["previous"]), (155, 40))
+
+    def test_annual_ranking(self):
+        ranking = self.client.get(reverse("arrivals_ranking"), {"year": 2023}).json()["ranking"]
+        self.assertEqual([row["country_id"] for row in ranking], ["INDIA", "GERMANY", "CHINA"])
+        self.assertEqual((ranking[0]["previous"], ranking[0]["yoy"]), (10, 8.0))
+        self.assertAlmostEqual(ranking[2]["share"], 20 / 155)
+
+    def test_stale_summaries_not_used(self):
+        bump_dataset_version()
+        with patch("touristats.views.period_totals", return_value=[]) as period_totals:
+            self.client.get(reverse("arrivals_totals"))
+        period_totals.assert_called_once()
+
+
+class RefreshSummariesTest(TestCase):
+    def setUp(self):
+        self.out = StringIO()
+        for year in [2022, 2023]:
+            timeframe = TimeFrame.objects.create(year=year, month=1)
+            AllCountryStats.objects.create(timeframe=timeframe, country="Total", passengers=999)
+            AllCountryStats.objects.create(timeframe=timeframe, country="India", passengers=year)
+            AllCountryStats.objects.create(timeframe=timeframe, country="China", passengers=10)
+
+    def test_refresh(self):
+        self.assertFalse(summaries_current())
+        self.assertEqual(refresh_summaries(), [2022, 2023])
+        self.assertTrue(summaries_current())
+        monthly = MonthlyArrivalsSummary.objects.get(year=2023, month=1)
+        self.assertEqual((monthly.arrivals, monthly.countries), (2033, 2))
+        china = CountryAnnualSummary.objects.get(country_id="CHINA", year=2023)
+        self.assertEqual((china.arrivals, china.rank), (10, 2))
+        self.assertFalse(CountryAnnualSummary.objects.filter(country_id="TOTAL").exists())
+
+    def test_refresh_years(self):
+        refresh_summaries()
+        AllCountryStats.objects.filter(country_id="CHINA", timeframe__year=2023).update(
+            passengers=5000
+        )
+        AllCountryStats.objects.filter(country_id="CHINA", timeframe__year=2022).update(
+            passengers=0
+        )
+        self.assertEqual(refresh_summaries([2023]), [2023])
+        self.assertEqual(CountryAnnualSummary.objects.get(country_id="CHINA", year=2023).rank, 1)
+        # Other years are left as they were
+        self.assertEqual(
+            CountryAnnualSummary.objects.get(country_id="CHINA", year=2022).arrivals, 10
+        )
+
+    def test_refreshed_after_ingest(self):
+        refresh_summaries()
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+            f.write("Country," + ",".join(MONTHS) + "\n")
+            f.write("India," + ",".join(["7"] * 12) + "\n")
+            f.flush()
+            call_command("allcountrystats_insert_data", 2024, f.name, "--bulk", stdout=self.out)
+        self.assertTrue(summaries_current())
+        self.assertEqual(MonthlyArrivalsSummary.objects.filter(year=2024).count(), 12)
+        self.assertEqual(CountryAnnualSummary.objects.get(year=2024).arrivals, 84)
+
+    def test_refreshed_after_delete(self):
+        refresh_summaries()
+        call_command("allcountrystats_delete_data", "--year", "2022", "--confirm", stdout=self.out)
+        self.assertTrue(summaries_current())
+        self.assertFalse(MonthlyArrivalsSummary.objects.filter(year=2022).exists())
+        self.assertTrue(MonthlyArrivalsSummary.objects.filter(year=2023).exists())
+
+    def test_command(self):
+        call_command("refresh_summaries", "--year", "2023", stdout=self.out)
+        # Never refreshed before, so every year is rebuilt
+        self.assertEqual(MonthlyArrivalsSummary.objects.count(), 2)
+        self.assertIn("2022, 2023", self.out.getvalue())
+
+    def tearDown(self):
+        self.out.close()
+
+
+def seed_arrivals(countries=40, years=(2022, 2023)):
+    """Bulk insert ``countries`` markets (plus 'Total') for every month of ``years``."""
+    timeframes = [
+        TimeFrame.objects.create(year=year, month=month) for year in years for month in range(1, 13)
+    ]
+    names = [f"Country {index:03d}" for index in range(countries)] + ["Total"]
+    AllCountryStats.objects.bulk_create(
+        [
+            AllCountryStats(
+                country_id=normalize_country_id(name),
+                country=name,
+                timeframe=timeframe,
+                passengers=(index + 1) * timeframe.month,
+            )
+            for index, name in enumerate(names)
+            for timeframe in timeframes
+        ]
+    )
+    annual = TimeFrame.objects.create(year=years[-1])
+    TourismIncome.objects.create(
+        timeframe=annual,
+        number_of_tourists=100,
+        average_expenditure_month=1.5,
+        average_expenditure_day=0.5,
+        total_value=150.0,
+    )
+    for index in range(5):
+        AirConnectivityDistribution.objects.create(
+            air_connectivity_id=f"{years[-1]}_{index}",
+            timeframe=annual,
+            airline=f"Airline {index}",
+            number_of_passengers=index,
+            percentage=float(index),
+        )
+    # As after any ingest, so a bump is an update and not a first insert
+    bump_dataset_version()
+
+
+# Incremental summary refresh: the version checks (2), its transaction (2), one delete,
+# select and insert per table (6) and setting the summaries version (2)
+SUMMARY_REFRESH_QUERIES = 12
+
+
+class QueryCountTest(TestCase):
+    """Exact number of queries of every view and command, independent of the data volume.
+
+    The view counts include the dataset version lookup of ``cache_versioned``.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_arrivals()
+        refresh_summaries()
+
+    def setUp(self):
+        cache.clear()
+        self.out = StringIO()
+
+    def assertViewQueries(self, num, name, params=None, **kwargs):
+        with self.assertNumQueries(num):
+            response = self.client.get(reverse(name, kwargs=kwargs or None), params or {})
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_paginated_views(self):
+        # Version, row count estimate and the page with its timeframes joined
+        response = self.assertViewQueries(3, "allcountry_arrivals_json")
+        # The count estimate is cached across pages and views
+        self.assertViewQueries(2, "allcountry_arrivals_json", {"after": response.json()["next"]})
+        self.assertViewQueries(2, "allcountry_arrivals")
+
+    def test_export_views(self):
+        self.assertViewQueries(2, "get_all_arrivals")
+        self.assertViewQueries(2, "get_all_arrivals", {"year": 2023, "format": "ndjson"})
+        self.assertViewQueries(2, "get_all_arrivals", {"country": "Country 001"})
+
+    def test_country_views(self):
+        self.assertViewQueries(2, "country_arrivals_json", country_name="Country 001")
+        self.assertViewQueries(2, "compare_arrivals", {"countries": "Country 001,Country 002"})
+        self.assertViewQueries(2, "compare_arrivals", {"top": 10, "from": "2023"})
+        self.assertViewQueries(0, "country_arrival_page")
+
+    def test_aggregation_views(self):
+        # Months are aggregated from AllCountryStats in a single query
+        self.assertViewQueries(2, "arrivals_top_markets", {"top": 5, "granularity": "month"})
+        self.assertViewQueries(2, "arrivals_ranking", {"year": 2023, "month": 6})
+        # The summaries version check and the monthly summaries
+        self.assertViewQueries(3, "arrivals_totals")
+        self.assertViewQueries(3, "arrivals_totals", {"granularity": "quarter", "from": "2023"})
+        # The summaries version check, the annual summaries and the year totals
+        self.assertViewQueries(4, "arrivals_top_markets", {"top": 5})
+        self.assertViewQueries(4, "arrivals_ranking", {"year": 2023})
+
+    def test_cache_hits(self):
+        self.assertViewQueries(2, "compare_arrivals", {"top": 10})
+        self.assertViewQueries(1, "compare_arrivals", {"top": 10})
+
+    def test_insert_data_bulk(self):
+        """Test the bulk insert costs the same number of queries for any number of countries"""
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+            f.write("Country," + ",".join(MONTHS) + "\n")
+            for index in range(50):
+                f.write(f"Country {index:03d}," + ",".join(["7"] * 12) + "\n")
+            f.flush()
+            # The transaction savepoint and its release, timeframes (insert and select),
+            # one upsert per batch of 100 rows, the version bump (update and select) and
+            # the summaries of the year
+            with self.assertNumQueries(2 + 2 + 6 + 2 + SUMMARY_REFRESH_QUERIES):
+                call_command(
+                    "allcountrystats_insert_data",
+                    2024,
+                    f.name,
+                    "--bulk",
+                    "--batch-size",
+                    "100",
+                    stdout=self.out,
+                )
+
+    def test_insert_data(self):
+        """Test the row by row insert resolves each month once, not once per country"""
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+            f.write("Country," + ",".join(MONTHS) + "\n")
+            for index in range(2):
+                f.write(f"Country {index:03d}," + ",".join(["7"] * 12) + "\n")
+            f.flush()
+            # 12 TimeFrame lookups (4 queries each when created), 24 inserts, version bump
+            # and the summaries of the year
+            with self.assertNumQueries(12 * 4 + 24 + 2 + SUMMARY_REFRESH_QUERIES):
+                call_command("allcountrystats_insert_data", 2024, f.name, stdout=self.out)
+
+    def test_insert_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for year in [2024, 2025]:
+                with open(os.path.join(directory, f"all_country_arrivals_{year}.csv"), "w") as f:
+                    f.write("Country," + ",".join(MONTHS) + "\n")
+                    f.write("India," + ",".join(["7"] * 12) + "\n")
+            # Per year: timeframes (2), the upsert and its transaction savepoint (2)
+            with self.assertNumQueries(2 * 5 + 2 + SUMMARY_REFRESH_QUERIES):
+                call_command(
+                    "allcountrystats_insert_directory", directory, "--workers", "1", stdout=self.out
+                )
+
+    def test_delete_data(self):
+        # Count and delete of the rows, the orphaned timeframes (their lookup, the
+        # attractions lookup, one delete per related model and one of the timeframes)
+        # the version bump and the summaries of the year, which has no rows left to insert
+        with self.assertNumQueries(2 + 21 + 2 + SUMMARY_REFRESH_QUERIES - 2):
+            call_command(
+                "allcountrystats_delete_data", "--year", "2022", "--confirm", stdout=self.out
+            )
+
+    def test_build_arrivals_cube(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Version and all arrivals in one query
+            with self.assertNumQueries(2):
+                call_command("build_arrivals_cube", "--output", directory, stdout=self.out)
+
+    def test_check_db(self):
+        with self.assertNumQueries(1):
+            call_command("check_db", stdout=self.out)
+        # The connect of the probe runs on a connection of its own
+        with self.assertNumQueries(1 + 10):
+            call_command("check_db", "--probe", "--queries", "10", stdout=self.out)
+
+    def tearDown(self):
+        self.out.close()
+
+
+# Tables whose key queries must be served by an index
+INDEXED_TABLES = [
+    AllCountryStats._meta.db_table,
+    TourismIncome._meta.db_table,
+    AirConnectivityDistribution._meta.db_table,
+]
+
+
+@skipUnless(connection.vendor == "postgresql", "Query plans are checked on PostgreSQL")
+class QueryPlanTest(TestCase):
+    """Fail when an index cannot narrow down the rows a key query reads.
+
+    Sequential scans are disabled for the planner, so a ``Seq Scan`` left in a plan
+    means no index can serve the query on a table of any size. The planner then
+    also walks a whole index matching the ORDER BY rather than scan the table, so an
+    index scan that only filters its rows (a ``Filter`` without an ``Index Cond``)
+    fails too.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_arrivals(countries=200, years=range(2015, 2025))
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            # Reverted when the test's transaction is rolled back
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertIndexed(self, queryset, tables=INDEXED_TABLES):
+        plan = json.loads(queryset.explain(format="json"))[0]["Plan"]
+        text = json.dumps(plan, indent=2)
+        nodes = [plan]
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node.get("Plans", []))
+            if node.get("Relation Name") not in tables:
+                continue
+            self.assertNotEqual(node["Node Type"], "Seq Scan", text)
+            if node["Node Type"] in ("Index Scan", "Index Only Scan") and "Filter" in node:
+                self.assertIn("Index Cond", node, text)
+
+    def test_country_series(self):
+        self.assertIndexed(_country_arrivals_queryset("COUNTRY_001", None, None))
+        self.assertIndexed(_country_arrivals_queryset("COUNTRY_001", (2020, 3), (2021, 6)))
+
+    def test_year_export(self):
+        self.assertIndexed(AllCountryStats.objects.filter(timeframe__year=2020).values())
+
+    def test_keyset_page(self):
+        paginator = KeysetPaginator(
+            AllCountryStats.objects.select_related("timeframe"), ARRIVALS_ORDERING, 10
+        )
+        values = decode_cursor(paginator.get_page().next_cursor, len(ARRIVALS_ORDERING))
+        self.assertIndexed(
+            AllCountryStats.objects.filter(paginator._seek(values, "gt")).order_by(
+                *ARRIVALS_ORDERING
+            )[:10]
+        )
+
+    def test_compare(self):
+        period = period_range_q((2020, 1), (2020, 12))
+        self.assertIndexed(_compare_queryset(period, ["COUNTRY_001", "COUNTRY_002"]))
+
+    def test_aggregates(self):
+        self.assertIndexed(top_markets("month", 10, (2020, 1), (2020, 12)))
+        self.assertIndexed(country_ranking(2020, 6))
+
+    def test_annual_tables(self):
+        for model in [TourismIncome, AirConnectivityDistribution]:
+            self.assertIndexed(model.objects.filter(timeframe__year__gte=2020))
+
+    def test_summaries(self):
+        refresh_summaries()
+        self.assertIndexed(
+            CountryAnnualSummary.objects.filter(year__gte=2020, rank__lte=10),
+            [CountryAnnualSummary._meta.db_table],
+        )
@@ -0,0 +1,163 @@
+from typing import Dict, List, Optional, Tuple
+
+from django.db.models import F, Func, Min, Q, Sum, Window
+from django.db.models.functions import Lag, Rank
+from touristats.models import AllCountryStats
+from touristats.utils.period_util import period_range_q, shift_year
+
+GRANULARITIES = ("month", "year")
+
+
+class WindowSum(Func):
+    """``SUM(...) OVER (...)`` of an aggregate, e.g. the period total of grouped rows.
+
+    ``Sum`` refuses to wrap another aggregate, but ``SUM(SUM(x)) OVER (...)`` is valid
+    SQL once the rows are grouped.
+    """
+
+    function = "SUM"
+    window_compatible = True
+
+
+def period_fields(granularity: str) -> List[str]:
+    """The TimeFrame fields rows are grouped by for a granularity.
+
+    Raises:
+        ValueError: If the granularity is not "month" or "year"
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Invalid granularity: {granularity}")
+    if granularity == "year":
+        return ["timeframe__year"]
+    return ["timeframe__year", "timeframe__month"]
+
+
+def _arrivals(start: Optional[Tuple[int, int]], end: Optional[Tuple[int, int]]):
+    """Monthly rows of every country ('Total' excluded) within start..end."""
+    return (
+        AllCountryStats.objects.exclude(country_id="TOTAL")
+        .filter(timeframe__month__isnull=False)
+        .filter(period_range_q(start, end))
+    )
+
+
+def period_totals(
+    granularity: str,
+    start: Optional[Tuple[int, int]] = None,
+    end: Optional[Tuple[int, int]] = None,
+) -> List[Dict]:
+    """Total arrivals per month or year, with the total of the same period a year earlier.
+
+    Only the months within start..end count towards a period, and its previous total
+    covers the same months a year earlier, so a range starting or ending mid-year
+    compares like with like. One grouped query reads the range and the year before
+    it, sums the months of each in separate conditional sums and looks up the
+    previous year's with ``LAG`` over the periods.
+
+    Returns:
+        Chronological rows with ``timeframe__year`` (and ``timeframe__month``),
+        ``arrivals`` and ``previous`` (None without data for the previous year)
+    """
+    fields = period_fields(granularity)
+    partition = [F("timeframe__month")] if granularity == "month" else []
+    # The months of the previous year whose arrivals a period is compared with
+    shifted = Sum("passengers", filter=period_range_q(shift_year(start), shift_year(end)))
+    rows = (
+        _arrivals(shift_year(start), end)
+        .values(*fields)
+        .annotate(arrivals=Sum("passengers", filter=period_range_q(start, end)))
+        .annotate(
+            previous=Window(Lag(shifted), partition_by=partition, order_by="timeframe__year"),
+            previous_year=Window(
+                Lag("timeframe__year"), partition_by=partition, order_by="timeframe__year"
+            ),
+        )
+        .order_by(*fields)
+    )
+
+    totals = []
+    for row in rows:
+        # Periods of the year before start are only read for their previous values
+        if row["arrivals"] is None:
+            continue
+        # LAG returns the closest earlier year, which is not the previous one after a gap
+        if row.pop("previous_year") != row["timeframe__year"] - 1:
+            row["previous"] = None
+        totals.append(row)
+    return totals
+
+
+def top_markets(
+    granularity: str,
+    top: int,
+    start: Optional[Tuple[int, int]] = None,
+    end: Optional[Tuple[int, int]] = None,
+):
+    """The ``top`` source markets of every month or year, ranked in the database.
+
+    ``RANK()`` and the period total (for shares) are window functions over the rows grouped by
+    period and country; only the ranks up to ``top`` are returned, so the result is
+    ``top`` rows per period no matter how many countries there are.
+
+    Returns:
+        Queryset of rows with the period fields, ``country_id``, ``country``,
+        ``arrivals``, ``rank`` and ``period_total`` ordered by period and rank
+    """
+    fields = period_fields(granularity)
+    partition = [F(field) for field in fields]
+    return (
+        _arrivals(start, end)
+        .values(*fields, "country_id")
+        .annotate(arrivals=Sum("passengers"), country=Min("country"))
+        .annotate(
+            rank=Window(Rank(), partition_by=partition, order_by=Sum("passengers").desc()),
+            period_total=Window(WindowSum(Sum("passengers")), partition_by=partition),
+        )
+        .filter(rank__lte=top)
+        .order_by(*fields, "rank", "country_id")
+    )
+
+
+def country_ranking(year: int, month: Optional[int] = None):
+    """Every country's arrivals, rank, share and year over year change in one period.
+
+    The period is a year, or one month of it. The arrivals of the period and of the
+    same period a year earlier are conditional sums of one grouped query, and the rank
+    and the period total (for shares) are window functions over its rows.
+
+    Returns:
+        Queryset of rows with ``country_id``, ``country``, ``arrivals``, ``previous``
+        (None if the country had no arrivals a year earlier), ``rank`` and
+        ``period_total`` ordered by rank
+    """
+    rows = _arrivals(None, None).filter(timeframe__year__in=[year - 1, year])
+    if month is not None:
+        rows = rows.filter(timeframe__month=month)
+
+    current = Sum("passengers", filter=Q(timeframe__year=year))
+    return (
+        rows.values("country_id")
+        .annotate(
+            arrivals=current,
+            previous=Sum("passengers", filter=Q(timeframe__year=year - 1)),
+            country=Min("country"),
+        )
+        .filter(arrivals__isnull=False)
+        .annotate(
+            rank=Window(Rank(), order_by=current.desc()),
+            period_total=Window(WindowSum(current)),
+        )
+        .order_by("rank", "country_id")
+    )
+
+
+def share(arrivals: int, period_total: int) -> Optional[float]:
+    """Share of a country in the arrivals of a period."""
+    return arrivals / period_total if period_total else None
+
+
+def yoy_change(arrivals: Optional[int], previous: Optional[int]) -> Optional[float]:
+    """Relative change over the previous year, None if it is unknown or zero."""
+    if arrivals is None or not previous:
+        return None
+    return (arrivals - previous) / previous
@@ -0,0 +1,43 @@
+import asyncio
+from typing import Any, Callable, List
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connection
+
+
+def _run_on_own_connection(query: Callable[[], Any]) -> Any:
+    try:
+        return query()
+    finally:
+        # Connections are per thread: keep this worker thread's one for reuse within
+        # CONN_MAX_AGE, like a request thread would, and drop it once it expired
+        close_old_connections()
+
+
+def _in_transaction() -> bool:
+    return connection.in_atomic_block
+
+
+async def gather_queries(*queries: Callable[[], Any]) -> List[Any]:
+    """Run independent, blocking ORM callables concurrently and return their results.
+
+    Django's async ORM runs every query on the request's single thread sensitive
+    thread, so awaiting several of them with ``asyncio.gather`` still executes them
+    one after the other. Here each callable runs on its own worker thread with its
+    own database connection, so the queries are in flight at the same time.
+
+    Inside a transaction (e.g. ``ATOMIC_REQUESTS`` or a test case) other connections
+    would not see its uncommitted rows, so the callables run one by one on the
+    request's connection instead.
+
+    Example:
+        >>> arrivals, income = await gather_queries(
+        ...     lambda: list(AllCountryStats.objects.filter(country_id="INDIA")),
+        ...     lambda: list(TourismIncome.objects.all()),
+        ... )
+    """
+    if await sync_to_async(_in_transaction)():
+        return [await sync_to_async(query)() for query in queries]
+    return await asyncio.gather(
+        *(sync_to_async(_run_on_own_connection, thread_sensitive=False)(query) for query in queries)
+    )
@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db.models import F
+from django.http import HttpResponse
+from touristats.models import DatasetVersion
+
+# Dataset whose version the arrivals views are cached under
+ARRIVALS_DATASET = "allcountrystats"
+
+# Responses larger than this are passed through without being cached. Cache backends
+# bound the number of entries, not their size, so this bounds the bytes of each entry.
+DEFAULT_MAX_CACHED_RESPONSE_BYTES = 1 << 20
+
+
+def get_dataset_version(name: str = ARRIVALS_DATASET) -> int:
+    """Current version of a dataset, 0 until it is first bumped."""
+    version = DatasetVersion.objects.filter(name=name).values_list("version", flat=True).first()
+    return version or 0
+
+
+async def aget_dataset_version(name: str = ARRIVALS_DATASET) -> int:
+    """Async counterpart of ``get_dataset_version``."""
+    version = (
+        await DatasetVersion.objects.filter(name=name).values_list("version", flat=True).afirst()
+    )
+    return version or 0
+
+
+def bump_dataset_version(name: str = ARRIVALS_DATASET) -> int:
+    """Increment the version of a dataset, invalidating every response cached for it."""
+    updated = DatasetVersion.objects.filter(name=name).update(version=F("version") + 1)
+    if not updated:
+        _, created = DatasetVersion.objects.get_or_create(name=name, defaults={"version": 1})
+        if not created:
+            # Created concurrently between the update and the get_or_create
+            DatasetVersion.objects.filter(name=name).update(version=F("version") + 1)
+    return get_dataset_version(name)
+
+
+def set_dataset_version(name: str, version: int) -> None:
+    """Record the version of a dataset derived from another, e.g. the summary tables."""
+    updated = DatasetVersion.objects.filter(name=name).update(version=version)
+    if not updated:
+        DatasetVersion.objects.update_or_create(name=name, defaults={"version": version})
+
+
+def _cache_key(request, dataset, version):
+    params = urlencode(sorted(request.GET.lists()), doseq=True)
+    digest = hashlib.sha256(f"{request.path}?{params}".encode()).hexdigest()
+    return f"touristats:view:{dataset}:{version}:{digest}"
+
+
+def _cached_response(entry):
+    content, content_type, status = entry
+    response = HttpResponse(content, content_type=content_type, status=status)
+    response["X-Cache"] = "HIT"
+    return response
+
+
+def _tee_stream(chunks, key, content_type, status, timeout, max_bytes):
+    """Pass a streamed response through, caching its body if it completes within max_bytes."""
+    body = []
+    size = 0
+    for chunk in chunks:
+        if body is not None:
+            size += len(chunk)
+            if size > max_bytes:
+                body = None
+            else:
+                body.append(chunk)
+        yield chunk
+    if body is not None:
+        cache.set(key, (b"".join(body), content_type, status), timeout)
+
+
+async def _atee_stream(chunks, key, content_type, status, timeout, max_bytes):
+    """Async counterpart of ``_tee_stream`` for responses streaming an async iterator."""
+    body = []
+    size = 0
+    async for chunk in chunks:
+        if body is not None:
+            size += len(chunk)
+            if size > max_bytes:
+                body = None
+            else:
+                body.append(chunk)
+        yield chunk
+    if body is not None:
+        await cache.aset(key, (b"".join(body), content_type, status), timeout)
+
+
+def _max_cached_bytes():
+    return getattr(
+        settings, "TOURISTATS_MAX_CACHED_RESPONSE_BYTES", DEFAULT_MAX_CACHED_RESPONSE_BYTES
+    )
+
+
+def cache_versioned(dataset: str = ARRIVALS_DATASET, timeout=DEFAULT_TIMEOUT):
+    """Cache a GET view's response per path and query parameters and dataset version.
+
+    Bumping the dataset version (see ``bump_dataset_version``) changes every key, so
+    responses are never served stale and superseded entries are evicted by the
+    cache backend's size bound or timeout. Streamed responses are cached as they
+    are sent. Responses over ``TOURISTATS_MAX_CACHED_RESPONSE_BYTES`` are not cached,
+    so an entry never takes more than that (plus the key). Async views
+    get an async wrapper that uses the async ORM and cache interfaces.
+
+    Example:
+        >>> @cache_versioned()
+        ... def get_all_arrivals(request):
+        ...     ...
+    """
+
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            return _async_wrapper(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != "GET":
+                return view(request, *args, **kwargs)
+
+            version = get_dataset_version(dataset)
+            # Views can check derived data (e.g. the arrivals cube) against it
+            request.dataset_version = version
+            key = _cache_key(request, dataset, version)
+            entry = cache.get(key)
+            if entry is not None:
+                return _cached_response(entry)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            content_type = response.get("Content-Type")
+            if response.streaming:
+                response.streaming_content = _tee_stream(
+                    response.streaming_content,
+                    key,
+                    content_type,
+                    200,
+                    timeout,
+                    _max_cached_bytes(),
+                )
+            elif len(response.content) <= _max_cached_bytes():
+                cache.set(key, (response.content, content_type, 200), timeout)
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    def _async_wrapper(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != "GET":
+                return await view(request, *args, **kwargs)
+
+            version = await aget_dataset_version(dataset)
+            request.dataset_version = version
+            key = _cache_key(request, dataset, version)
+            entry = await cache.aget(key)
+            if entry is not None:
+                return _cached_response(entry)
+
+            response = await view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            content_type = response.get("Content-Type")
+            if response.streaming:
+                tee = _atee_stream if response.is_async else _tee_stream
+                response.streaming_content = tee(
+                    response.streaming_content,
+                    key,
+                    content_type,
+                    200,
+                    timeout,
+                    _max_cached_bytes(),
+                )
+            elif len(response.content) <= _max_cached_bytes():
+                await cache.aset(key, (response.content, content_type, 200), timeout)
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
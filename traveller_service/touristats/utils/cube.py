@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from touristats.models import AllCountryStats
+from touristats.utils.cache_util import ARRIVALS_DATASET, get_dataset_version
+
+CUBE_FILE = "arrivals_cube.npy"
+META_FILE = "arrivals_cube.json"
+
+# Cells without a row in AllCountryStats
+MISSING = -1
+
+
+def build_cube(directory: str) -> dict:
+    """Write the arrivals as a countries x years x months int32 cube to ``directory``.
+
+    Countries and years are dictionary encoded: the metadata file lists the
+    country_ids in row order, their display names and the first year. The files are
+    written to temporary names and renamed into place, so readers never see a
+    partially written cube.
+
+    Returns:
+        The metadata written next to the cube
+    """
+    version = get_dataset_version(ARRIVALS_DATASET)
+    rows = list(
+        AllCountryStats.objects.filter(timeframe__month__isnull=False).values_list(
+            "country_id", "country", "timeframe__year", "timeframe__month", "passengers"
+        )
+    )
+
+    country_ids = sorted({row[0] for row in rows})
+    names = {}
+    for country_id, country, _, _, _ in rows:
+        names.setdefault(country_id, country)
+    years = [row[2] for row in rows]
+    first_year = min(years) if years else 0
+    num_years = max(years) - first_year + 1 if years else 0
+
+    index = {country_id: position for position, country_id in enumerate(country_ids)}
+    cube = np.full((len(country_ids), num_years, 12), MISSING, dtype=np.int32)
+    if rows:
+        country_index, _, year, month, passengers = zip(*rows)
+        cube[
+            [index[country_id] for country_id in country_index],
+            np.asarray(year) - first_year,
+            np.asarray(month) - 1,
+        ] = passengers
+
+    meta = {
+        "version": version,
+        "countries": country_ids,
+        "names": names,
+        "first_year": first_year,
+        "shape": list(cube.shape),
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    cube_tmp = os.path.join(directory, CUBE_FILE + ".tmp")
+    with open(cube_tmp, "wb") as f:
+        np.save(f, cube)
+    os.replace(cube_tmp, os.path.join(directory, CUBE_FILE))
+
+    # The metadata is replaced last, its mtime tells readers to reload
+    meta_tmp = os.path.join(directory, META_FILE + ".tmp")
+    with open(meta_tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(meta_tmp, os.path.join(directory, META_FILE))
+    return meta
+
+
+def refresh_cube() -> Optional[dict]:
+    """Rebuild the cube after the arrivals changed, if ``TOURISTATS_CUBE_DIR`` is set."""
+    directory = getattr(settings, "TOURISTATS_CUBE_DIR", None)
+    if not directory:
+        return None
+    return build_cube(directory)
+
+
+class ArrivalsCube:
+    """Read-only, memory-mapped arrivals cube written by ``build_cube``.
+
+    The array is mapped rather than read, so every worker process on a host shares
+    the same page cache copy. Lookups of a country, year or month are plain array
+    indexing.
+    """
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+        self.version = meta["version"]
+        self.countries = {country_id: row for row, country_id in enumerate(meta["countries"])}
+        self.names = meta["names"]
+        self.first_year = meta["first_year"]
+        self.cube = np.load(os.path.join(directory, CUBE_FILE), mmap_mode="r")
+        if list(self.cube.shape) != meta["shape"]:
+            raise ValueError("Arrivals cube does not match its metadata")
+
+    def __contains__(self, country_id: str) -> bool:
+        return country_id in self.countries
+
+    def get(self, country_id: str, year: int, month: int) -> Optional[int]:
+        """Arrivals of one country in one month, None if there is no data."""
+        row = self.countries.get(country_id)
+        year_index = year - self.first_year
+        if row is None or not 0 <= year_index < self.cube.shape[1] or not 1 <= month <= 12:
+            return None
+        value = int(self.cube[row, year_index, month - 1])
+        return None if value == MISSING else value
+
+    def country_series(
+        self,
+        country_id: str,
+        start: Optional[Tuple[int, int]] = None,
+        end: Optional[Tuple[int, int]] = None,
+    ) -> List[Tuple[int, int, int]]:
+        """Chronological (year, month, passengers) of a country within start..end inclusive."""
+        row = self.countries.get(country_id)
+        if row is None:
+            return []
+        series = self.cube[row].ravel()
+        periods = np.arange(series.size)
+        mask = series != MISSING
+        if start:
+            mask &= periods >= (start[0] - self.first_year) * 12 + start[1] - 1
+        if end:
+            mask &= periods <= (end[0] - self.first_year) * 12 + end[1] - 1
+        selected = np.flatnonzero(mask)
+        return [
+            (self.first_year + int(period) // 12, int(period) % 12 + 1, int(series[period]))
+            for period in selected
+        ]
+
+
+_loaded = {"cube": None, "key": None}
+_lock = threading.Lock()
+
+
+def get_cube() -> Optional[ArrivalsCube]:
+    """The process wide cube, reloaded when it was rebuilt since it was mapped.
+
+    Returns None if ``TOURISTATS_CUBE_DIR`` is not set or no cube was built yet.
+    """
+    directory = getattr(settings, "TOURISTATS_CUBE_DIR", None)
+    if not directory:
+        return None
+    try:
+        key = (directory, os.stat(os.path.join(directory, META_FILE)).st_mtime_ns)
+    except FileNotFoundError:
+        return None
+
+    if _loaded["key"] != key:
+        with _lock:
+            if _loaded["key"] != key:
+                try:
+                    _loaded["cube"] = ArrivalsCube(directory)
+                except (OSError, ValueError):
+                    # Caught between the cube and its metadata being replaced
+                    return None
+                _loaded["key"] = key
+    return _loaded["cube"]
+
+
+def get_current_cube(version: Optional[int] = None) -> Optional[ArrivalsCube]:
+    """The cube if it was built from the current version of the arrivals, else None.
+
+    Pass the version if it is already known, e.g. ``request.dataset_version`` set by
+    ``cache_versioned``, to skip looking it up.
+    """
+    cube = get_cube()
+    if cube is None:
+        return None
+    if version is None:
+        version = get_dataset_version(ARRIVALS_DATASET)
+    return cube if cube.version == version else None
@@ -0,0 +1,157 @@
+import glob
+import os
+import re
+from typing import Dict, List, Tuple
+
+import django
+import pandas as pd
+from django.db import transaction
+from touristats.models import AllCountryStats, TimeFrame
+from touristats.utils.model_util import normalize_country_id
+
+MONTHS = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+
+# Matches the year in names like all_country_arrivals_2019.csv
+YEAR_PATTERN = re.compile(r"(?<!\d)((?:19|20)\d{2})(?!\d)")
+
+
+def read_arrivals_frame(file_path: str) -> pd.DataFrame:
+    """Read an all-country arrivals CSV and reshape it into one row per country and month.
+
+    Thousands separators and invalid values are cleaned for the whole file at once,
+    invalid or missing arrivals become 0 as in the row-by-row import.
+
+    Args:
+        file_path (str): Path to the CSV file containing the arrival data
+
+    Returns:
+        pd.DataFrame: Columns ``country``, ``country_id``, ``month`` (1-12) and ``passengers``.
+
+    Raises:
+        ValueError: If the 'Country' column or any month column is missing
+    """
+    data = pd.read_csv(file_path, thousands=",")
+
+    missing = [column for column in ["Country"] + MONTHS if column not in data.columns]
+    if missing:
+        raise ValueError(f"Missing required columns in {file_path}: {', '.join(missing)}")
+
+    # Drop rows without a country name, they cannot be keyed
+    data = data[data["Country"].notna()]
+    data = data[data["Country"].astype(str).str.strip().astype(bool)]
+
+    frame = data.melt(
+        id_vars=["Country"], value_vars=MONTHS, var_name="month", value_name="passengers"
+    )
+    frame["month"] = frame["month"].map({month: num for num, month in enumerate(MONTHS, 1)})
+    frame["passengers"] = (
+        pd.to_numeric(frame["passengers"].astype(str).str.replace(",", ""), errors="coerce")
+        .fillna(0)
+        .astype("int64")
+    )
+    frame = frame.rename(columns={"Country": "country"})
+    frame["country"] = frame["country"].astype(str)
+
+    # Only a few hundred distinct names, so normalize each one once
+    country_ids = {name: normalize_country_id(name) for name in frame["country"].unique()}
+    frame["country_id"] = frame["country"].map(country_ids)
+
+    # A repeated country would hit the same (country_id, timeframe) key twice in one upsert
+    frame = frame.drop_duplicates(subset=["country_id", "month"], keep="last")
+    return frame[["country", "country_id", "month", "passengers"]].reset_index(drop=True)
+
+
+def resolve_timeframes(year: int) -> Dict[int, int]:
+    """Create the monthly TimeFrames of a year if needed and map month -> TimeFrame id.
+
+    Uses a conflict-ignoring insert on the (year, month) unique key, so concurrent
+    imports of the same year do not race each other.
+    """
+    TimeFrame.objects.bulk_create(
+        [TimeFrame(year=year, month=month) for month in range(1, 13)], ignore_conflicts=True
+    )
+    return dict(TimeFrame.objects.filter(year=year, month__isnull=False).values_list("month", "id"))
+
+
+def bulk_upsert_arrivals(frame: pd.DataFrame, year: int, batch_size: int = 1000) -> int:
+    """Upsert the rows produced by ``read_arrivals_frame`` for a year.
+
+    Rows are written with ``bulk_create`` in batches of ``batch_size`` as an upsert on
+    the (country_id, timeframe) unique key, so re-importing a year updates it in place.
+
+    Returns:
+        int: Number of rows written.
+    """
+    timeframes = resolve_timeframes(year)
+    stats = [
+        AllCountryStats(
+            country_id=row.country_id,
+            timeframe_id=timeframes[int(row.month)],
+            country=row.country,
+            passengers=int(row.passengers),
+            days_of_stay=0,
+            purpose_of_visit="Not Specified",
+        )
+        for row in frame.itertuples(index=False)
+    ]
+    AllCountryStats.objects.bulk_create(
+        stats,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["country_id", "timeframe"],
+        update_fields=["country", "passengers"],
+    )
+    return len(stats)
+
+
+def discover_arrival_files(source: str) -> List[Tuple[int, str]]:
+    """Find arrival CSVs in a directory or glob and infer the year of each from its name.
+
+    Args:
+        source (str): A directory (all ``*.csv`` files in it are used) or a glob pattern,
+            e.g. ``data/arrival/all_countries/all_country_arrivals_*.csv``
+
+    Returns:
+        List[Tuple[int, str]]: (year, file_path) pairs sorted by year.
+
+    Raises:
+        ValueError: If a file name has no year in it or two files map to the same year
+    """
+    pattern = os.path.join(source, "*.csv") if os.path.isdir(source) else source
+    files = {}
+    for file_path in sorted(glob.glob(pattern)):
+        match = YEAR_PATTERN.search(os.path.basename(file_path))
+        if match is None:
+            raise ValueError(f"Could not infer the year from file name: {file_path}")
+        year = int(match.group(1))
+        if year in files:
+            raise ValueError(
+                f"Found more than one file for year {year}: {files[year]}, {file_path}"
+            )
+        files[year] = file_path
+    return sorted(files.items())
+
+
+def ingest_year(year: int, file_path: str, batch_size: int = 1000) -> int:
+    """Bulk upsert one year's CSV in its own transaction, so a failed year leaves no rows."""
+    frame = read_arrivals_frame(file_path)
+    with transaction.atomic():
+        return bulk_upsert_arrivals(frame, year, batch_size=batch_size)
+
+
+def init_ingest_worker():
+    """Process pool initializer: set up Django so the worker opens its own DB connection."""
+    django.setup()
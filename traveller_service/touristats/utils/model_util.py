@@ -2,11 +2,24 @@ from datetime import datetime
 from typing import Dict, List, Optional
 
 
+def normalize_country_id(country: str) -> str:
+    """Normalize a country name into the identifier stored in ``country_id``.
+
+    Example: "United States of America" -> "UNITED_STATES_OF_AMERICA"
+    """
+    # Convert country name to uppercase and replace spaces with underscores
+    country_id = country.upper().replace(" ", "_")
+    # Remove any special characters
+    return "".join(e for e in country_id if e.isalnum() or e == "_")
+
+
 def verified_model(
     description: str,
     version: Optional[str] = "1.0.0",
     verified_by: str = None,
     verification_type: str = "initial",
+    data_source: str = None,
+    date: str = None,
 ):
     """Decorator to mark a model as verified and track its version history.
 
@@ -15,6 +28,8 @@ def verified_model(
         version (str, optional): Version number. Defaults to "1.0.0"
         verified_by (str, optional): Name or ID of the verifier
         verification_type (str, optional): Type of verification (initial/review/audit)
+        data_source (str, optional): Source of the data the model was verified against
+        date (str, optional): Date of the verification. Defaults to the current time
     """
 
     def decorator(cls):
@@ -28,7 +43,8 @@ def verified_model(
         verification_info = {
             "verified_by": verified_by,
             "verification_type": verification_type,
-            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "data_source": data_source,
+            "date": date or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "description": description,
         }
 
@@ -76,6 +92,7 @@ def verified_model(
                     print(f"  {idx}. Date: {v['date']}")
                     print(f"     Type: {v['verification_type']}")
                     print(f"     By: {v['verified_by']}")
+                    print(f"     Source: {v['data_source']}")
                     print(f"     Notes: {v['description']}")
                 print("-" * 50)
 
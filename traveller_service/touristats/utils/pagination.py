@@ -0,0 +1,176 @@
+import base64
+import json
+from typing import List, Optional, Sequence
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+# How long a row count estimate is reused before it is looked up again
+COUNT_ESTIMATE_TIMEOUT = 300
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Encode the ordering values of a row into an opaque, URL safe cursor."""
+    payload = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> List:
+    """Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed or does not hold ``length`` values
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, UnicodeDecodeError, json.JSONDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+
+def estimate_count(queryset) -> int:
+    """Cheap, cached estimate of the number of rows in the table behind a queryset.
+
+    On PostgreSQL the planner statistics in ``pg_class`` are used instead of a
+    ``COUNT(*)``, other databases fall back to an exact count. Either way the value
+    is cached for ``COUNT_ESTIMATE_TIMEOUT`` seconds.
+    """
+    model = queryset.model
+    cache_key = f"touristats:count_estimate:{model._meta.db_table}"
+
+    def lookup():
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            # reltuples is -1 (or 0) until the table has been analyzed
+            if row and row[0] > 0:
+                return row[0]
+        return model._default_manager.using(queryset.db).count()
+
+    return cache.get_or_set(cache_key, lookup, COUNT_ESTIMATE_TIMEOUT)
+
+
+class KeysetPage:
+    """One page of a ``KeysetPaginator``, iterable like a Django ``Page``."""
+
+    def __init__(self, object_list, next_cursor, previous_cursor, page_size, count_estimate):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.page_size = page_size
+        self.count_estimate = count_estimate
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator:
+    """Cursor based pagination over a queryset ordered by a unique set of fields.
+
+    Instead of ``OFFSET`` every page continues from the ordering values of the last
+    (or first) row of the previous page, so deep pages cost the same as the first
+    one when an index covers ``ordering``, and rows inserted meanwhile do not shift
+    page contents.
+
+    ``ordering`` names concrete fields of the queryset's model, compared as one row
+    value in the seek condition.
+
+    Example:
+        >>> paginator = KeysetPaginator(queryset, ("timeframe_id", "country_id", "id"), 25)
+        >>> page = paginator.get_page(after=request.GET.get("after"))
+    """
+
+    def __init__(self, queryset, ordering: Sequence[str], page_size: int):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+
+    def _seek(self, values, lookup):
+        """Build the row value comparison ``(f1, f2, ...) > (v1, v2, ...)`` (or ``<``).
+
+        Unlike the equivalent ``f1 > v1 OR (f1 = v1 AND f2 > v2) OR ...``, a row value
+        comparison is an index condition on an index over ``ordering``, so the scan
+        starts at the cursor instead of filtering every row before it.
+        """
+        model = self.queryset.model
+        fields = [model._meta.get_field(field) for field in self.ordering]
+        try:
+            params = [field.get_prep_value(field.to_python(v)) for field, v in zip(fields, values)]
+        except (ValidationError, TypeError) as e:
+            raise ValueError(f"Invalid cursor values: {values}") from e
+
+        quote_name = connections[self.queryset.db].ops.quote_name
+        table = quote_name(model._meta.db_table)
+        columns = ", ".join(f"{table}.{quote_name(field.column)}" for field in fields)
+        placeholders = ", ".join(["%s"] * len(params))
+        operator = ">" if lookup == "gt" else "<"
+        return RawSQL(
+            f"({columns}) {operator} ({placeholders})", params, output_field=BooleanField()
+        )
+
+    def _cursor(self, obj):
+        return encode_cursor([getattr(obj, field) for field in self.ordering])
+
+    def get_page(self, after: Optional[str] = None, before: Optional[str] = None) -> KeysetPage:
+        """Return the page after (or before) a cursor, or the first page without one.
+
+        An invalid cursor is treated like a missing one, mirroring
+        ``Paginator.get_page`` which falls back to the first page.
+        """
+        queryset = self.queryset
+        backwards = False
+        try:
+            if after:
+                queryset = queryset.filter(
+                    self._seek(decode_cursor(after, len(self.ordering)), "gt")
+                )
+            elif before:
+                values = decode_cursor(before, len(self.ordering))
+                queryset = queryset.filter(self._seek(values, "lt"))
+                backwards = True
+        except ValueError:
+            after = before = None
+
+        if backwards:
+            queryset = queryset.order_by(*(f"-{field}" for field in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        # Fetch one extra row to know whether there is a page beyond this one
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(after)
+
+        return KeysetPage(
+            rows,
+            next_cursor=self._cursor(rows[-1]) if rows and has_next else None,
+            previous_cursor=self._cursor(rows[0]) if rows and has_previous else None,
+            page_size=self.page_size,
+            count_estimate=estimate_count(self.queryset),
+        )
@@ -0,0 +1,73 @@
+import calendar
+from typing import List, Optional, Tuple
+
+from django.db.models import Q
+
+
+def parse_period(value: str, end: bool = False) -> Tuple[int, int]:
+    """Parse a ``YYYY-MM`` (or ``YYYY``) period into a (year, month) pair.
+
+    A bare year stands for January, or December when ``end`` is set, so
+    ``from=2023&to=2023`` covers the whole year.
+
+    Raises:
+        ValueError: If the value is not a valid period
+    """
+    parts = value.split("-")
+    if len(parts) == 1:
+        return int(parts[0]), 12 if end else 1
+    if len(parts) == 2:
+        year, month = int(parts[0]), int(parts[1])
+        if 1 <= month <= 12:
+            return year, month
+    raise ValueError(f"Invalid period: {value}")
+
+
+def parse_period_range(params) -> Tuple[Optional[Tuple[int, int]], Optional[Tuple[int, int]]]:
+    """Read the optional ``from`` / ``to`` periods of a request's query parameters.
+
+    Raises:
+        ValueError: If either period is invalid
+    """
+    start, end = params.get("from"), params.get("to")
+    return (
+        parse_period(start) if start else None,
+        parse_period(end, end=True) if end else None,
+    )
+
+
+def period_range_q(
+    start: Optional[Tuple[int, int]],
+    end: Optional[Tuple[int, int]],
+    prefix: str = "timeframe__",
+) -> Q:
+    """Filter rows whose (year, month) lies within ``start`` and ``end``, both inclusive."""
+    condition = Q()
+    if start:
+        year, month = start
+        condition &= Q(**{f"{prefix}year__gt": year}) | Q(
+            **{f"{prefix}year": year, f"{prefix}month__gte": month}
+        )
+    if end:
+        year, month = end
+        condition &= Q(**{f"{prefix}year__lt": year}) | Q(
+            **{f"{prefix}year": year, f"{prefix}month__lte": month}
+        )
+    return condition
+
+
+def shift_year(period: Optional[Tuple[int, int]], years: int = -1) -> Optional[Tuple[int, int]]:
+    """The (year, month) ``years`` years from a period, None for an open bound."""
+    return (period[0] + years, period[1]) if period else None
+
+
+def period_label(year: int, month: int) -> str:
+    """Chart label of a period, e.g. "January 2023"."""
+    return f"{calendar.month_name[month]} {year}"
+
+
+def period_span(start: Tuple[int, int], end: Tuple[int, int]) -> List[Tuple[int, int]]:
+    """Every (year, month) from ``start`` to ``end``, both inclusive."""
+    first = start[0] * 12 + start[1] - 1
+    last = end[0] * 12 + end[1] - 1
+    return [(period // 12, period % 12 + 1) for period in range(first, last + 1)]
@@ -0,0 +1,26 @@
+from typing import Iterable, Optional
+
+from touristats.utils.cache_util import bump_dataset_version
+from touristats.utils.cube import refresh_cube
+from touristats.utils.snapshot_util import refresh_snapshots
+from touristats.utils.summary_util import refresh_summaries, summaries_current
+
+
+def arrivals_changed(years: Optional[Iterable[int]] = None) -> int:
+    """Invalidate everything derived from AllCountryStats after it was modified.
+
+    Called by every management command that writes or deletes arrivals: bumps the
+    dataset version, dropping the cached responses, refreshes the summary tables and
+    rebuilds the arrivals cube and the chart snapshots. Only the summaries of ``years``
+    are refreshed if they were up to date before the change; otherwise (or without
+    years) all of them are.
+
+    Returns:
+        The new dataset version
+    """
+    incremental = years is not None and summaries_current()
+    version = bump_dataset_version()
+    refresh_summaries(years if incremental else None)
+    refresh_cube()
+    refresh_snapshots()
+    return version
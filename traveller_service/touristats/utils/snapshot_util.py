@@ -0,0 +1,162 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from touristats.models import AllCountryStats
+from touristats.utils.cache_util import ARRIVALS_DATASET, get_dataset_version
+
+MANIFEST_FILE = "manifest.json"
+
+# Compared countries of the aggregate snapshot, the chart page's default view
+SNAPSHOT_TOP = 10
+
+
+def _write_atomic(path: str, content: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _write_snapshot(directory: str, name: str, data: dict) -> str:
+    """Write ``data`` as ``<name>.<hash>.json`` plus a gzipped copy and return its path.
+
+    The name changes with the content, so the files can be served with a far future
+    expiry. Unchanged data keeps its file and is not rewritten.
+    """
+    content = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+    path = f"{name}.{hashlib.sha256(content).hexdigest()[:16]}.json"
+    full_path = os.path.join(directory, path)
+    if not os.path.exists(full_path + ".gz"):
+        # mtime=0 keeps the compressed bytes identical between builds
+        _write_atomic(full_path, content)
+        _write_atomic(full_path + ".gz", gzip.compress(content, compresslevel=9, mtime=0))
+    return path
+
+
+def _remove_unreferenced(directory: str, keep: set) -> None:
+    for root, _, files in os.walk(directory):
+        for file_name in files:
+            path = os.path.relpath(os.path.join(root, file_name), directory)
+            if path == MANIFEST_FILE or path.endswith(".tmp"):
+                continue
+            if path.removesuffix(".gz") not in keep:
+                os.remove(os.path.join(root, file_name))
+
+
+def build_snapshots(directory: str) -> dict:
+    """Write the chart data of every country and of the top countries as static JSON.
+
+    Each country's file holds the response of ``country_arrivals_view`` for its whole
+    series, and the aggregate file the response of ``compare_arrivals?top=10``. The
+    files are content hashed and gzipped next to the plain copy (for ``gzip_static``).
+    The manifest mapping them to their current names is replaced last, then files
+    referenced by neither it nor the previous manifest are removed.
+
+    Returns:
+        The manifest written
+    """
+    # The views import this module, their payload builders are imported on use
+    from touristats.views import _chart_data, _compare_data
+
+    version = get_dataset_version(ARRIVALS_DATASET)
+    rows = (
+        AllCountryStats.objects.exclude(country_id="TOTAL")
+        .filter(timeframe__month__isnull=False)
+        .order_by("country_id", "timeframe__year", "timeframe__month")
+        .values_list("country_id", "country", "timeframe__year", "timeframe__month", "passengers")
+    )
+    series: Dict[str, list] = {}
+    names: Dict[str, str] = {}
+    for country_id, country, year, month, passengers in rows:
+        series.setdefault(country_id, []).append((year, month, passengers))
+        names.setdefault(country_id, country)
+
+    countries = {
+        country_id: _write_snapshot(
+            directory,
+            f"countries/{country_id}",
+            {"country_id": country_id, "country": names[country_id], **_chart_data(arrivals)},
+        )
+        for country_id, arrivals in series.items()
+    }
+    compare = _write_snapshot(
+        directory, f"compare-top{SNAPSHOT_TOP}", _compare_data({"top": str(SNAPSHOT_TOP)})
+    )
+    manifest = {
+        "version": version,
+        "compare": {f"top{SNAPSHOT_TOP}": compare},
+        "countries": countries,
+    }
+
+    previous = read_manifest(directory) or {}
+    _write_atomic(os.path.join(directory, MANIFEST_FILE), json.dumps(manifest).encode())
+    _remove_unreferenced(directory, _snapshot_paths(manifest) | _snapshot_paths(previous))
+    return manifest
+
+
+def _snapshot_paths(manifest: dict) -> set:
+    return set(manifest.get("compare", {}).values()) | set(manifest.get("countries", {}).values())
+
+
+def refresh_snapshots() -> Optional[dict]:
+    """Rebuild the snapshots after the arrivals changed, if ``TOURISTATS_SNAPSHOT_DIR`` is set."""
+    directory = getattr(settings, "TOURISTATS_SNAPSHOT_DIR", None)
+    if not directory:
+        return None
+    return build_snapshots(directory)
+
+
+def read_manifest(directory: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+_loaded = {"manifest": None, "key": None}
+_lock = threading.Lock()
+
+
+def get_current_snapshots(version: Optional[int] = None) -> Optional[dict]:
+    """URLs of the snapshots if they were built from the current arrivals, else None.
+
+    The manifest is read once per process and again when it was rebuilt. Returns
+    ``{"compare": {"top10": url}, "countries": {country_id: url}}``.
+    """
+    directory = getattr(settings, "TOURISTATS_SNAPSHOT_DIR", None)
+    if not directory:
+        return None
+    try:
+        key = (directory, os.stat(os.path.join(directory, MANIFEST_FILE)).st_mtime_ns)
+    except FileNotFoundError:
+        return None
+
+    if _loaded["key"] != key:
+        with _lock:
+            if _loaded["key"] != key:
+                manifest = read_manifest(directory)
+                if manifest is None:
+                    return None
+                _loaded["manifest"], _loaded["key"] = manifest, key
+    manifest = _loaded["manifest"]
+
+    if version is None:
+        version = get_dataset_version(ARRIVALS_DATASET)
+    if manifest["version"] != version:
+        return None
+
+    base_url = settings.TOURISTATS_SNAPSHOT_URL
+    return {
+        "compare": {name: base_url + path for name, path in manifest["compare"].items()},
+        "countries": {
+            country_id: base_url + path for country_id, path in manifest["countries"].items()
+        },
+    }
@@ -0,0 +1,216 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Min, Sum, Window
+from django.db.models.functions import Rank
+from touristats.models import (
+    AllCountryStats,
+    CountryAnnualSummary,
+    DatasetVersion,
+    MonthlyArrivalsSummary,
+)
+from touristats.utils.cache_util import ARRIVALS_DATASET, get_dataset_version, set_dataset_version
+from touristats.utils.period_util import period_range_q, shift_year
+
+# Version of AllCountryStats the summary tables were last refreshed for
+SUMMARIES_DATASET = "allcountrystats_summaries"
+
+# Periods the monthly totals can be rolled up to
+ROLLUP_GRANULARITIES = ("month", "quarter", "year")
+
+
+def refresh_summaries(years: Optional[Iterable[int]] = None) -> List[int]:
+    """Rebuild the summary tables for ``years``, or all of them if None.
+
+    The rows of those years are deleted and recomputed from two grouped queries in
+    one transaction, so readers see either the old or the new summaries. The
+    summaries are then marked as built from the current version of AllCountryStats.
+
+    Returns:
+        The refreshed years that have arrivals
+    """
+    arrivals = AllCountryStats.objects.exclude(country_id="TOTAL").filter(
+        timeframe__month__isnull=False
+    )
+    monthly_summaries = MonthlyArrivalsSummary.objects.all()
+    annual_summaries = CountryAnnualSummary.objects.all()
+    if years is not None:
+        years = sorted(set(years))
+        arrivals = arrivals.filter(timeframe__year__in=years)
+        monthly_summaries = monthly_summaries.filter(year__in=years)
+        annual_summaries = annual_summaries.filter(year__in=years)
+
+    monthly = (
+        arrivals.values("timeframe__year", "timeframe__month")
+        .annotate(arrivals=Sum("passengers"), countries=Count("country_id", distinct=True))
+        .order_by()
+    )
+    annual = (
+        arrivals.values("timeframe__year", "country_id")
+        .annotate(arrivals=Sum("passengers"), country=Min("country"))
+        .annotate(
+            rank=Window(
+                Rank(),
+                partition_by=[F("timeframe__year")],
+                order_by=Sum("passengers").desc(),
+            )
+        )
+        .order_by()
+    )
+
+    with transaction.atomic():
+        monthly_summaries.delete()
+        annual_summaries.delete()
+        MonthlyArrivalsSummary.objects.bulk_create(
+            [
+                MonthlyArrivalsSummary(
+                    year=row["timeframe__year"],
+                    month=row["timeframe__month"],
+                    arrivals=row["arrivals"],
+                    countries=row["countries"],
+                )
+                for row in monthly
+            ]
+        )
+        summaries = CountryAnnualSummary.objects.bulk_create(
+            [
+                CountryAnnualSummary(
+                    country_id=row["country_id"],
+                    country=row["country"],
+                    year=row["timeframe__year"],
+                    arrivals=row["arrivals"],
+                    rank=row["rank"],
+                )
+                for row in annual
+            ],
+            batch_size=1000,
+        )
+        set_dataset_version(SUMMARIES_DATASET, get_dataset_version(ARRIVALS_DATASET))
+
+    return sorted({summary.year for summary in summaries})
+
+
+def summaries_current(version: Optional[int] = None) -> bool:
+    """Whether the summary tables match the current (or given) AllCountryStats version."""
+    if version is None:
+        version = get_dataset_version(ARRIVALS_DATASET)
+    # Never refreshed summaries are not current, even before the first ingest
+    return DatasetVersion.objects.filter(name=SUMMARIES_DATASET, version=version).exists()
+
+
+def _period_key(year: int, month: int, granularity: str) -> Tuple[int, ...]:
+    if granularity == "year":
+        return (year,)
+    if granularity == "quarter":
+        return (year, (month - 1) // 3 + 1)
+    return (year, month)
+
+
+def rollup_totals(
+    monthly: Iterable[Tuple[int, int, int]],
+    granularity: str,
+    start: Optional[Tuple[int, int]] = None,
+    end: Optional[Tuple[int, int]] = None,
+) -> List[Dict]:
+    """Sum (year, month, arrivals) rows per month, quarter or year.
+
+    Only the months within start..end count towards a period. Each period gets the
+    total of the same months a year earlier as ``previous`` (None without data for
+    them), so ``monthly`` should start a year before ``start``.
+
+    Returns:
+        Chronological rows like ``aggregate_util.period_totals``, with ``quarter``
+        instead of ``timeframe__month`` for quarters
+    """
+
+    def in_range(period):
+        return (start is None or period >= start) and (end is None or period <= end)
+
+    totals, previous = {}, {}
+    for year, month, arrivals in monthly:
+        if in_range((year, month)):
+            key = _period_key(year, month, granularity)
+            totals[key] = totals.get(key, 0) + arrivals
+        if in_range((year + 1, month)):
+            key = _period_key(year + 1, month, granularity)
+            previous[key] = previous.get(key, 0) + arrivals
+
+    rows = []
+    for key in sorted(totals):
+        row = {
+            "timeframe__year": key[0],
+            "arrivals": totals[key],
+            "previous": previous.get(key),
+        }
+        if granularity == "month":
+            row["timeframe__month"] = key[1]
+        elif granularity == "quarter":
+            row["quarter"] = key[1]
+        rows.append(row)
+    return rows
+
+
+def summary_period_totals(
+    granularity: str,
+    start: Optional[Tuple[int, int]] = None,
+    end: Optional[Tuple[int, int]] = None,
+) -> List[Dict]:
+    """``aggregate_util.period_totals`` read from MonthlyArrivalsSummary, see ``rollup_totals``."""
+    monthly = (
+        MonthlyArrivalsSummary.objects.filter(period_range_q(shift_year(start), end, prefix=""))
+        .order_by("year", "month")
+        .values_list("year", "month", "arrivals")
+    )
+    return rollup_totals(monthly, granularity, start, end)
+
+
+def _year_totals(years: Iterable[int]) -> Dict[int, int]:
+    return dict(
+        MonthlyArrivalsSummary.objects.filter(year__in=years)
+        .values("year")
+        .annotate(total=Sum("arrivals"))
+        .order_by()
+        .values_list("year", "total")
+    )
+
+
+def summary_top_markets(
+    top: int, start_year: Optional[int] = None, end_year: Optional[int] = None
+) -> List[Dict]:
+    """``aggregate_util.top_markets`` of whole years, read from CountryAnnualSummary."""
+    summaries = CountryAnnualSummary.objects.filter(rank__lte=top)
+    if start_year is not None:
+        summaries = summaries.filter(year__gte=start_year)
+    if end_year is not None:
+        summaries = summaries.filter(year__lte=end_year)
+    rows = list(
+        summaries.order_by("year", "rank", "country_id").values(
+            "year", "country_id", "country", "arrivals", "rank"
+        )
+    )
+    totals = _year_totals({row["year"] for row in rows})
+    for row in rows:
+        row["timeframe__year"] = row.pop("year")
+        row["period_total"] = totals.get(row["timeframe__year"])
+    return rows
+
+
+def summary_ranking(year: int) -> List[Dict]:
+    """``aggregate_util.country_ranking`` of a whole year, read from CountryAnnualSummary."""
+    previous = {}
+    rows = []
+    for row in (
+        CountryAnnualSummary.objects.filter(year__in=[year - 1, year])
+        .order_by("rank", "country_id")
+        .values("year", "country_id", "country", "arrivals", "rank")
+    ):
+        if row.pop("year") == year:
+            rows.append(row)
+        else:
+            previous[row["country_id"]] = row["arrivals"]
+
+    total = _year_totals([year]).get(year)
+    for row in rows:
+        row["previous"] = previous.get(row["country_id"])
+        row["period_total"] = total
+    return rows
@@ -1,46 +1,478 @@
-from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Min, Sum
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
 
 from .models import AllCountryStats
+from .utils.aggregate_util import (
+    country_ranking,
+    period_fields,
+    period_totals,
+    share,
+    top_markets,
+    yoy_change,
+)
+from .utils.cache_util import cache_versioned
+from .utils.cube import get_current_cube
+from .utils.model_util import normalize_country_id
+from .utils.pagination import KeysetPaginator
+from .utils.period_util import (
+    parse_period_range,
+    period_label,
+    period_range_q,
+    period_span,
+    shift_year,
+)
+from .utils.snapshot_util import get_current_snapshots
+from .utils.summary_util import (
+    ROLLUP_GRANULARITIES,
+    rollup_totals,
+    summaries_current,
+    summary_period_totals,
+    summary_ranking,
+    summary_top_markets,
+)
 
+# Rows fetched per round trip from the server-side cursor while streaming exports
+EXPORT_CHUNK_SIZE = 2000
 
-def arrivals_paginated(request):
-    print("arrivals_paginated")
-    arrivals_list = AllCountryStats.objects.all()
-    paginator = Paginator(arrivals_list, 10)  # Show 10 arrivals per page
+# Page size of the arrivals listing, clients may ask for up to ARRIVALS_MAX_PAGE_SIZE rows
+ARRIVALS_PAGE_SIZE = 10
+ARRIVALS_MAX_PAGE_SIZE = 100
+ARRIVALS_ORDERING = ("timeframe_id", "country_id", "id")
+
+# Most countries one comparison may ask for, by name or as ?top=
+COMPARE_MAX_COUNTRIES = 50
+
+# Markets listed per period by the top markets endpoint unless ?top= says otherwise
+ARRIVALS_TOP = 10
 
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-    print(page_obj)
 
+def _arrivals_page(request):
+    """Keyset page of arrivals for the ?after= / ?before= cursor and ?page_size= of a request."""
+    try:
+        page_size = int(request.GET.get("page_size", ARRIVALS_PAGE_SIZE))
+    except ValueError:
+        page_size = ARRIVALS_PAGE_SIZE
+    page_size = max(1, min(page_size, ARRIVALS_MAX_PAGE_SIZE))
+
+    paginator = KeysetPaginator(
+        AllCountryStats.objects.select_related("timeframe"), ARRIVALS_ORDERING, page_size
+    )
+    return paginator.get_page(after=request.GET.get("after"), before=request.GET.get("before"))
+
+
+@cache_versioned()
+def arrivals_paginated(request):
+    page_obj = _arrivals_page(request)
     return render(request, "allcountry_arrivals/index.html", {"page_obj": page_obj})
 
 
+def _arrivals_page_data(request):
+    page = _arrivals_page(request)
+    results = [
+        {
+            "id": arrival.id,
+            "country_id": arrival.country_id,
+            "country": arrival.country,
+            "year": arrival.timeframe.year,
+            "month": arrival.timeframe.month,
+            "passengers": arrival.passengers,
+        }
+        for arrival in page
+    ]
+    return {
+        "results": results,
+        "next": page.next_cursor,
+        "previous": page.previous_cursor,
+        "page_size": page.page_size,
+        "count_estimate": page.count_estimate,
+    }
+
+
+@cache_versioned()
+def arrivals_paginated_json(request):
+    return JsonResponse(_arrivals_page_data(request))
+
+
+def _encode_rows(rows, separator):
+    """Encode rows as JSON, yielding one string per cursor chunk instead of per row."""
+    encoder = DjangoJSONEncoder()
+    chunk = []
+    for row in rows:
+        chunk.append(encoder.encode(row))
+        if len(chunk) == EXPORT_CHUNK_SIZE:
+            yield separator.join(chunk)
+            chunk = []
+    if chunk:
+        yield separator.join(chunk)
+
+
+def _stream_json_results(rows):
+    yield '{"results": ['
+    for index, chunk in enumerate(_encode_rows(rows, ", ")):
+        yield (", " if index else "") + chunk
+    yield "]}"
+
+
+def _stream_ndjson(rows):
+    for chunk in _encode_rows(rows, "\n"):
+        yield chunk + "\n"
+
+
+def _export_queryset(request):
+    """Rows of the arrivals export for the ?year= and ?country= filters of a request.
+
+    Raises:
+        ValueError: If the year is not a number
+    """
+    arrivals = AllCountryStats.objects.all()
+
+    year = request.GET.get("year")
+    if year:
+        try:
+            arrivals = arrivals.filter(timeframe__year=int(year))
+        except ValueError:
+            raise ValueError(f"Invalid year: {year}")
+
+    country = request.GET.get("country")
+    if country:
+        arrivals = arrivals.filter(country_id=normalize_country_id(country))
+
+    return arrivals.values()
+
+
+@cache_versioned()
 def get_all_arrivals(request):
-    print("get_all_arrivals")
-    arrivals_list = AllCountryStats.objects.all()
-    data = list(arrivals_list.values())
-    print(data)
-    return JsonResponse({"results": data}, safe=False)
+    """Stream every AllCountryStats row, optionally filtered by ?year= and ?country=.
 
+    Rows are read through a server-side cursor in chunks and written out as they
+    arrive, as a ``{"results": [...]}`` document or as NDJSON with ``?format=ndjson``.
+    """
+    try:
+        arrivals = _export_queryset(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
 
-def country_arrivals_view(request, country_name):
-    # Query the database for arrivals by country, excluding 'Total'
-    arrivals = AllCountryStats.objects.filter(country__iexact=country_name).exclude(
-        country__iexact="Total"
+    rows = arrivals.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    if request.GET.get("format") == "ndjson":
+        return StreamingHttpResponse(_stream_ndjson(rows), content_type="application/x-ndjson")
+    return StreamingHttpResponse(_stream_json_results(rows), content_type="application/json")
+
+
+def _country_arrivals_queryset(country_id, start, end):
+    """(year, month, passengers) of one country within start..end, chronologically."""
+    return (
+        AllCountryStats.objects.filter(country_id=country_id)
+        .filter(period_range_q(start, end))
+        .order_by("timeframe__year", "timeframe__month")
+        .values_list("timeframe__year", "timeframe__month", "passengers")
     )
 
+
+def _chart_data(arrivals):
     # Prepare data for the chart
     chart_data = {"labels": [], "data": []}
 
-    for arrival in arrivals:
-        label = f"{arrival.month} {arrival.year}"
-        chart_data["labels"].append(label)
-        chart_data["data"].append(arrival.passengers)
+    for year, month, passengers in arrivals:
+        chart_data["labels"].append(period_label(year, month))
+        chart_data["data"].append(passengers)
+
+    return chart_data
+
+
+@cache_versioned()
+def country_arrivals_view(request, country_name):
+    """Chronological monthly arrivals of one country, optionally within ?from= / ?to=.
+
+    Periods are ``YYYY-MM`` or ``YYYY``. The country is matched on the normalized
+    country_id. The series is read from the memory-mapped arrivals cube when it is
+    current, otherwise from the database using the (country_id, timeframe) index with
+    the timeframe joined in the same query.
+    """
+    try:
+        start, end = parse_period_range(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    country_id = normalize_country_id(country_name)
+
+    cube = get_current_cube(getattr(request, "dataset_version", None))
+    if country_id == "TOTAL":
+        # 'Total' is the sum over all countries, not a country
+        arrivals = []
+    elif cube is not None:
+        arrivals = cube.country_series(country_id, start, end)
+    else:
+        arrivals = _country_arrivals_queryset(country_id, start, end)
+
+    return JsonResponse(_chart_data(arrivals))
+
+
+def _top(params):
+    try:
+        top = int(params.get("top", ARRIVALS_TOP))
+    except ValueError:
+        raise ValueError(f"Invalid top: {params.get('top')}")
+    if not 0 < top <= COMPARE_MAX_COUNTRIES:
+        raise ValueError(f"top must be between 1 and {COMPARE_MAX_COUNTRIES}")
+    return top
+
+
+def _compare_countries(params, period):
+    """country_ids compared for the ?countries= / ?top= of a request.
+
+    ``?countries=`` is a comma separated list of names, ``?top=N`` picks the N
+    countries with the most arrivals in the period as a subquery, so the series are
+    still read in one query. Returns the country_ids (or subquery) and their order.
 
-    return JsonResponse(chart_data)
+    Raises:
+        ValueError: If neither or both are given, or they are out of range
+    """
+    countries, top = params.get("countries"), params.get("top")
+    if bool(countries) == bool(top):
+        raise ValueError("Pass either ?countries= or ?top=")
+
+    if countries:
+        country_ids = list(
+            dict.fromkeys(normalize_country_id(name) for name in countries.split(",") if name)
+        )
+        country_ids = [country_id for country_id in country_ids if country_id != "TOTAL"]
+        if not 0 < len(country_ids) <= COMPARE_MAX_COUNTRIES:
+            raise ValueError(f"Compare between 1 and {COMPARE_MAX_COUNTRIES} countries")
+        return country_ids, country_ids
+
+    top = _top(params)
+    top_countries = (
+        AllCountryStats.objects.filter(period)
+        .exclude(country_id="TOTAL")
+        .values("country_id")
+        .annotate(total=Sum("passengers"))
+        .order_by("-total", "country_id")
+        .values("country_id")[:top]
+    )
+    return top_countries, None
+
+
+def _compare_queryset(period, country_ids):
+    """Monthly arrivals of the compared countries in one grouped query."""
+    return (
+        AllCountryStats.objects.filter(period, country_id__in=country_ids)
+        .values("country_id", "timeframe__year", "timeframe__month")
+        .annotate(passengers=Sum("passengers"), country=Min("country"))
+        .order_by("country_id", "timeframe__year", "timeframe__month")
+    )
+
+
+@cache_versioned()
+def compare_arrivals(request):
+    """Aligned monthly arrivals of several countries, for comparison charts.
+
+    Takes ``?countries=india,china`` or ``?top=10`` (the countries with the most
+    arrivals in the period) and the ?from= / ?to= period of the arrivals view. All
+    series are read in a single grouped query and zero-filled to the same months.
+    Series are in the requested order, or by total arrivals for ``?top=``.
+
+    Example response:
+        {"labels": ["January 2023", ...],
+         "series": [{"country_id": "INDIA", "country": "India", "total": 123,
+                     "data": [10, 0, ...]}, ...]}
+    """
+    try:
+        return JsonResponse(_compare_data(request.GET))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+
+def _compare_data(params):
+    """Response of ``compare_arrivals`` for a request's query parameters.
+
+    Raises:
+        ValueError: If the period or the compared countries are invalid
+    """
+    start, end = parse_period_range(params)
+    period = period_range_q(start, end)
+    country_ids, order = _compare_countries(params, period)
+
+    rows = list(_compare_queryset(period, country_ids))
+
+    periods = [(row["timeframe__year"], row["timeframe__month"]) for row in rows]
+    if periods or (start and end):
+        periods = period_span(start or min(periods), end or max(periods))
+    columns = {period: column for column, period in enumerate(periods)}
+
+    series = {}
+    for row in rows:
+        entry = series.setdefault(
+            row["country_id"],
+            {
+                "country_id": row["country_id"],
+                "country": row["country"],
+                "data": [0] * len(periods),
+            },
+        )
+        entry["data"][columns[(row["timeframe__year"], row["timeframe__month"])]] = row[
+            "passengers"
+        ]
+    for entry in series.values():
+        entry["total"] = sum(entry["data"])
+
+    if order is None:
+        ordered = sorted(series.values(), key=lambda entry: (-entry["total"], entry["country_id"]))
+    else:
+        ordered = [series[country_id] for country_id in order if country_id in series]
+
+    return {"labels": [period_label(year, month) for year, month in periods], "series": ordered}
+
+
+def _period(row):
+    """Label, year and month (None for annual and quarterly rows) of an aggregated row."""
+    year, month = row["timeframe__year"], row.get("timeframe__month")
+    if "quarter" in row:
+        return {
+            "label": f"Q{row['quarter']} {year}",
+            "year": year,
+            "month": None,
+            "quarter": row["quarter"],
+        }
+    return {
+        "label": period_label(year, month) if month else str(year),
+        "year": year,
+        "month": month,
+    }
+
+
+def _summaries_current(request):
+    return summaries_current(getattr(request, "dataset_version", None))
+
+
+def _whole_years(start, end):
+    """Whether a ?from= / ?to= period covers whole years, as the annual summaries do."""
+    return (start is None or start[1] == 1) and (end is None or end[1] == 12)
+
+
+def _period_totals(request, granularity, start, end):
+    if _summaries_current(request):
+        return summary_period_totals(granularity, start, end)
+    if granularity == "quarter":
+        monthly = (
+            (row["timeframe__year"], row["timeframe__month"], row["arrivals"])
+            for row in period_totals("month", shift_year(start), end)
+        )
+        return rollup_totals(monthly, granularity, start, end)
+    return period_totals(granularity, start, end)
+
+
+@cache_versioned()
+def arrivals_totals(request):
+    """Total arrivals of all countries per month (or ?granularity=quarter/year) with YoY change.
+
+    Read from the monthly summaries while they are up to date, otherwise aggregated
+    in a single query, see ``period_totals``. Takes the ?from= / ?to= period of the
+    arrivals view.
+    """
+    try:
+        granularity = request.GET.get("granularity", "month")
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"Invalid granularity: {granularity}")
+        start, end = parse_period_range(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    totals = [
+        {
+            **_period(row),
+            "arrivals": row["arrivals"],
+            "previous": row["previous"],
+            "yoy": yoy_change(row["arrivals"], row["previous"]),
+        }
+        for row in _period_totals(request, granularity, start, end)
+    ]
+    return JsonResponse({"granularity": granularity, "totals": totals})
+
+
+@cache_versioned()
+def arrivals_top_markets(request):
+    """The ?top= (default 10) source markets of every year (or ?granularity=month).
+
+    Whole years are read from the annual summaries while they are up to date; other
+    periods are ranked with window functions in a single query, see ``top_markets``.
+    Takes the ?from= / ?to= period of the arrivals view.
+    """
+    try:
+        granularity = request.GET.get("granularity", "year")
+        period_fields(granularity)
+        top = _top(request.GET)
+        start, end = parse_period_range(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if granularity == "year" and _whole_years(start, end) and _summaries_current(request):
+        rows = summary_top_markets(top, start and start[0], end and end[0])
+    else:
+        rows = top_markets(granularity, top, start, end)
+
+    periods = []
+    for row in rows:
+        period = _period(row)
+        if not periods or periods[-1]["label"] != period["label"]:
+            periods.append({**period, "total": row["period_total"], "markets": []})
+        periods[-1]["markets"].append(
+            {
+                "country_id": row["country_id"],
+                "country": row["country"],
+                "arrivals": row["arrivals"],
+                "rank": row["rank"],
+                "share": share(row["arrivals"], row["period_total"]),
+            }
+        )
+    return JsonResponse({"granularity": granularity, "periods": periods})
+
+
+@cache_versioned()
+def arrivals_ranking(request):
+    """Rank, share and YoY change of every country in ?year= (and optionally ?month=).
+
+    Years are read from the annual summaries while they are up to date, months are
+    computed in a single query, see ``country_ranking``.
+    """
+    try:
+        year = int(request.GET["year"])
+        month = request.GET.get("month")
+        month = int(month) if month else None
+        if month is not None and not 1 <= month <= 12:
+            raise ValueError(f"Invalid month: {month}")
+    except KeyError:
+        return JsonResponse({"error": "?year= is required"}, status=400)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if month is None and _summaries_current(request):
+        rows = summary_ranking(year)
+    else:
+        rows = country_ranking(year, month)
+
+    ranking = [
+        {
+            "country_id": row["country_id"],
+            "country": row["country"],
+            "arrivals": row["arrivals"],
+            "previous": row["previous"],
+            "yoy": yoy_change(row["arrivals"], row["previous"]),
+            "rank": row["rank"],
+            "share": share(row["arrivals"], row["period_total"]),
+        }
+        for row in rows
+    ]
+    return JsonResponse({"year": year, "month": month, "ranking": ranking})
 
 
 def country_arrival_page(request):
-    return render(request, "allcountry_arrivals/country_chart.html")
+    """Arrivals chart page. Its chart data is fetched from the static snapshots while
+    they are current (see ``build_chart_snapshots``), otherwise from the live views."""
+    return render(
+        request,
+        "allcountry_arrivals/country_chart.html",
+        {"snapshots": get_current_snapshots()},
+    )
@@ -85,6 +85,12 @@ WSGI_APPLICATION = "traveller_service.wsgi.application"
 # Replace the DATABASES section of your settings.py with this
 tmpPostgres = urlparse(os.getenv("DATABASE_URL"))
 
+# Connections are kept open for DB_CONN_MAX_AGE seconds and checked before being
+# reused, so requests skip the TCP/TLS handshake. DB_POOL_MAX_SIZE instead shares a
+# psycopg connection pool between the threads of a process (Django >= 5.1 with
+# psycopg[pool] installed); persistent connections are then left to the pool.
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 0))
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -93,9 +99,72 @@ DATABASES = {
         "PASSWORD": tmpPostgres.password,
         "HOST": tmpPostgres.hostname,
         "PORT": 5432,
+        "CONN_MAX_AGE": 0 if DB_POOL_MAX_SIZE else int(os.getenv("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "true").lower() == "true",
+    }
+}
+
+if DB_POOL_MAX_SIZE:
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            "max_size": DB_POOL_MAX_SIZE,
+            # Seconds a request waits for a free connection before failing
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        }
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+#
+# Responses of the touristats read views are cached per dataset version, so entries
+# never go stale and only need a size bound. CACHE_BACKEND selects "locmem"
+# (per process) or "file" (shared by all workers on a host, at CACHE_LOCATION).
+#
+# MAX_ENTRIES counts entries, not bytes, so responses over CACHE_MAX_ENTRY_BYTES are
+# not cached at all. A cache holds up to CACHE_MAX_ENTRIES x CACHE_MAX_ENTRY_BYTES:
+# 256 x 1 MiB = 256 MiB of memory in every worker process with locmem, and
+# 1000 x 8 MiB = 8 GiB of disk per host with the file backend.
+
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+}
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 256 if CACHE_BACKEND == "locmem" else 1000))
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": os.getenv(
+            "CACHE_LOCATION", str(BASE_DIR / "cache") if CACHE_BACKEND == "file" else "touristats"
+        ),
+        "TIMEOUT": int(os.getenv("CACHE_TIMEOUT", 24 * 60 * 60)),
+        "OPTIONS": {
+            # Entries kept before a third of them are evicted
+            "MAX_ENTRIES": CACHE_MAX_ENTRIES,
+            "CULL_FREQUENCY": 3,
+        },
     }
 }
 
+# Responses (including streamed exports) larger than this are not cached
+TOURISTATS_MAX_CACHED_RESPONSE_BYTES = int(
+    os.getenv("CACHE_MAX_ENTRY_BYTES", (1 if CACHE_BACKEND == "locmem" else 8) * 1024 * 1024)
+)
+
+# Directory of the memory-mapped arrivals cube (see build_arrivals_cube), read by the
+# arrivals views and rebuilt after every ingest. Unset to always query the database.
+TOURISTATS_CUBE_DIR = os.getenv("CUBE_DIR")
+
+# Directory of the static chart data snapshots (see build_chart_snapshots), rebuilt
+# after every ingest and served by the web server under TOURISTATS_SNAPSHOT_URL (by
+# Django itself only with DEBUG). Unset to always fetch chart data from the views.
+TOURISTATS_SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR")
+TOURISTATS_SNAPSHOT_URL = os.getenv("SNAPSHOT_URL", "/snapshots/")
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
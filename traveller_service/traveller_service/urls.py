@@ -15,22 +15,61 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path
-from touristats import views
+from touristats import async_views, views
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("allcountry_arrivals/", views.arrivals_paginated, name="allcountry_arrivals"),
     path("allcountry_arrivals/get_all_arrivals/", views.get_all_arrivals, name="get_all_arrivals"),
     path(
-        "allcountry_arrivals/<str:country_name>/",
-        views.country_arrivals_view,
-        name="country_arrivals_json",
+        "allcountry_arrivals/page/",
+        views.arrivals_paginated_json,
+        name="allcountry_arrivals_json",
     ),
+    path("allcountry_arrivals/compare/", views.compare_arrivals, name="compare_arrivals"),
+    path("allcountry_arrivals/totals/", views.arrivals_totals, name="arrivals_totals"),
+    path("allcountry_arrivals/top/", views.arrivals_top_markets, name="arrivals_top_markets"),
+    path("allcountry_arrivals/ranking/", views.arrivals_ranking, name="arrivals_ranking"),
     path(
         "allcountry_arrivals/country_arrival_page/",
         views.country_arrival_page,
         name="country_arrival_page",
     ),
+    # Matches any single path segment, so it has to come after the fixed ones
+    path(
+        "allcountry_arrivals/<str:country_name>/",
+        views.country_arrivals_view,
+        name="country_arrivals_json",
+    ),
+    # Async versions of the read endpoints, for serving under an ASGI server (asgi.py)
+    path(
+        "async/allcountry_arrivals/get_all_arrivals/",
+        async_views.get_all_arrivals,
+        name="get_all_arrivals_async",
+    ),
+    path(
+        "async/allcountry_arrivals/page/",
+        async_views.arrivals_paginated_json,
+        name="allcountry_arrivals_json_async",
+    ),
+    path(
+        "async/allcountry_arrivals/<str:country_name>/",
+        async_views.country_arrivals_view,
+        name="country_arrivals_json_async",
+    ),
+    path(
+        "async/country_overview/<str:country_name>/",
+        async_views.country_overview,
+        name="country_overview",
+    ),
 ]
+
+if settings.TOURISTATS_SNAPSHOT_DIR:
+    # Only with DEBUG, in production the web server serves the snapshots
+    urlpatterns += static(
+        settings.TOURISTATS_SNAPSHOT_URL, document_root=settings.TOURISTATS_SNAPSHOT_DIR
+    )